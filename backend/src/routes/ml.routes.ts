@@ -78,34 +78,42 @@ router.get("/items", isAuthenticatedWithApiKey, async (req: Request, res: Respon
   }
 });
 
-// GET /ml/interactions?page=1&pageSize=1000
+// GET /ml/interactions?page=1&pageSize=1000[&since=<ISO timestamp>]
 router.get("/interactions", isAuthenticatedWithApiKey, async (req: Request, res: Response) => {
   try {
     const page = Number(req.query.page || 1);
     const pageSize = Number(req.query.pageSize || 1000);
     const skip = (page - 1) * pageSize;
 
+    // Incremental training only needs rows created after its last watermark
+    const since = req.query.since ? new Date(String(req.query.since)) : null;
+    const where = since && !isNaN(since.getTime()) ? { createdAt: { gt: since } } : undefined;
+
     // Pull favorites, bookings, reviews, interactions logs and union them
     // Favorites
     const favs = await prisma.favorite.findMany({
+      where,
       skip,
       take: pageSize,
     });
 
     // Bookings (successful/pending)
     const bookings = await prisma.booking.findMany({
+      where,
       skip,
       take: pageSize,
     });
 
     // Reviews
     const reviews = await prisma.review.findMany({
+      where,
       skip,
       take: pageSize,
     });
 
     // Generic interactions (if you have a separate log table)
     const interactions = await prisma.interaction.findMany({
+      where,
       skip,
       take: pageSize,
     });
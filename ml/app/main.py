@@ -1,6 +1,12 @@
 # app/main.py
-from fastapi import FastAPI
-from app.routers import health, train, recommend, debug
+import asyncio
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.routers import health, train, recommend, debug, metrics, export
+from app.services.inference import InferenceOverloaded, InferenceTimeout
+from app.services.model_manager import model_manager
+from app.utils.metrics import REQUEST_SECONDS
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 from dotenv import load_dotenv
@@ -18,6 +24,7 @@ app = FastAPI(
     * **User-based Recommendations**: Get personalized recommendations based on user behavior
     * **Item Similarity**: Find similar places and events
     * **Model Training**: Train the recommendation model with latest data
+    * **Bulk Export**: Download precomputed recommendations and similar items after each training run
     * **Health Monitoring**: Check service status and model readiness
     
     ### Authentication:
@@ -40,10 +47,49 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+_route_paths = {}
+
+def _route_label(request: Request) -> str:
+    """Route template (e.g. /recommend/user/{user_id}) so ids don't explode label cardinality."""
+    endpoint = request.scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    if not _route_paths:
+        _route_paths.update({getattr(r, "endpoint", None): r.path for r in app.routes})
+    return _route_paths.get(endpoint, "unmatched")
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        REQUEST_SECONDS.observe(time.perf_counter() - started, method=request.method,
+                                route=_route_label(request), status=status)
+
+@app.on_event("startup")
+async def load_models():
+    # load before serving so no request waits for the first model load
+    await asyncio.get_running_loop().run_in_executor(None, model_manager.refresh)
+
+@app.exception_handler(InferenceOverloaded)
+async def inference_overloaded(request: Request, exc: InferenceOverloaded):
+    return JSONResponse(status_code=503, content={"detail": "Recommendation service busy, retry shortly"},
+                        headers={"Retry-After": "1"})
+
+@app.exception_handler(InferenceTimeout)
+async def inference_timeout(request: Request, exc: InferenceTimeout):
+    return JSONResponse(status_code=504, content={"detail": "Recommendation timed out"})
+
 app.include_router(health.router, prefix="/health", tags=["health"])
 app.include_router(train.router, prefix="/train", tags=["training"])
 app.include_router(recommend.router, prefix="/recommend", tags=["recommend"])
 app.include_router(debug.router, prefix="/debug", tags=["debug"])
+app.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
+app.include_router(export.router, prefix="/export", tags=["export"])
 
 # Add an API key security scheme to the generated OpenAPI so Swagger UI
 # shows an "Authorize" button for x-api-key.
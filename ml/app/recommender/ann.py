@@ -0,0 +1,91 @@
+# app/recommender/ann.py
+import os
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from app.utils.helpers import top_n_indices
+
+# Artifact file names, resolved inside a model directory
+ANN_CENTROIDS_FILE = "ann_centroids.npy"
+ANN_VECTORS_FILE = "ann_vectors.npy"
+ANN_ORDER_FILE = "ann_order.npy"
+ANN_OFFSETS_FILE = "ann_offsets.npy"
+
+DEFAULT_NPROBE = int(os.getenv("ML_ANN_NPROBE", "16"))
+
+
+def _augment_items(vectors: np.ndarray) -> np.ndarray:
+    """
+    Append sqrt(M^2 - |x|^2) to every item vector (M = max norm). All items then
+    share norm M, so the largest inner product with a query [q, 0] is also the
+    nearest item in Euclidean distance, which k-means cells can partition.
+    """
+    norms_sq = np.einsum("ij,ij->i", vectors, vectors)
+    extra = np.sqrt(np.maximum(norms_sq.max() - norms_sq, 0.0))
+    return np.hstack([vectors, extra[:, None]]).astype(np.float32)
+
+
+class IVFIndex:
+    """
+    Inverted-file index for maximum inner product search over item vectors.
+    Items are clustered into cells; a query scores the centroids, probes the
+    best `nprobe` cells and ranks only their items exactly. Vectors are stored
+    in cell order so each cell is a contiguous slice.
+    """
+
+    def __init__(self, centroids: np.ndarray, vectors: np.ndarray, order: np.ndarray, offsets: np.ndarray):
+        self.centroids = centroids  # (cells, d + 1), augmented space
+        self.vectors = vectors      # (items, d), sorted by cell
+        self.order = order          # position in `vectors` -> item index
+        self.offsets = offsets      # cell c spans vectors[offsets[c]:offsets[c + 1]]
+        self._centroid_sq = np.einsum("ij,ij->i", centroids, centroids)
+
+    @property
+    def n_cells(self) -> int:
+        return len(self.offsets) - 1
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, n_cells: int = None, seed: int = 0) -> "IVFIndex":
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        n_items = len(vectors)
+        n_cells = n_cells or max(1, int(4 * np.sqrt(n_items)))
+        n_cells = min(n_cells, n_items)
+        augmented = _augment_items(vectors)
+        kmeans = MiniBatchKMeans(n_clusters=n_cells, random_state=seed, n_init=3,
+                                 batch_size=min(4096, n_items))
+        cells = kmeans.fit_predict(augmented)
+        order = np.argsort(cells, kind="stable").astype(np.int32)
+        offsets = np.zeros(n_cells + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=n_cells), out=offsets[1:])
+        return cls(kmeans.cluster_centers_.astype(np.float32), vectors[order], order, offsets)
+
+    def search(self, query: np.ndarray, k: int, nprobe: int = DEFAULT_NPROBE, exclude: int = None):
+        """Approximate top-k item indices and inner-product scores for one query vector."""
+        query = np.asarray(query, dtype=np.float32)
+        # nearest centroids to [q, 0]: maximise 2 q.c - |c|^2
+        centroid_scores = 2.0 * (self.centroids[:, :-1] @ query) - self._centroid_sq
+        probe = top_n_indices(centroid_scores, min(nprobe, self.n_cells))
+        spans = [np.arange(self.offsets[c], self.offsets[c + 1]) for c in probe]
+        positions = np.concatenate(spans) if spans else np.empty(0, dtype=np.int64)
+        scores = self.vectors[positions] @ query
+        if exclude is not None:
+            scores[self.order[positions] == exclude] = -np.inf
+        top = top_n_indices(scores, min(k + (exclude is not None), len(positions)))
+        top = top[np.isfinite(scores[top])][:k]
+        return self.order[positions[top]], scores[top]
+
+    def save(self, model_dir: str):
+        np.save(os.path.join(model_dir, ANN_CENTROIDS_FILE), self.centroids)
+        np.save(os.path.join(model_dir, ANN_VECTORS_FILE), self.vectors)
+        np.save(os.path.join(model_dir, ANN_ORDER_FILE), self.order)
+        np.save(os.path.join(model_dir, ANN_OFFSETS_FILE), self.offsets)
+
+    @classmethod
+    def load(cls, model_dir: str):
+        if not os.path.exists(os.path.join(model_dir, ANN_CENTROIDS_FILE)):
+            return None
+        return cls(
+            np.load(os.path.join(model_dir, ANN_CENTROIDS_FILE)),
+            np.load(os.path.join(model_dir, ANN_VECTORS_FILE), mmap_mode="r"),
+            np.load(os.path.join(model_dir, ANN_ORDER_FILE), mmap_mode="r"),
+            np.load(os.path.join(model_dir, ANN_OFFSETS_FILE)),
+        )
@@ -0,0 +1,71 @@
+# app/recommender/evaluation.py
+import os
+import joblib
+import numpy as np
+import pandas as pd
+from lightfm.evaluation import auc_score, precision_at_k, recall_at_k
+from scipy.sparse import coo_matrix
+from typing import Any, Dict, Tuple
+from app.recommender.item_features import item_feature_pairs
+from app.recommender.lightfm_model import (DATASET_FILE, MODEL_FILE, build_weight_matrices, dataset_item_features,
+                                           load_train_meta)
+
+
+def time_split(interactions_df: pd.DataFrame, test_fraction: float = 0.2
+               ) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Timestamp]:
+    """
+    Split on `timestamp`: the newest `test_fraction` of interactions is the
+    test set, everything at or before the cutoff trains. Rows without a
+    timestamp count as old. Returns (train, test, cutoff).
+    """
+    stamps = pd.to_datetime(interactions_df["timestamp"], errors="coerce", utc=True)
+    if stamps.notna().sum() == 0:
+        raise ValueError("interactions have no timestamps to split on")
+    cutoff = stamps.quantile(1.0 - test_fraction)
+    is_test = (stamps > cutoff).to_numpy()
+    train = interactions_df[~is_test].reset_index(drop=True)
+    test = interactions_df[is_test].reset_index(drop=True)
+    return train, test, cutoff
+
+
+def _test_matrix(test_df: pd.DataFrame, train_matrix: coo_matrix, dataset) -> coo_matrix:
+    """
+    Test interactions of users and items the model knows, minus pairs already
+    in training (LightFM's evaluation rejects overlapping matrices; those items
+    are excluded from the ranking anyway).
+    """
+    known = test_df[test_df["userId"].astype(str).isin(dataset._user_id_mapping.keys())
+                    & test_df["itemId"].astype(str).isin(dataset._item_id_mapping.keys())]
+    test_matrix, _ = build_weight_matrices(known, dataset._user_id_mapping, dataset._item_id_mapping)
+    test_csr = test_matrix.tocsr()
+    test_csr = test_csr - test_csr.multiply(train_matrix.tocsr() > 0)
+    test_csr.eliminate_zeros()
+    return test_csr.tocoo()
+
+
+def evaluate(model_dir: str, items_df: pd.DataFrame, train_df: pd.DataFrame, test_df: pd.DataFrame,
+             k: int = 10, num_threads: int = 1) -> Dict[str, Any]:
+    """
+    Precision@k, recall@k and AUC of the model trained into `model_dir` on
+    `train_df`, measured on `test_df` with LightFM's evaluation utilities.
+    Scores are per-user means over users with at least one test interaction.
+    """
+    model = joblib.load(os.path.join(model_dir, MODEL_FILE))
+    dataset = joblib.load(os.path.join(model_dir, DATASET_FILE))
+    item_features = None
+    if load_train_meta(model_dir).get("item_features"):
+        item_features = dataset_item_features(dataset, item_feature_pairs(items_df))
+
+    train_matrix, _ = build_weight_matrices(train_df, dataset._user_id_mapping, dataset._item_id_mapping)
+    test_matrix = _test_matrix(test_df, train_matrix, dataset)
+    if not test_matrix.nnz:
+        raise ValueError("no test interactions for users and items seen in training")
+
+    common = {"train_interactions": train_matrix, "item_features": item_features, "num_threads": num_threads}
+    return {
+        f"precision_at_{k}": float(np.mean(precision_at_k(model, test_matrix, k=k, **common))),
+        f"recall_at_{k}": float(np.mean(recall_at_k(model, test_matrix, k=k, **common))),
+        "auc": float(np.mean(auc_score(model, test_matrix, **common))),
+        "test_users": int(np.count_nonzero(np.diff(test_matrix.tocsr().indptr))),
+        "test_interactions": int(test_matrix.nnz),
+    }
@@ -0,0 +1,114 @@
+# app/recommender/id_index.py
+import os
+import numpy as np
+from typing import Iterable, List, Optional, Sequence
+
+# Files per index, resolved inside a model directory as <prefix>_<suffix>
+SORTED_IDS_SUFFIX = "sorted_ids.npy"
+ORDER_SUFFIX = "order.npy"
+RANK_SUFFIX = "rank.npy"
+
+
+def _encode(ids: Iterable) -> np.ndarray:
+    return np.array([str(i).encode("utf-8") for i in ids], dtype=np.bytes_)
+
+
+class IdIndex:
+    """
+    Bidirectional id <-> internal index map stored as flat arrays instead of
+    Python dicts, so it can be memory-mapped and shared between workers:
+      sorted_ids  ids (UTF-8 bytes) in sorted order, searched with np.searchsorted
+      order       sorted position -> internal index
+      rank        internal index -> sorted position
+    """
+
+    def __init__(self, sorted_ids: np.ndarray, order: np.ndarray, rank: np.ndarray):
+        self.sorted_ids = sorted_ids
+        self.order = order
+        self.rank = rank
+
+    @classmethod
+    def from_ids(cls, ids: Sequence) -> "IdIndex":
+        """`ids[i]` is the id of internal index i."""
+        return cls._from_encoded(_encode(ids))
+
+    @classmethod
+    def _from_encoded(cls, encoded: np.ndarray) -> "IdIndex":
+        order = np.argsort(encoded, kind="stable").astype(np.int32)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order), dtype=np.int32)
+        return cls(encoded[order], order, rank)
+
+    @classmethod
+    def from_mapping(cls, mapping) -> "IdIndex":
+        """From a LightFM-style {id: index} dict with indices 0..n-1."""
+        ids = np.empty(len(mapping), dtype=object)
+        ids[list(mapping.values())] = list(mapping.keys())
+        return cls.from_ids(ids)
+
+    def extended(self, ids: Sequence) -> "IdIndex":
+        """A new index with `ids` appended as internal indices len(self), len(self) + 1, ..."""
+        existing = np.asarray(self.sorted_ids)[np.asarray(self.rank)]
+        return IdIndex._from_encoded(np.concatenate([existing, _encode(ids)]))
+
+    def __len__(self) -> int:
+        return len(self.sorted_ids)
+
+    def get(self, item_or_user_id, default=None) -> Optional[int]:
+        key = str(item_or_user_id).encode("utf-8")
+        pos = int(np.searchsorted(self.sorted_ids, key))
+        if pos < len(self.sorted_ids) and self.sorted_ids[pos] == key:
+            return int(self.order[pos])
+        return default
+
+    def __getitem__(self, item_or_user_id) -> int:
+        index = self.get(item_or_user_id)
+        if index is None:
+            raise KeyError(item_or_user_id)
+        return index
+
+    def __contains__(self, item_or_user_id) -> bool:
+        return self.get(item_or_user_id) is not None
+
+    def lookup(self, ids: Sequence) -> np.ndarray:
+        """Internal indices for many ids at once; -1 for unknown ids."""
+        keys = _encode(ids)
+        if not len(self.sorted_ids):
+            return np.full(len(keys), -1, dtype=np.int64)
+        pos = np.searchsorted(self.sorted_ids, keys)
+        found = pos < len(self.sorted_ids)
+        found[found] = self.sorted_ids[pos[found]] == keys[found]
+        return np.where(found, self.order[np.minimum(pos, len(self.sorted_ids) - 1)], -1)
+
+    def translate(self, other: "IdIndex") -> np.ndarray:
+        """For every internal index of this map, the index of the same id in `other` (-1 if absent)."""
+        out = np.full(len(self), -1, dtype=np.int32)
+        if not len(other) or not len(self):
+            return out
+        pos = np.searchsorted(other.sorted_ids, self.sorted_ids)
+        clipped = np.minimum(pos, len(other) - 1)
+        found = (pos < len(other)) & (other.sorted_ids[clipped] == self.sorted_ids)
+        out[self.order[found]] = other.order[clipped[found]]
+        return out
+
+    def id_of(self, index: int) -> str:
+        return self.sorted_ids[self.rank[index]].decode("utf-8")
+
+    def ids_of(self, indices: Iterable[int]) -> List[str]:
+        return [self.id_of(int(i)) for i in indices]
+
+    def save(self, model_dir: str, prefix: str):
+        np.save(os.path.join(model_dir, f"{prefix}_{SORTED_IDS_SUFFIX}"), self.sorted_ids)
+        np.save(os.path.join(model_dir, f"{prefix}_{ORDER_SUFFIX}"), self.order)
+        np.save(os.path.join(model_dir, f"{prefix}_{RANK_SUFFIX}"), self.rank)
+
+    @classmethod
+    def load(cls, model_dir: str, prefix: str) -> Optional["IdIndex"]:
+        path = os.path.join(model_dir, f"{prefix}_{SORTED_IDS_SUFFIX}")
+        if not os.path.exists(path):
+            return None
+        return cls(
+            np.load(path, mmap_mode="r"),
+            np.load(os.path.join(model_dir, f"{prefix}_{ORDER_SUFFIX}"), mmap_mode="r"),
+            np.load(os.path.join(model_dir, f"{prefix}_{RANK_SUFFIX}"), mmap_mode="r"),
+        )
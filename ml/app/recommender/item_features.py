@@ -0,0 +1,71 @@
+# app/recommender/item_features.py
+import os
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from typing import List
+
+# Train LightFM with item metadata (category, tags, price bucket) on top of the
+# per-item identity features. Off by default; incremental runs follow their base.
+USE_ITEM_FEATURES = os.getenv("ML_ITEM_FEATURES", "0").lower() in ("1", "true", "yes")
+# Upper bounds of the price buckets; 0 (free) and anything above the last edge get their own bucket
+PRICE_BUCKET_EDGES = (1, 100, 250, 500, 1000, 2500, 5000)
+
+
+def _prefixed(item_ids: pd.Series, values: pd.Series, prefix: str) -> pd.DataFrame:
+    values = values.astype(str).str.strip().str.lower()
+    keep = values != ""
+    return pd.DataFrame({"itemId": item_ids[keep], "feature": prefix + values[keep]})
+
+
+def item_feature_pairs(items_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    One (itemId, feature) row per item feature, named "category:<c>",
+    "tag:<t>" and "price:<bucket>". Tags are the comma-joined strings
+    produced by the data loader.
+    """
+    item_ids = items_df["itemId"].astype(str)
+    frames = []
+    if "category" in items_df.columns:
+        frames.append(_prefixed(item_ids, items_df["category"].fillna(""), "category:"))
+    if "tags" in items_df.columns:
+        tags = items_df["tags"].fillna("").astype(str).str.split(",").explode()
+        frames.append(_prefixed(item_ids.loc[tags.index], tags, "tag:"))
+    if "price" in items_df.columns:
+        price = pd.to_numeric(items_df["price"], errors="coerce")
+        known = price.notna()
+        buckets = pd.Series(np.digitize(price[known], PRICE_BUCKET_EDGES), index=price[known].index)
+        frames.append(_prefixed(item_ids[known], buckets, "price:"))
+    if not frames:
+        return pd.DataFrame({"itemId": pd.Series(dtype=str), "feature": pd.Series(dtype=str)})
+    return pd.concat(frames, ignore_index=True).drop_duplicates()
+
+
+def feature_names(pairs: pd.DataFrame) -> List[str]:
+    return sorted(pairs["feature"].unique().tolist())
+
+
+def build_item_feature_matrix(pairs: pd.DataFrame, item_ids: pd.Index, feature_ids: pd.Index) -> csr_matrix:
+    """
+    Vectorized replacement for Dataset.build_item_features (identity features
+    on, normalize=True): each item row holds its identity feature plus its
+    metadata features, L1-normalised. Item representations are then
+    `matrix @ item_embeddings`, precomputed at save time. `item_ids` and
+    `feature_ids` are positioned by internal index, so the identity feature of
+    an item is found by its id.
+    """
+    n_items = len(item_ids)
+    identity_rows = np.arange(n_items)
+    identity_cols = feature_ids.get_indexer(item_ids)
+    rows = item_ids.get_indexer(pairs["itemId"])
+    cols = feature_ids.get_indexer(pairs["feature"])
+    known = (rows >= 0) & (cols >= 0)
+
+    rows = np.concatenate([identity_rows, rows[known]])
+    cols = np.concatenate([identity_cols, cols[known]])
+    matrix = csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)),
+                        shape=(n_items, len(feature_ids)))
+    matrix.sum_duplicates()
+    row_sums = np.asarray(matrix.sum(axis=1)).ravel()
+    matrix.data /= np.repeat(row_sums, np.diff(matrix.indptr)).astype(np.float32)
+    return matrix
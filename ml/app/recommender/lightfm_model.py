@@ -1,20 +1,42 @@
 # app/recommender/lightfm_model.py
 import os
+import json
 import joblib
 import numpy as np
 import pandas as pd
 from lightfm import LightFM
 from lightfm.data import Dataset
+from scipy.sparse import coo_matrix
+from app.recommender.ann import IVFIndex
+from app.recommender.id_index import IdIndex
+from app.recommender.item_features import (USE_ITEM_FEATURES, build_item_feature_matrix, feature_names,
+                                           item_feature_pairs)
+from app.recommender.popularity import PopularityIndex, decay, decayed_item_scores, item_categories
+from app.recommender.ranker import RankingData
+from app.utils.helpers import top_n_indices
 from app.utils.logger import logger
-from typing import List, Dict, Any
+from app.utils.metrics import timed
+from typing import List, Dict, Any, Optional
 
 MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "..", "models")
 os.makedirs(MODELS_DIR, exist_ok=True)
-MODEL_FILE = os.path.join(MODELS_DIR, "lightfm_model.pkl")
-DATASET_FILE = os.path.join(MODELS_DIR, "lightfm_dataset.joblib")
-ITEM_MAP_FILE = os.path.join(MODELS_DIR, "item_id_map.joblib")
-USER_MAP_FILE = os.path.join(MODELS_DIR, "user_id_map.joblib")
-ITEM_EMB_FILE = os.path.join(MODELS_DIR, "item_embeddings.npy")
+# Artifact file names, resolved inside a model directory (see app/services/model_manager.py)
+# training state, only unpickled by incremental training
+MODEL_FILE = "lightfm_model.pkl"
+DATASET_FILE = "lightfm_dataset.joblib"
+# pickled id maps of older model directories; serving reads the IdIndex files below
+ITEM_MAP_FILE = "item_id_map.joblib"
+USER_MAP_FILE = "user_id_map.joblib"
+# serving arrays, memory-mapped: score = user_emb . item_emb + user_bias + item_bias
+# (item arrays hold representations, i.e. already summed over the item's features)
+USER_EMB_FILE = "user_embeddings.npy"
+USER_BIAS_FILE = "user_biases.npy"
+ITEM_EMB_FILE = "item_embeddings.npy"
+ITEM_BIAS_FILE = "item_biases.npy"
+USER_IDS_PREFIX = "user_ids"
+ITEM_IDS_PREFIX = "item_ids"
+# training metadata: mode, watermark (newest interaction timestamp seen), item_features, sizes
+TRAIN_META_FILE = "train_meta.json"
 
 # We store interaction weights:
 INTERACTION_WEIGHTS = {
@@ -25,111 +47,455 @@ INTERACTION_WEIGHTS = {
     "review": 6.0
 }
 
+# Defaults for Trainer.train; benchmarks/tune.py searches over these
+DEFAULT_LOSS = "warp"
+DEFAULT_LEARNING_RATE = 0.05
+DEFAULT_EPOCHS = 20
+DEFAULT_COMPONENTS = 30
+# LightFM fit threads (Hogwild); one training job runs at a time
+TRAIN_THREADS = int(os.getenv("ML_TRAIN_THREADS", "4"))
+
+# Users scored per matrix product in batched recommendation (bounds the score block size)
+SCORE_BATCH_ROWS = 512
+# Catalog size from which embedding retrieval goes through the ANN index by default
+ANN_MIN_ITEMS = int(os.getenv("ML_ANN_MIN_ITEMS", "50000"))
+
+
+def _ordered_ids(mapping: Dict[Any, int]) -> pd.Index:
+    """Ids of a LightFM id mapping as an Index positioned by their internal index."""
+    ids = np.empty(len(mapping), dtype=object)
+    ids[list(mapping.values())] = list(mapping.keys())
+    return pd.Index(ids)
+
+
+def interaction_weights(interactions_df: pd.DataFrame) -> np.ndarray:
+    """Per-row weight from INTERACTION_WEIGHTS; unknown or missing types weigh 1.0."""
+    if "interaction" not in interactions_df.columns:
+        return np.ones(len(interactions_df), dtype=np.float32)
+    itypes = interactions_df["interaction"].astype(str).str.lower()
+    return itypes.map(INTERACTION_WEIGHTS).fillna(1.0).to_numpy(dtype=np.float32)
+
+
+def build_weight_matrices(interactions_df: pd.DataFrame, user_map: Dict[Any, int],
+                          item_map: Dict[Any, int]):
+    """
+    Vectorized replacement for Dataset.build_interactions. Ids are integer-coded
+    against the dataset mappings and duplicate (user, item) pairs are summed.
+    Returns (interactions, weights) COO matrices sharing the same row/col order,
+    as LightFM.fit expects.
+    """
+    rows = _ordered_ids(user_map).get_indexer(interactions_df["userId"].astype(str))
+    cols = _ordered_ids(item_map).get_indexer(interactions_df["itemId"].astype(str))
+    weights = interaction_weights(interactions_df)
+
+    known = (rows >= 0) & (cols >= 0)
+    if not known.all():
+        logger.warning("Skipping %d interactions with unknown users or items", int((~known).sum()))
+    shape = (len(user_map), len(item_map))
+    weights_matrix = coo_matrix((weights[known], (rows[known], cols[known])), shape=shape)
+    weights_matrix.sum_duplicates()
+    interactions_matrix = coo_matrix(
+        (np.ones_like(weights_matrix.data), (weights_matrix.row, weights_matrix.col)), shape=shape
+    )
+    return interactions_matrix, weights_matrix
+
+
+def load_train_meta(model_dir: str) -> Dict[str, Any]:
+    path = os.path.join(model_dir, TRAIN_META_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _watermark(interactions_df: pd.DataFrame, previous: Optional[str] = None) -> Optional[str]:
+    """Newest interaction timestamp as an ISO string, never moving backwards."""
+    stamps = [pd.Timestamp(previous)] if previous else []
+    if "timestamp" in interactions_df.columns and len(interactions_df):
+        newest = pd.to_datetime(interactions_df["timestamp"], errors="coerce", utc=True).max()
+        if not pd.isna(newest):
+            stamps.append(newest)
+    return max(stamps).isoformat() if stamps else None
+
+
+def build_popularity(items_df: pd.DataFrame, interactions_df: pd.DataFrame, item_map: Dict[Any, int],
+                     as_of: pd.Timestamp, base: Optional[PopularityIndex] = None,
+                     base_as_of: Optional[pd.Timestamp] = None) -> PopularityIndex:
+    """
+    Time-decayed popularity of every item in `item_map`, weighted like training
+    (INTERACTION_WEIGHTS). Decayed sums are additive, so an incremental run
+    decays the base scores to `as_of` and adds only the new interactions.
+    """
+    item_ids = _ordered_ids(item_map)
+    scores = decayed_item_scores(
+        item_ids.get_indexer(interactions_df["itemId"].astype(str)),
+        interaction_weights(interactions_df),
+        interactions_df["timestamp"] if "timestamp" in interactions_df.columns else None,
+        len(item_ids), as_of,
+    )
+    if base is not None:
+        # item indices are stable across Dataset.fit_partial; new items start at zero
+        scores[:len(base.item_scores)] += decay(base.item_scores, base_as_of, as_of)
+    return PopularityIndex.build(scores, item_categories(items_df, item_ids))
+
+
+def dataset_item_features(dataset: Dataset, pairs: pd.DataFrame):
+    return build_item_feature_matrix(pairs, _ordered_ids(dataset._item_id_mapping),
+                                     _ordered_ids(dataset._item_feature_mapping))
+
+
+def _grow_model(model: LightFM, n_user_features: int, n_item_features: int):
+    """
+    Append freshly initialised rows (same scheme as LightFM._initialize) for
+    users/items added to the dataset since the model was fit, so fit_partial
+    accepts the larger interaction matrix.
+    """
+    grad_init = 1.0 if model.learning_schedule == "adagrad" else 0.0
+    for prefix, target in (("user", n_user_features), ("item", n_item_features)):
+        embeddings = getattr(model, f"{prefix}_embeddings")
+        extra = target - embeddings.shape[0]
+        if extra <= 0:
+            continue
+        new_rows = ((model.random_state.rand(extra, model.no_components) - 0.5)
+                    / model.no_components).astype(np.float32)
+        grown = {
+            "embeddings": new_rows,
+            "embedding_gradients": np.full_like(new_rows, grad_init),
+            "embedding_momentum": np.zeros_like(new_rows),
+            "biases": np.zeros(extra, dtype=np.float32),
+            "bias_gradients": np.full(extra, grad_init, dtype=np.float32),
+            "bias_momentum": np.zeros(extra, dtype=np.float32),
+        }
+        for name, rows in grown.items():
+            attr = f"{prefix}_{name}"
+            setattr(model, attr, np.concatenate([getattr(model, attr), rows]))
+
+
 class Trainer:
     def __init__(self):
         pass
 
     def train(self, items_df: pd.DataFrame, interactions_df: pd.DataFrame,
-              epochs: int = 20, no_components: int = 30):
+              epochs: int = DEFAULT_EPOCHS, no_components: int = DEFAULT_COMPONENTS, model_dir: str = MODELS_DIR,
+              item_features: bool = USE_ITEM_FEATURES, loss: str = DEFAULT_LOSS,
+              learning_rate: float = DEFAULT_LEARNING_RATE, num_threads: int = TRAIN_THREADS):
+        """
+        Fit a new model. With `item_features`, items also carry their category,
+        tags and price bucket as LightFM features, so items with few or no
+        interactions share embeddings with similar ones.
+        """
         logger.info("Preparing dataset for LightFM")
-        dataset = Dataset()
-        users = interactions_df["userId"].unique().tolist()
-        items = items_df["itemId"].unique().tolist()
-
-        dataset.fit(users, items)
+        with timed("train.dataset"):
+            dataset = Dataset()
+            users = interactions_df["userId"].astype(str).unique().tolist()
+            items = items_df["itemId"].astype(str).unique().tolist()
+            pairs = item_feature_pairs(items_df) if item_features else None
 
-        # Build interactions list with weights
-        interaction_records = []
-        for _, r in interactions_df.iterrows():
-            user = str(r["userId"])
-            item = str(r["itemId"])
-            itype = str(r.get("interaction", "view")).lower()
-            weight = INTERACTION_WEIGHTS.get(itype, 1.0)
-            interaction_records.append((user, item, weight))
+            dataset.fit(users, items, item_features=feature_names(pairs) if item_features else None)
 
-        (interactions_matrix, weights_matrix) = dataset.build_interactions(
-            [(u, i, w) for (u, i, w) in interaction_records]
-        )
+            (interactions_matrix, weights_matrix) = build_weight_matrices(
+                interactions_df, dataset._user_id_mapping, dataset._item_id_mapping
+            )
+            feature_matrix = dataset_item_features(dataset, pairs) if item_features else None
 
         logger.info("Fitting LightFM model")
-        model = LightFM(loss="warp", no_components=no_components)
-        model.fit(interactions_matrix, sample_weight=weights_matrix, epochs=epochs, num_threads=4)
+        with timed("train.fit"):
+            model = LightFM(loss=loss, no_components=no_components, learning_rate=learning_rate)
+            model.fit(interactions_matrix, item_features=feature_matrix, sample_weight=weights_matrix,
+                      epochs=epochs, num_threads=num_threads)
 
-        # Save model and dataset
-        joblib.dump(model, MODEL_FILE)
-        joblib.dump(dataset, DATASET_FILE)
+        now = pd.Timestamp.now(tz="UTC").isoformat()
+        watermark = _watermark(interactions_df)
+        as_of = pd.Timestamp(watermark or now)
+        with timed("train.popularity"):
+            popularity = build_popularity(items_df, interactions_df, dataset._item_id_mapping, as_of)
+        with timed("train.ranking_data"):
+            ranking = RankingData.build(items_df, interactions_df, _ordered_ids(dataset._user_id_mapping),
+                                        _ordered_ids(dataset._item_id_mapping))
+        self._save(model, dataset, model_dir, popularity, ranking, {
+            "mode": "full",
+            "trained_at": now,
+            "last_full_at": now,
+            "watermark": watermark,
+            "popularity_as_of": as_of.isoformat(),
+            "item_features": bool(item_features),
+            "params": {"loss": loss, "no_components": no_components, "learning_rate": learning_rate,
+                       "epochs": epochs},
+            "interactions": int(weights_matrix.nnz),
+        }, feature_matrix)
 
-        # Maintain mappings (the dataset instance has mappings we can use via dataset.mapping())
+    def train_incremental(self, items_df: pd.DataFrame, interactions_df: pd.DataFrame,
+                          base_dir: str, model_dir: str, epochs: int = 5, num_threads: int = TRAIN_THREADS):
+        """
+        Continue training the model in `base_dir` on interactions newer than its
+        watermark. New users/items extend the Dataset mappings and get fresh
+        embedding rows; existing embeddings are updated with fit_partial.
+        Item features are used if the base model was trained with them; new
+        feature values (a new tag, say) get fresh rows like new items.
+        """
+        with timed("train.load_base"):
+            model = joblib.load(os.path.join(base_dir, MODEL_FILE))
+            dataset = joblib.load(os.path.join(base_dir, DATASET_FILE))
+            base_meta = load_train_meta(base_dir)
+        item_features = bool(base_meta.get("item_features"))
+
+        with timed("train.dataset"):
+            pairs = item_feature_pairs(items_df) if item_features else None
+            dataset.fit_partial(
+                users=interactions_df["userId"].astype(str).unique().tolist(),
+                items=items_df["itemId"].astype(str).unique().tolist(),
+                item_features=feature_names(pairs) if item_features else None,
+            )
+            _grow_model(model, *dataset.model_dimensions())
+
+            (interactions_matrix, weights_matrix) = build_weight_matrices(
+                interactions_df, dataset._user_id_mapping, dataset._item_id_mapping
+            )
+            # rebuilt from the current catalog, so changed item metadata takes effect
+            feature_matrix = dataset_item_features(dataset, pairs) if item_features else None
+        logger.info("Continuing LightFM training on %d new interactions", weights_matrix.nnz)
+        if weights_matrix.nnz:
+            with timed("train.fit_partial"):
+                model.fit_partial(interactions_matrix, item_features=feature_matrix, sample_weight=weights_matrix,
+                                  epochs=epochs, num_threads=num_threads)
+
+        now = pd.Timestamp.now(tz="UTC").isoformat()
+        watermark = _watermark(interactions_df, base_meta.get("watermark"))
+        as_of = pd.Timestamp(watermark or now)
+        base_as_of = base_meta.get("popularity_as_of")
+        base_popularity = PopularityIndex.load(base_dir) if base_as_of else None
+        if base_popularity is None:
+            logger.warning("Base version has no popularity index; ranking only the new interactions")
+        with timed("train.popularity"):
+            popularity = build_popularity(
+                items_df, interactions_df, dataset._item_id_mapping, as_of,
+                base=base_popularity, base_as_of=pd.Timestamp(base_as_of) if base_as_of else None,
+            )
+        with timed("train.ranking_data"):
+            ranking = RankingData.build(items_df, interactions_df, _ordered_ids(dataset._user_id_mapping),
+                                        _ordered_ids(dataset._item_id_mapping), base=RankingData.load(base_dir))
+        self._save(model, dataset, model_dir, popularity, ranking, {
+            "mode": "incremental",
+            "trained_at": now,
+            "last_full_at": base_meta.get("last_full_at"),
+            "watermark": watermark,
+            "popularity_as_of": as_of.isoformat(),
+            "item_features": item_features,
+            "params": base_meta.get("params"),
+            "interactions": int(weights_matrix.nnz),
+            "base_version_dir": os.path.basename(os.path.normpath(base_dir)),
+        }, feature_matrix)
+
+    @timed("train.save")
+    def _save(self, model: LightFM, dataset: Dataset, model_dir: str, popularity: PopularityIndex,
+              ranking: RankingData, meta: Dict[str, Any], item_features=None):
+        # Save model and dataset (training state for the next incremental run)
+        os.makedirs(model_dir, exist_ok=True)
+        joblib.dump(model, os.path.join(model_dir, MODEL_FILE))
+        joblib.dump(dataset, os.path.join(model_dir, DATASET_FILE))
+
+        # Serving artifacts: id maps and latent representations as plain arrays.
+        # With item features the item rows are item_features @ feature embeddings,
+        # so serving stays a dense dot product.
         user_map = dataset._user_id_mapping
         item_map = dataset._item_id_mapping
-        joblib.dump(user_map, USER_MAP_FILE)
-        joblib.dump(item_map, ITEM_MAP_FILE)
+        IdIndex.from_mapping(user_map).save(model_dir, USER_IDS_PREFIX)
+        IdIndex.from_mapping(item_map).save(model_dir, ITEM_IDS_PREFIX)
+        user_biases, user_embeddings = model.get_user_representations()
+        item_biases, item_embeddings = model.get_item_representations(item_features)
+        np.save(os.path.join(model_dir, USER_EMB_FILE), user_embeddings)
+        np.save(os.path.join(model_dir, USER_BIAS_FILE), user_biases)
+        np.save(os.path.join(model_dir, ITEM_EMB_FILE), item_embeddings)
+        np.save(os.path.join(model_dir, ITEM_BIAS_FILE), item_biases)
 
-        # Compute & save item embeddings (using model.get_item_representations)
+        # ANN index over [embedding, bias] so user retrieval ranks like predict()
         try:
-            item_embeddings = model.get_item_representations()[1]  # second is item embeddings
-            np.save(ITEM_EMB_FILE, item_embeddings)
+            with timed("train.ann"):
+                IVFIndex.build(np.hstack([item_embeddings, item_biases[:, None]])).save(model_dir)
         except Exception as e:
-            logger.warning("Failed to derive item embeddings: %s", e)
+            logger.warning("Failed to build ANN index: %s", e)
+
+        # cold-start rankings, global and per category
+        popularity.save(model_dir)
+        # item prices and per-user recent/booked items for the ranking stage
+        ranking.save(model_dir)
+
+        meta.update({"users": len(user_map), "items": len(item_map),
+                     "item_feature_count": dataset.model_dimensions()[1]})
+        with open(os.path.join(model_dir, TRAIN_META_FILE), "w") as f:
+            json.dump(meta, f, indent=2)
 
         logger.info("Training done and artifacts saved.")
 
 class LightFMRecommender:
-    def __init__(self):
-        self.model = None
-        self.dataset = None
+    def __init__(self, model_dir: str = MODELS_DIR):
+        self.model_dir = model_dir
+        # IdIndex maps: id -> internal index (get / in / []) and back (id_of)
         self.user_map = None
         self.item_map = None
-        self.item_id_from_index = None
         self.item_embeddings = None
+        # latent representations: score = user_vec . item_vec + user_bias + item_bias
+        self.user_vectors = None
+        self.user_biases = None
+        self.item_vectors = None
+        self.item_biases = None
+        self.ann = None
+        self.popularity = None
         self._load_artifacts()
 
+    def _path(self, name: str) -> str:
+        return os.path.join(self.model_dir, name)
+
+    @timed("load.lightfm")
     def _load_artifacts(self):
-        if os.path.exists(MODEL_FILE) and os.path.exists(DATASET_FILE):
-            try:
-                self.model = joblib.load(MODEL_FILE)
-                self.dataset = joblib.load(DATASET_FILE)
-                self.user_map = joblib.load(USER_MAP_FILE)
-                self.item_map = joblib.load(ITEM_MAP_FILE)
-                # invert item_map
-                self.item_id_from_index = {v: k for k, v in self.item_map.items()}
-                if os.path.exists(ITEM_EMB_FILE):
-                    self.item_embeddings = np.load(ITEM_EMB_FILE)
-            except Exception as e:
-                logger.error("Error loading artifacts: %s", e)
+        try:
+            if os.path.exists(self._path(USER_EMB_FILE)):
+                self._load_arrays()
+            elif os.path.exists(self._path(MODEL_FILE)) and os.path.exists(self._path(DATASET_FILE)):
+                logger.warning("No serving arrays in %s; unpickling the training model", self.model_dir)
+                self._load_pickled()
+            else:
+                return
+            self.ann = IVFIndex.load(self.model_dir)
+            self.popularity = PopularityIndex.load(self.model_dir)
+        except Exception as e:
+            logger.error("Error loading artifacts: %s", e)
+            self.user_map = self.item_map = None
+
+    def _load_arrays(self):
+        """Memory-map the serving arrays; pages are shared by every worker on the host."""
+        self.user_map = IdIndex.load(self.model_dir, USER_IDS_PREFIX)
+        self.item_map = IdIndex.load(self.model_dir, ITEM_IDS_PREFIX)
+        self.user_vectors = np.load(self._path(USER_EMB_FILE), mmap_mode="r")
+        self.user_biases = np.load(self._path(USER_BIAS_FILE), mmap_mode="r")
+        self.item_vectors = np.load(self._path(ITEM_EMB_FILE), mmap_mode="r")
+        self.item_biases = np.load(self._path(ITEM_BIAS_FILE), mmap_mode="r")
+        self.item_embeddings = self.item_vectors
+
+    def _load_pickled(self):
+        """Model directories written before the serving arrays existed."""
+        model = joblib.load(self._path(MODEL_FILE))
+        self.user_map = IdIndex.from_mapping(joblib.load(self._path(USER_MAP_FILE)))
+        self.item_map = IdIndex.from_mapping(joblib.load(self._path(ITEM_MAP_FILE)))
+        if os.path.exists(self._path(ITEM_EMB_FILE)):
+            self.item_embeddings = np.load(self._path(ITEM_EMB_FILE))
+        self.user_biases, self.user_vectors = model.get_user_representations()
+        self.item_biases, self.item_vectors = model.get_item_representations()
 
     def is_ready(self):
-        return self.model is not None and self.dataset is not None
+        return self.user_map is not None and self.item_map is not None and self.user_vectors is not None
+
+    def use_ann(self, approximate: Optional[bool]) -> bool:
+        if self.ann is None:
+            return False
+        return approximate if approximate is not None else len(self.item_map) >= ANN_MIN_ITEMS
+
+    def recommend_for_user(self, user_id: str, n: int = 10, approximate: Optional[bool] = None,
+                           category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Top-n items for a user. With `approximate` (default: catalogs of at least
+        ANN_MIN_ITEMS items) candidates come from the ANN index instead of
+        scoring the whole catalog. With `category`, only items of that category
+        are scored (exactly; the ANN index cannot be restricted to one).
+        """
+        if not self.is_ready():
+            return None
+
+        u_index = self.user_map.get(user_id)
+        if u_index is None:
+            # cold start: return popular items
+            return self._cold_start_recommend(n, category)
+
+        if category is not None and self.popularity is not None:
+            members = self.popularity.category_members(category)
+            scores = self.item_vectors[members] @ self.user_vectors[u_index]
+            scores += self.item_biases[members]
+            scores += self.user_biases[u_index]
+            top = top_n_indices(scores, n)
+            return self._format_pairs(members[top], scores[top])
 
-    def recommend_for_user(self, user_id: str, n: int = 10) -> List[Dict[str, Any]]:
+        if self.use_ann(approximate):
+            indices, scores = self.ann.search(np.append(self.user_vectors[u_index], 1.0), n)
+            return self._format_pairs(indices, scores + self.user_biases[u_index])
+
+        scores = self._score_users(np.array([u_index]))[0]
+        return self._format(scores, top_n_indices(scores, n))
+
+    def similar_items(self, item_id: str, n: int = 10,
+                      approximate: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """Items with the largest embedding dot product with `item_id` (collaborative similarity)."""
         if not self.is_ready():
             return None
+        idx = self.item_map.get(item_id)
+        if idx is None:
+            return []
+        if self.use_ann(approximate):
+            indices, scores = self.ann.search(np.append(self.item_vectors[idx], 0.0), n, exclude=idx)
+            return self._format_pairs(indices, scores)
+        scores = self.item_vectors @ self.item_vectors[idx]
+        scores[idx] = -np.inf
+        return self._format(scores, top_n_indices(scores, min(n, len(scores) - 1)))
 
-        user_map = self.user_map
-        item_map = self.item_map
-
-        if user_id not in user_map:
-            # cold start: return popular items (by item embedding norms)
-            return self._cold_start_recommend(n)
-
-        u_index = user_map[user_id]
-        n_items = len(item_map)
-        # predict scores for all items
-        scores = self.model.predict(u_index, np.arange(n_items))
-        # get top n indices
-        top_indices = np.argsort(-scores)[:n]
-        results = []
-        for idx in top_indices:
-            item_id = self.item_id_from_index.get(idx)
-            results.append({"itemId": item_id, "score": float(scores[idx])})
+    def recommend_for_users(self, user_ids: List[str], n: int = 10) -> List[Dict[str, Any]]:
+        """
+        Batched recommend_for_user: known users are scored together with one
+        matrix product per SCORE_BATCH_ROWS users; unknown users get cold start.
+        """
+        if not self.is_ready():
+            return None
+
+        results: List[Dict[str, Any]] = [None] * len(user_ids)
+        known = [(pos, int(u_index)) for pos, u_index in enumerate(self.user_map.lookup(user_ids)) if u_index >= 0]
+        for start in range(0, len(known), SCORE_BATCH_ROWS):
+            chunk = known[start:start + SCORE_BATCH_ROWS]
+            top, top_scores = self.top_n_for_indices(np.array([u_index for _, u_index in chunk]), n)
+            for row, (pos, _) in enumerate(chunk):
+                results[pos] = {"userId": user_ids[pos], "recommendations": self._format_pairs(top[row], top_scores[row])}
+
+        cold = None
+        for pos, user_id in enumerate(user_ids):
+            if results[pos] is None:
+                cold = cold if cold is not None else self._cold_start_recommend(n)
+                results[pos] = {"userId": user_id, "recommendations": cold}
         return results
 
-    def _cold_start_recommend(self, n=10):
-        # fallback: top-k by item embedding norm if available; else by item index
+    def top_n_for_indices(self, user_indices: np.ndarray, n: int):
+        """Top-n item indices and their scores, shape (len(user_indices), n), for a block of user indices."""
+        scores = self._score_users(user_indices)
+        top = top_n_indices(scores, n)
+        return top, np.take_along_axis(scores, top, axis=1)
+
+    def _score_users(self, user_indices: np.ndarray) -> np.ndarray:
+        """Scores of shape (len(user_indices), n_items); same values as model.predict."""
+        scores = self.user_vectors[user_indices] @ self.item_vectors.T
+        scores += self.item_biases
+        scores += self.user_biases[user_indices, None]
+        return scores
+
+    def _format(self, scores: np.ndarray, top_indices: np.ndarray) -> List[Dict[str, Any]]:
+        return self._format_pairs(top_indices, scores[top_indices])
+
+    def _format_pairs(self, indices: np.ndarray, scores: np.ndarray) -> List[Dict[str, Any]]:
+        return [
+            {"itemId": self.item_map.id_of(int(idx)), "score": float(score)}
+            for idx, score in zip(indices, scores)
+        ]
+
+    def popular_items(self, n: int = 10, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Most popular items by time-decayed interaction weight, optionally within a category."""
+        if not self.is_ready():
+            return None
+        return self._cold_start_recommend(n, category)
+
+    def _cold_start_recommend(self, n=10, category: Optional[str] = None):
+        if self.popularity is not None:
+            top = self.popularity.top(n, category)
+            return self._format_pairs(top, self.popularity.item_scores[top])
+        # artifacts from before the popularity index: top-k by item embedding norm if available; else by item index
         if self.item_embeddings is not None:
             norms = np.linalg.norm(self.item_embeddings, axis=1)
             top = np.argsort(-norms)[:n]
-            return [{"itemId": self.item_id_from_index.get(int(i)), "score": float(norms[int(i)])} for i in top]
+            return [{"itemId": self.item_map.id_of(int(i)), "score": float(norms[int(i)])} for i in top]
         else:
             # return first n items
-            return [{"itemId": k, "score": 0.0} for k in list(self.item_map.keys())[:n]]
+            return [{"itemId": k, "score": 0.0} for k in self.item_map.ids_of(range(min(n, len(self.item_map))))]
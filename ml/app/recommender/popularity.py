@@ -0,0 +1,123 @@
+# app/recommender/popularity.py
+import os
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+# Artifact file names, resolved inside a model directory
+ITEM_POPULARITY_FILE = "item_popularity.npy"
+POPULAR_ITEMS_FILE = "popular_items.npy"
+CATEGORY_NAMES_FILE = "popular_categories.npy"
+CATEGORY_OFFSETS_FILE = "popular_category_offsets.npy"
+CATEGORY_ITEMS_FILE = "popular_category_items.npy"
+
+# An interaction counts half as much after this many days
+POPULARITY_HALF_LIFE_DAYS = float(os.getenv("ML_POPULARITY_HALF_LIFE_DAYS", "30"))
+
+
+def item_categories(items_df: pd.DataFrame, item_ids: pd.Index) -> np.ndarray:
+    """Category name for each id in `item_ids`; "" for items without one."""
+    if "category" not in items_df.columns:
+        return np.full(len(item_ids), "", dtype=object)
+    items = items_df.drop_duplicates("itemId")
+    categories = pd.Series(items["category"].to_numpy(), index=items["itemId"].astype(str).to_numpy())
+    return categories.reindex(item_ids).fillna("").astype(str).to_numpy()
+
+
+def decayed_item_scores(item_indices: np.ndarray, weights: np.ndarray, timestamps: Optional[pd.Series],
+                        n_items: int, as_of: pd.Timestamp,
+                        half_life_days: float = POPULARITY_HALF_LIFE_DAYS) -> np.ndarray:
+    """
+    Per-item sum of interaction weights, each decayed by 0.5 ** (age / half-life)
+    relative to `as_of`. Negative indices (unknown items) are skipped; rows
+    without a timestamp count at full weight.
+    """
+    decayed = weights
+    if timestamps is not None:
+        stamps = pd.to_datetime(timestamps, errors="coerce", utc=True)
+        age_days = ((as_of - stamps).dt.total_seconds() / 86400.0).fillna(0.0).clip(lower=0.0).to_numpy()
+        decayed = weights * np.power(0.5, age_days / half_life_days)
+    known = item_indices >= 0
+    return np.bincount(item_indices[known], weights=decayed[known], minlength=n_items).astype(np.float32)
+
+
+def decay(scores: np.ndarray, since: pd.Timestamp, as_of: pd.Timestamp,
+          half_life_days: float = POPULARITY_HALF_LIFE_DAYS) -> np.ndarray:
+    """Scores that were current at `since`, decayed to `as_of`."""
+    days = max((as_of - since).total_seconds() / 86400.0, 0.0)
+    return np.asarray(scores, dtype=np.float32) * np.float32(0.5 ** (days / half_life_days))
+
+
+class PopularityIndex:
+    """
+    Items ranked by time-decayed, interaction-weighted popularity, globally and
+    per category. Rankings are stored as flat index arrays, so serving the
+    top-n for a category is a slice:
+        category_items[offsets[c]:offsets[c + 1]]
+    """
+
+    def __init__(self, item_scores: np.ndarray, popular_items: np.ndarray, categories: np.ndarray,
+                 category_offsets: np.ndarray, category_items: np.ndarray):
+        self.item_scores = item_scores
+        self.popular_items = popular_items
+        self.categories = categories
+        self.category_offsets = category_offsets
+        self.category_items = category_items
+
+    @classmethod
+    def build(cls, item_scores: np.ndarray, item_categories: np.ndarray) -> "PopularityIndex":
+        """`item_categories` holds the category name for every item index ("" if unknown)."""
+        item_scores = np.asarray(item_scores, dtype=np.float32)
+        popular_items = np.argsort(-item_scores, kind="stable").astype(np.int32)
+        categories, codes = np.unique(np.asarray(item_categories, dtype=str), return_inverse=True)
+        # group by category, most popular first within each group
+        category_items = np.lexsort((-item_scores, codes)).astype(np.int32)
+        offsets = np.zeros(len(categories) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(categories)), out=offsets[1:])
+        return cls(item_scores, popular_items, categories, offsets, category_items)
+
+    def category_code(self, category: str) -> Optional[int]:
+        c = int(np.searchsorted(self.categories, category))
+        if c >= len(self.categories) or self.categories[c] != category:
+            return None
+        return c
+
+    def item_category_codes(self) -> np.ndarray:
+        """Category code of every item index, recovered from the grouped rankings."""
+        codes = np.empty(len(self.category_items), dtype=np.int32)
+        codes[self.category_items] = np.repeat(np.arange(len(self.categories), dtype=np.int32),
+                                               np.diff(self.category_offsets))
+        return codes
+
+    def category_members(self, category: str) -> np.ndarray:
+        """Indices of every item in `category`, most popular first; empty for an unknown category."""
+        return self.top(len(self.category_items), category)
+
+    def top(self, n: int, category: Optional[str] = None) -> np.ndarray:
+        """Indices of the n most popular items, optionally within one category."""
+        if category is None:
+            return self.popular_items[:n]
+        c = self.category_code(category)
+        if c is None:
+            return self.popular_items[:0]
+        start = self.category_offsets[c]
+        return self.category_items[start:min(start + n, self.category_offsets[c + 1])]
+
+    def save(self, model_dir: str):
+        np.save(os.path.join(model_dir, ITEM_POPULARITY_FILE), self.item_scores)
+        np.save(os.path.join(model_dir, POPULAR_ITEMS_FILE), self.popular_items)
+        np.save(os.path.join(model_dir, CATEGORY_NAMES_FILE), self.categories)
+        np.save(os.path.join(model_dir, CATEGORY_OFFSETS_FILE), self.category_offsets)
+        np.save(os.path.join(model_dir, CATEGORY_ITEMS_FILE), self.category_items)
+
+    @classmethod
+    def load(cls, model_dir: str) -> Optional["PopularityIndex"]:
+        if not os.path.exists(os.path.join(model_dir, POPULAR_ITEMS_FILE)):
+            return None
+        return cls(
+            np.load(os.path.join(model_dir, ITEM_POPULARITY_FILE), mmap_mode="r"),
+            np.load(os.path.join(model_dir, POPULAR_ITEMS_FILE), mmap_mode="r"),
+            np.load(os.path.join(model_dir, CATEGORY_NAMES_FILE)),
+            np.load(os.path.join(model_dir, CATEGORY_OFFSETS_FILE)),
+            np.load(os.path.join(model_dir, CATEGORY_ITEMS_FILE), mmap_mode="r"),
+        )
@@ -0,0 +1,337 @@
+# app/recommender/ranker.py
+import os
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from app.utils.helpers import top_n_indices
+
+# Artifact file names, resolved inside a model directory
+ITEM_PRICE_FILE = "item_price.npy"
+USER_RECENT_OFFSETS_FILE = "user_recent_offsets.npy"
+USER_RECENT_ITEMS_FILE = "user_recent_items.npy"
+USER_BOOKED_OFFSETS_FILE = "user_booked_offsets.npy"
+USER_BOOKED_ITEMS_FILE = "user_booked_items.npy"
+
+# Most recent distinct items kept per user for content similarity
+RECENT_ITEMS = int(os.getenv("ML_RANK_RECENT_ITEMS", "20"))
+# Candidates taken from each source (collaborative, content, popularity) before blending
+CANDIDATES_PER_SOURCE = int(os.getenv("ML_RANK_CANDIDATES", "200"))
+# Blend weights; each signal is min-max scaled over the candidates first
+RANK_WEIGHTS = {
+    "cf": float(os.getenv("ML_RANK_WEIGHT_CF", "0.6")),
+    "content": float(os.getenv("ML_RANK_WEIGHT_CONTENT", "0.25")),
+    "popularity": float(os.getenv("ML_RANK_WEIGHT_POPULARITY", "0.15")),
+}
+# Users whose collaborative candidates are retrieved with one score block in batched ranking
+RANK_BATCH_ROWS = 512
+
+
+def _rows_to_csr(rows: np.ndarray, values: np.ndarray, n_rows: int):
+    """(offsets, values) with row r spanning values[offsets[r]:offsets[r + 1]]; `rows` must be sorted."""
+    offsets = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=offsets[1:])
+    return offsets, values.astype(np.int32)
+
+
+def _csr_to_frame(offsets: np.ndarray, values: np.ndarray) -> pd.DataFrame:
+    rows = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    return pd.DataFrame({"user": rows, "item": np.asarray(values), "position": np.arange(len(values))
+                         - np.asarray(offsets)[rows]})
+
+
+@dataclass
+class RankingData:
+    """
+    Per-item and per-user inputs of the ranking stage, indexed like the LightFM
+    model: item prices (NaN when unknown), each user's most recent distinct
+    items (newest first) and each user's booked items, as CSR-style arrays.
+    """
+
+    item_price: np.ndarray
+    recent_offsets: np.ndarray
+    recent_items: np.ndarray
+    booked_offsets: np.ndarray
+    booked_items: np.ndarray
+
+    @classmethod
+    def build(cls, items_df: pd.DataFrame, interactions_df: pd.DataFrame, user_ids: pd.Index,
+              item_ids: pd.Index, base: Optional["RankingData"] = None,
+              recent_items: int = RECENT_ITEMS) -> "RankingData":
+        """
+        `user_ids`/`item_ids` hold the ids positioned by internal index. With
+        `base` (the previous version) the interactions are taken as newer than
+        everything in it and merged in.
+        """
+        if "price" in items_df.columns:
+            items = items_df.drop_duplicates("itemId")
+            prices = pd.Series(pd.to_numeric(items["price"], errors="coerce").to_numpy(),
+                               index=items["itemId"].astype(str).to_numpy())
+            item_price = prices.reindex(item_ids).to_numpy(dtype=np.float32)
+        else:
+            item_price = np.full(len(item_ids), np.nan, dtype=np.float32)
+
+        events = pd.DataFrame({
+            "user": user_ids.get_indexer(interactions_df["userId"].astype(str)),
+            "item": item_ids.get_indexer(interactions_df["itemId"].astype(str)),
+        })
+        if "timestamp" in interactions_df.columns:
+            stamps = pd.to_datetime(interactions_df["timestamp"], errors="coerce", utc=True)
+            # newest first; missing timestamps sort last
+            events["position"] = -stamps.astype("int64").where(stamps.notna(), np.iinfo("int64").min + 1).to_numpy()
+        else:
+            events["position"] = np.arange(len(events))[::-1]
+        events["source"] = 0
+        booked = interactions_df["interaction"].astype(str).str.lower().eq("book").to_numpy() \
+            if "interaction" in interactions_df.columns else np.zeros(len(events), dtype=bool)
+        known = ((events["user"] >= 0) & (events["item"] >= 0)).to_numpy()
+        booked_events = events.loc[known & booked, ["user", "item"]]
+        events = events[known]
+
+        if base is not None:
+            # older entries from the base version rank after every new interaction
+            old_recent = _csr_to_frame(base.recent_offsets, base.recent_items).assign(source=1)
+            events = pd.concat([events, old_recent], ignore_index=True)
+            booked_events = pd.concat([booked_events, _csr_to_frame(base.booked_offsets, base.booked_items)
+                                       [["user", "item"]]], ignore_index=True)
+
+        events = events.sort_values(["user", "source", "position"], kind="stable")
+        events = events.drop_duplicates(["user", "item"])
+        events = events[events.groupby("user").cumcount() < recent_items]
+        recent_offsets, recent = _rows_to_csr(events["user"].to_numpy(), events["item"].to_numpy(), len(user_ids))
+
+        booked_events = booked_events.drop_duplicates().sort_values(["user", "item"])
+        booked_offsets, booked_items = _rows_to_csr(booked_events["user"].to_numpy(),
+                                                    booked_events["item"].to_numpy(), len(user_ids))
+        return cls(item_price, recent_offsets, recent, booked_offsets, booked_items)
+
+    def recent(self, u_index: int) -> np.ndarray:
+        return self.recent_items[self.recent_offsets[u_index]:self.recent_offsets[u_index + 1]]
+
+    def booked(self, u_index: int) -> np.ndarray:
+        return self.booked_items[self.booked_offsets[u_index]:self.booked_offsets[u_index + 1]]
+
+    def save(self, model_dir: str):
+        np.save(os.path.join(model_dir, ITEM_PRICE_FILE), self.item_price)
+        np.save(os.path.join(model_dir, USER_RECENT_OFFSETS_FILE), self.recent_offsets)
+        np.save(os.path.join(model_dir, USER_RECENT_ITEMS_FILE), self.recent_items)
+        np.save(os.path.join(model_dir, USER_BOOKED_OFFSETS_FILE), self.booked_offsets)
+        np.save(os.path.join(model_dir, USER_BOOKED_ITEMS_FILE), self.booked_items)
+
+    @classmethod
+    def load(cls, model_dir: str) -> Optional["RankingData"]:
+        if not os.path.exists(os.path.join(model_dir, ITEM_PRICE_FILE)):
+            return None
+        return cls(*(np.load(os.path.join(model_dir, name), mmap_mode="r") for name in (
+            ITEM_PRICE_FILE, USER_RECENT_OFFSETS_FILE, USER_RECENT_ITEMS_FILE,
+            USER_BOOKED_OFFSETS_FILE, USER_BOOKED_ITEMS_FILE)))
+
+
+@dataclass
+class RankFilters:
+    category: Optional[str] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    exclude_booked: bool = True
+
+
+def _scaled(values: np.ndarray) -> np.ndarray:
+    low, high = values.min(), values.max()
+    if high - low <= 1e-12:
+        return np.zeros_like(values)
+    return (values - low) / (high - low)
+
+
+class HybridRanker:
+    """
+    Ranking stage over a bounded candidate set: the top CANDIDATES_PER_SOURCE
+    items by collaborative score, by content similarity to the user's recent
+    items and by popularity are merged, filtered, and scored with a weighted
+    blend of the three signals. Beyond candidate retrieval, all work is
+    vectorized over the candidates and independent of catalog size.
+    """
+
+    def __init__(self, recommender, similarity, data: RankingData,
+                 weights: Dict[str, float] = RANK_WEIGHTS, candidates: int = CANDIDATES_PER_SOURCE):
+        self.recommender = recommender
+        self.similarity = similarity
+        self.data = data
+        self.weights = weights
+        self.candidates = candidates
+        popularity = recommender.popularity
+        self.popularity = popularity
+        self.item_category = popularity.item_category_codes() if popularity is not None else None
+        if similarity is not None and similarity.is_ready():
+            # LightFM item index <-> TF-IDF row, -1 where an item is missing on one side
+            self.item_to_content = recommender.item_map.translate(similarity.item_ids)
+            self.content_to_item = similarity.item_ids.translate(recommender.item_map)
+        else:
+            self.item_to_content = self.content_to_item = None
+
+    def is_ready(self) -> bool:
+        return self.recommender.is_ready() and self.data is not None
+
+    def rank_for_user(self, user_id: str, n: int = 10, filters: Optional[RankFilters] = None,
+                      approximate: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """Ranked recommendations for one user; `approximate` as in LightFMRecommender.recommend_for_user."""
+        if not self.is_ready():
+            return None
+        u_index = self.recommender.user_map.get(user_id)
+        if u_index is None:
+            return self._rank(None, None, n, filters or RankFilters())
+        return self.rank_for_indices(np.array([u_index]), n, filters, approximate)[0]
+
+    def rank_for_users(self, user_ids: List[str], n: int = 10, filters: Optional[RankFilters] = None,
+                       approximate: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """
+        Batched rank_for_user, same rankings: collaborative candidates of known
+        users come from one score block per RANK_BATCH_ROWS users; unknown
+        users share one cold-start ranking.
+        """
+        if not self.is_ready():
+            return None
+        filters = filters or RankFilters()
+        indices = self.recommender.user_map.lookup(user_ids)
+        known = np.flatnonzero(indices >= 0)
+        results: List[Dict[str, Any]] = [None] * len(user_ids)
+        for start in range(0, len(known), RANK_BATCH_ROWS):
+            positions = known[start:start + RANK_BATCH_ROWS]
+            for pos, recs in zip(positions, self.rank_for_indices(indices[positions], n, filters, approximate)):
+                results[pos] = {"userId": user_ids[pos], "recommendations": recs}
+        cold = None
+        for pos, user_id in enumerate(user_ids):
+            if results[pos] is None:
+                cold = cold if cold is not None else self._rank(None, None, n, filters)
+                results[pos] = {"userId": user_id, "recommendations": cold}
+        return results
+
+    def rank_for_indices(self, user_indices: np.ndarray, n: int = 10, filters: Optional[RankFilters] = None,
+                         approximate: Optional[bool] = None) -> List[List[Dict[str, Any]]]:
+        """Rankings for a block of known user indices, retrieving their collaborative candidates together."""
+        filters = filters or RankFilters()
+        cf_candidates = self._cf_candidates(user_indices, approximate)
+        return [self._rank(int(u_index), candidates, n, filters)
+                for u_index, candidates in zip(user_indices, cf_candidates)]
+
+    def _rank(self, u_index: Optional[int], cf_candidates: Optional[np.ndarray], n: int,
+              filters: RankFilters) -> List[Dict[str, Any]]:
+        rec = self.recommender
+        sources = []
+        recent = self.data.recent(u_index) if u_index is not None else np.empty(0, dtype=np.int32)
+        if u_index is not None:
+            sources.append(cf_candidates)
+        sources.append(self._content_candidates(recent))
+        sources.append(self._popular_candidates(filters.category))
+        exclude = self.data.booked(u_index) if u_index is not None and filters.exclude_booked else None
+        candidates = self._filter(np.unique(np.concatenate(sources)), filters, exclude)
+        if not len(candidates):
+            return []
+
+        signals = {"popularity": self._popularity_signal(candidates)}
+        if u_index is not None:
+            signals["cf"] = rec.item_vectors[candidates] @ rec.user_vectors[u_index] + rec.item_biases[candidates]
+        content = self._content_signal(candidates, recent)
+        if content is not None:
+            signals["content"] = content
+        return self._blend(candidates, signals, n)
+
+    def rank_similar(self, item_id: str, n: int = 8,
+                     filters: Optional[RankFilters] = None) -> List[Dict[str, Any]]:
+        """Items related to `item_id` by content and by co-interaction, blended with popularity."""
+        if not self.is_ready():
+            return None
+        filters = filters or RankFilters(exclude_booked=False)
+        rec = self.recommender
+        idx = rec.item_map.get(item_id)
+        if idx is None:
+            return []
+        anchor = np.array([idx], dtype=np.int32)
+        cf_scores = rec.item_vectors @ rec.item_vectors[idx]
+        sources = [top_n_indices(cf_scores, self.candidates + 1), self._content_candidates(anchor),
+                   self._popular_candidates(filters.category)]
+        candidates = self._filter(np.unique(np.concatenate(sources)), filters, anchor)
+        if not len(candidates):
+            return []
+        signals = {"cf": cf_scores[candidates], "popularity": self._popularity_signal(candidates)}
+        content = self._content_signal(candidates, anchor)
+        if content is not None:
+            signals["content"] = content
+        return self._blend(candidates, signals, n)
+
+    def _cf_candidates(self, user_indices: np.ndarray, approximate: Optional[bool]):
+        """Top collaborative items per user: one row of candidate indices per entry of `user_indices`."""
+        rec = self.recommender
+        if rec.use_ann(approximate):
+            return [rec.ann.search(np.append(rec.user_vectors[u_index], 1.0), self.candidates)[0]
+                    for u_index in user_indices]
+        return rec.top_n_for_indices(user_indices, self.candidates)[0]
+
+    def _content_candidates(self, items: np.ndarray) -> np.ndarray:
+        sim = self.similarity
+        if self.item_to_content is None or sim.neighbor_idx is None or not len(items):
+            return np.empty(0, dtype=np.int64)
+        rows = self.item_to_content[items]
+        rows = rows[rows >= 0]
+        per_item = max(1, self.candidates // max(len(rows), 1))
+        neighbors = np.asarray(sim.neighbor_idx[rows, :per_item]).ravel()
+        neighbors = self.content_to_item[neighbors[neighbors >= 0]]
+        return neighbors[neighbors >= 0]
+
+    def _popular_candidates(self, category: Optional[str]) -> np.ndarray:
+        if self.popularity is None:
+            return np.empty(0, dtype=np.int64)
+        return self.popularity.top(self.candidates, category)
+
+    def _filter(self, candidates: np.ndarray, filters: RankFilters, exclude: Optional[np.ndarray]) -> np.ndarray:
+        keep = np.ones(len(candidates), dtype=bool)
+        if filters.category is not None:
+            code = self.popularity.category_code(filters.category) if self.popularity is not None else None
+            if code is None:
+                return candidates[:0]
+            keep &= self.item_category[candidates] == code
+        price = self.data.item_price[candidates]
+        # items without a price never match a price filter
+        if filters.min_price is not None:
+            keep &= price >= filters.min_price
+        if filters.max_price is not None:
+            keep &= price <= filters.max_price
+        if exclude is not None and len(exclude):
+            keep &= ~np.isin(candidates, exclude)
+        return candidates[keep]
+
+    def _popularity_signal(self, candidates: np.ndarray) -> np.ndarray:
+        if self.popularity is None:
+            return np.zeros(len(candidates), dtype=np.float32)
+        # log damping so a handful of blockbuster items do not flatten everything else
+        return np.log1p(np.asarray(self.popularity.item_scores[candidates], dtype=np.float32))
+
+    def _content_signal(self, candidates: np.ndarray, anchors: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Largest TF-IDF cosine between each candidate and any anchor item, read from
+        the anchors' precomputed neighbor rows (candidates outside them score 0).
+        `candidates` must be sorted.
+        """
+        sim = self.similarity
+        if self.item_to_content is None or sim.neighbor_idx is None or not len(anchors):
+            return None
+        anchor_rows = self.item_to_content[anchors]
+        anchor_rows = anchor_rows[anchor_rows >= 0]
+        if not len(anchor_rows):
+            return None
+        neighbors = np.asarray(sim.neighbor_idx[anchor_rows]).ravel()
+        scores = np.asarray(sim.neighbor_scores[anchor_rows]).ravel()
+        items = np.where(neighbors >= 0, self.content_to_item[neighbors], -1)
+        pos = np.searchsorted(candidates, items)
+        clipped = np.minimum(pos, len(candidates) - 1)
+        hit = (items >= 0) & (candidates[clipped] == items)
+        signal = np.zeros(len(candidates), dtype=np.float32)
+        np.maximum.at(signal, clipped[hit], scores[hit])
+        return signal
+
+    def _blend(self, candidates: np.ndarray, signals: Dict[str, np.ndarray], n: int) -> List[Dict[str, Any]]:
+        total_weight = sum(self.weights[name] for name in signals)
+        blended = np.zeros(len(candidates), dtype=np.float32)
+        for name, values in signals.items():
+            blended += (self.weights[name] / total_weight) * _scaled(np.asarray(values, dtype=np.float32))
+        top = top_n_indices(blended, n)
+        return self.recommender._format_pairs(candidates[top], blended[top])
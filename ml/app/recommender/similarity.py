@@ -1,67 +1,453 @@
 # app/recommender/similarity.py
 import os
+import json
+import multiprocessing
+import shutil
 import joblib
 import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from scipy.sparse import csr_matrix, vstack
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import linear_kernel
+from app.recommender.id_index import ORDER_SUFFIX, RANK_SUFFIX, SORTED_IDS_SUFFIX, IdIndex
+from app.utils.helpers import top_n_indices
 from app.utils.logger import logger
+from app.utils.metrics import timed
 
 MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "..", "models")
-TFIDF_FILE = os.path.join(MODELS_DIR, "tfidf.joblib")
-TFIDF_MATRIX_FILE = os.path.join(MODELS_DIR, "tfidf_matrix.npy")
-ITEMS_IDX_FILE = os.path.join(MODELS_DIR, "items_index.joblib")
+# Artifact file names, resolved inside a model directory (see app/services/model_manager.py)
+# fitted vectorizer, kept for training; serving only reads the arrays below
+TFIDF_FILE = "tfidf.joblib"
+# legacy dense matrix, only read when the sparse files below are missing
+TFIDF_MATRIX_FILE = "tfidf_matrix.npy"
+TFIDF_DATA_FILE = "tfidf_data.npy"
+TFIDF_INDICES_FILE = "tfidf_indices.npy"
+TFIDF_INDPTR_FILE = "tfidf_indptr.npy"
+TFIDF_SHAPE_FILE = "tfidf_shape.npy"
+# legacy pickled {row: itemId} dict, only read when the IdIndex files are missing
+ITEMS_IDX_FILE = "items_index.joblib"
+CONTENT_IDS_PREFIX = "content_item_ids"
+NEIGHBORS_IDX_FILE = "neighbors_idx.npy"
+NEIGHBORS_SCORE_FILE = "neighbors_scores.npy"
+# hash of each row's text, to find edited items on update
+CONTENT_HASH_FILE = "content_hashes.npy"
+# build metadata: mode (full / incremental), last_full_at, item counts
+CONTENT_META_FILE = "content_meta.json"
+# every file a build or update writes; a version dir cloned for an update links all others
+SIMILARITY_FILES = [TFIDF_FILE, TFIDF_MATRIX_FILE, TFIDF_DATA_FILE, TFIDF_INDICES_FILE, TFIDF_INDPTR_FILE,
+                    TFIDF_SHAPE_FILE, ITEMS_IDX_FILE, NEIGHBORS_IDX_FILE, NEIGHBORS_SCORE_FILE,
+                    CONTENT_HASH_FILE, CONTENT_META_FILE] + [
+    f"{CONTENT_IDS_PREFIX}_{suffix}" for suffix in (SORTED_IDS_SUFFIX, ORDER_SUFFIX, RANK_SUFFIX)]
+
+# Number of neighbors precomputed per item; larger requests fall back to live scoring
+NEIGHBORS_K = 50
+# Rows scored per block while building the neighbor table, further capped so one
+# dense (rows x items) float32 block stays under NEIGHBORS_BLOCK_BYTES
+NEIGHBORS_BLOCK_ROWS = 256
+NEIGHBORS_BLOCK_BYTES = 64 * 2**20
+# Full neighbor builds: rows per pool task, and the catalog size from which
+# the tasks run in NEIGHBORS_WORKERS processes instead of in-process
+NEIGHBORS_CHUNK_ROWS = 4096
+NEIGHBORS_PARALLEL_MIN_ITEMS = int(os.getenv("ML_NEIGHBORS_PARALLEL_MIN_ITEMS", "20000"))
+NEIGHBORS_WORKERS = int(os.getenv("ML_NEIGHBORS_WORKERS", str(min(4, os.cpu_count() or 1))))
+# An incremental update refits the vectorizer from scratch once the last full fit is
+# this old, or when this share of the catalog changed at once (vocabulary and IDF drift)
+CONTENT_REFIT_HOURS = float(os.getenv("ML_CONTENT_REFIT_HOURS", "168"))
+CONTENT_REFIT_FRACTION = float(os.getenv("ML_CONTENT_REFIT_FRACTION", "0.2"))
+
+
+def item_texts(items_df) -> pd.Series:
+    """The text field the vectorizer sees: title, description and tags."""
+    return (items_df.get("title", "") + " " + items_df.get("description", "") + " " + items_df.get("tags", "")).fillna("").astype(str)
+
+
+def _text_hashes(texts: pd.Series) -> np.ndarray:
+    return pd.util.hash_pandas_object(texts, index=False).to_numpy(dtype=np.uint64)
+
+
+def _block_rows(n_items: int, block_rows: int) -> int:
+    return max(1, min(block_rows, NEIGHBORS_BLOCK_BYTES // (4 * max(n_items, 1))))
+
+
+def compute_neighbors(tfidf, k: int = NEIGHBORS_K, block_rows: int = NEIGHBORS_BLOCK_ROWS, rows=None,
+                      tfidf_t=None):
+    """
+    Top-k most similar items for every row of the (L2-normalised) TF-IDF matrix,
+    or only for `rows`. Returns (indices, scores) arrays of shape (len(rows), k),
+    best first, self excluded. Rows with fewer than k other items are padded with index -1.
+    Pass `tfidf_t` (tfidf.T as CSR) to reuse it across calls.
+    """
+    n_items = tfidf.shape[0]
+    rows = np.arange(n_items) if rows is None else np.asarray(rows)
+    k = max(0, min(k, n_items - 1))
+    neighbor_idx = np.full((len(rows), k), -1, dtype=np.int32)
+    neighbor_scores = np.zeros((len(rows), k), dtype=np.float32)
+    if k == 0:
+        return neighbor_idx, neighbor_scores
+
+    if tfidf_t is None:
+        tfidf_t = tfidf.T.tocsr()
+    block_rows = _block_rows(n_items, block_rows)
+    for start in range(0, len(rows), block_rows):
+        block = rows[start:start + block_rows]
+        sims = (tfidf[block] @ tfidf_t).toarray()
+        # never return an item as its own neighbor
+        sims[np.arange(len(block)), block] = -np.inf
+        top = top_n_indices(sims, k)
+        neighbor_idx[start:start + len(block)] = top
+        neighbor_scores[start:start + len(block)] = np.take_along_axis(sims, top, axis=1)
+    return neighbor_idx, neighbor_scores
+
+
+def merge_neighbors(tfidf, neighbor_idx: np.ndarray, neighbor_scores: np.ndarray, rows: np.ndarray,
+                    candidates: np.ndarray, block_rows: int = NEIGHBORS_BLOCK_ROWS):
+    """
+    In place: for each of `rows`, fold the `candidates` items into its neighbor
+    list where they beat the current k-th neighbor. The existing lists must not
+    already contain any candidate.
+    """
+    if not len(rows) or not len(candidates) or not neighbor_idx.shape[1]:
+        return
+    candidates_t = tfidf[candidates].T.tocsr()
+    block_rows = _block_rows(len(candidates), block_rows)
+    for start in range(0, len(rows), block_rows):
+        block = rows[start:start + block_rows]
+        sims = (tfidf[block] @ candidates_t).toarray()
+        sims[block[:, None] == candidates[None, :]] = -np.inf
+        hit = (sims > neighbor_scores[block, -1][:, None]).any(axis=1)
+        if not hit.any():
+            continue
+        block = block[hit]
+        merged_idx = np.hstack([neighbor_idx[block], np.broadcast_to(candidates, (len(block), len(candidates)))])
+        merged_scores = np.hstack([neighbor_scores[block], sims[hit]])
+        top = top_n_indices(merged_scores, neighbor_idx.shape[1])
+        neighbor_idx[block] = np.take_along_axis(merged_idx, top, axis=1)
+        neighbor_scores[block] = np.take_along_axis(merged_scores, top, axis=1)
+
+
+@lru_cache(maxsize=1)
+def _chunk_inputs(model_dir: str):
+    """The saved TF-IDF matrix (memory-mapped) and its transpose, once per process."""
+    tfidf = _load_csr(model_dir)
+    return tfidf, tfidf.T.tocsr()
+
+
+def _neighbors_chunk(model_dir: str, start: int, stop: int, k: int):
+    """Pool task: neighbors of rows [start, stop), written straight into the table files."""
+    tfidf, tfidf_t = _chunk_inputs(model_dir)
+    idx, scores = compute_neighbors(tfidf, k, rows=np.arange(start, stop), tfidf_t=tfidf_t)
+    idx_out = np.load(os.path.join(model_dir, NEIGHBORS_IDX_FILE), mmap_mode="r+")
+    scores_out = np.load(os.path.join(model_dir, NEIGHBORS_SCORE_FILE), mmap_mode="r+")
+    idx_out[start:stop] = idx
+    scores_out[start:stop] = scores
+    idx_out.flush()
+    scores_out.flush()
+    return stop - start
+
+
+def write_neighbor_files(model_dir: str, k: int = NEIGHBORS_K, workers: int = NEIGHBORS_WORKERS,
+                         chunk_rows: int = NEIGHBORS_CHUNK_ROWS) -> int:
+    """
+    Build the neighbor table for the TF-IDF matrix saved in `model_dir` without
+    holding it, or any items x items product, in memory: the output files are
+    preallocated, and row chunks are scored (sparse block products, top-k by
+    argpartition) and written into them, in a spawn process pool for large
+    catalogs. Workers memory-map the saved matrix. Returns k.
+    """
+    n_items = int(np.load(os.path.join(model_dir, TFIDF_SHAPE_FILE))[0])
+    k = max(0, min(k, n_items - 1))
+    idx_path, scores_path = os.path.join(model_dir, NEIGHBORS_IDX_FILE), os.path.join(model_dir, NEIGHBORS_SCORE_FILE)
+    if k == 0:
+        np.save(idx_path, np.full((n_items, 0), -1, dtype=np.int32))
+        np.save(scores_path, np.zeros((n_items, 0), dtype=np.float32))
+        return k
+    # preallocate new files (a served version may still map the old ones);
+    # the memmaps are closed before any worker opens them
+    for path, dtype in ((idx_path, np.int32), (scores_path, np.float32)):
+        if os.path.exists(path):
+            os.remove(path)
+        np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(n_items, k)).flush()
+
+    chunks = [(start, min(start + chunk_rows, n_items)) for start in range(0, n_items, chunk_rows)]
+    workers = min(workers, len(chunks))
+    if workers <= 1 or n_items < NEIGHBORS_PARALLEL_MIN_ITEMS:
+        try:
+            for start, stop in chunks:
+                _neighbors_chunk(model_dir, start, stop, k)
+        finally:
+            _chunk_inputs.cache_clear()
+        return k
+    logger.info("Computing neighbors of %d items in %d processes", n_items, workers)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(_neighbors_chunk, model_dir, start, stop, k) for start, stop in chunks]
+        for future in futures:
+            future.result()
+    return k
+
+
+def load_content_meta(model_dir: str):
+    path = os.path.join(model_dir, CONTENT_META_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_csr(model_dir: str, matrix):
+    np.save(os.path.join(model_dir, TFIDF_SHAPE_FILE), np.array(matrix.shape, dtype=np.int64))
+    np.save(os.path.join(model_dir, TFIDF_DATA_FILE), matrix.data)
+    np.save(os.path.join(model_dir, TFIDF_INDICES_FILE), matrix.indices)
+    np.save(os.path.join(model_dir, TFIDF_INDPTR_FILE), matrix.indptr)
+    if os.path.exists(os.path.join(model_dir, TFIDF_MATRIX_FILE)):
+        os.remove(os.path.join(model_dir, TFIDF_MATRIX_FILE))
+
+
+def _load_csr(model_dir: str):
+    """
+    Memory-map the CSR arrays so every worker shares the same page cache
+    instead of holding a private copy. Falls back to the legacy dense file.
+    """
+    if os.path.exists(os.path.join(model_dir, TFIDF_DATA_FILE)):
+        if os.path.exists(os.path.join(model_dir, TFIDF_SHAPE_FILE)):
+            n_features = int(np.load(os.path.join(model_dir, TFIDF_SHAPE_FILE))[1])
+        else:
+            n_features = len(joblib.load(os.path.join(model_dir, TFIDF_FILE)).vocabulary_)
+        data = np.load(os.path.join(model_dir, TFIDF_DATA_FILE), mmap_mode="r")
+        indices = np.load(os.path.join(model_dir, TFIDF_INDICES_FILE), mmap_mode="r")
+        indptr = np.load(os.path.join(model_dir, TFIDF_INDPTR_FILE), mmap_mode="r")
+        return csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, n_features), copy=False)
+    if os.path.exists(os.path.join(model_dir, TFIDF_MATRIX_FILE)):
+        return csr_matrix(np.load(os.path.join(model_dir, TFIDF_MATRIX_FILE)))
+    return None
+
 
 class ContentSimilarity:
-    def __init__(self):
+    def __init__(self, model_dir: str = MODELS_DIR):
+        self.model_dir = model_dir
         self.vectorizer = None
         self.tfidf_matrix = None
-        self.items_index = None
+        # IdIndex over TF-IDF rows: itemId -> row (get) and back (id_of)
+        self.item_ids = None
+        self.neighbor_idx = None
+        self.neighbor_scores = None
         self._load()
 
+    @timed("similarity.build")
     def build(self, items_df):
         # Build a simple text field
-        texts = (items_df.get("title", "") + " " + items_df.get("description", "") + " " + items_df.get("tags", "")).fillna("").astype(str)
+        texts = item_texts(items_df)
         vectorizer = TfidfVectorizer(max_features=5000, ngram_range=(1,2))
         tfidf = vectorizer.fit_transform(texts)
-        joblib.dump(vectorizer, TFIDF_FILE)
-        np.save(TFIDF_MATRIX_FILE, tfidf.todense())
-        # store mapping from index to itemId
-        items_index = dict(enumerate(items_df["itemId"].tolist()))
-        joblib.dump(items_index, ITEMS_IDX_FILE)
+        tfidf = csr_matrix(tfidf, dtype=np.float32)
+        os.makedirs(self.model_dir, exist_ok=True)
+        joblib.dump(vectorizer, self._path(TFIDF_FILE))
+        # store mapping between row index and itemId
+        item_ids = IdIndex.from_ids(items_df["itemId"].astype(str).tolist())
+        now = pd.Timestamp.now(tz="UTC").isoformat()
         self.vectorizer = vectorizer
+        # neighbor table computed from the saved matrix (see write_neighbor_files)
+        self._save(tfidf, item_ids, _text_hashes(texts),
+                   {"mode": "full", "built_at": now, "last_full_at": now, "updated_items": len(item_ids)})
+        logger.info("Content similarity built and saved (%d items, k=%d).", tfidf.shape[0], self.neighbor_idx.shape[1])
+
+    @timed("similarity.update")
+    def update(self, items_df, base_dir: str, full_catalog: bool = True):
+        """
+        Bring the similarity artifacts of `base_dir` up to date with `items_df`
+        and write them to this model directory. Only new and edited items (by
+        text hash) are transformed with the saved vectorizer; their rows are
+        replaced or appended, and only neighbor lists that can change are
+        recomputed. Falls back to build() when the base has no incremental
+        state, items were removed, or a full refit is due (CONTENT_REFIT_*).
+        With `full_catalog=False`, `items_df` holds just the changed items.
+        """
+        items_df = items_df.drop_duplicates("itemId", keep="last")
+        ids = items_df["itemId"].astype(str).to_numpy()
+        texts = item_texts(items_df)
+        hashes = _text_hashes(texts)
+        base_ids = IdIndex.load(base_dir, CONTENT_IDS_PREFIX)
+        base_meta = load_content_meta(base_dir)
+        have_state = (base_ids is not None and os.path.exists(os.path.join(base_dir, CONTENT_HASH_FILE))
+                      and os.path.exists(os.path.join(base_dir, TFIDF_FILE)))
+        if not have_state:
+            if not full_catalog:
+                raise ValueError("base version has no incremental content state; retrain first")
+            logger.info("Base has no incremental content state; rebuilding")
+            return self.build(items_df)
+
+        base_rows = base_ids.lookup(ids)
+        base_hashes = np.load(os.path.join(base_dir, CONTENT_HASH_FILE))
+        is_new = base_rows < 0
+        is_changed = ~is_new & (hashes != base_hashes[np.maximum(base_rows, 0)])
+        n_base = len(base_ids)
+        if full_catalog:
+            reason = None
+            last_full = base_meta.get("last_full_at")
+            if n_base - int((~is_new).sum()) > 0:
+                reason = "items removed"
+            elif (is_new.sum() + is_changed.sum()) > CONTENT_REFIT_FRACTION * max(n_base, 1):
+                reason = "large change"
+            elif not last_full or (pd.Timestamp.now(tz="UTC") - pd.Timestamp(last_full)
+                                   >= pd.Timedelta(hours=CONTENT_REFIT_HOURS)):
+                reason = "scheduled refit"
+            if reason:
+                logger.info("Full content refit (%s)", reason)
+                return self.build(items_df)
+
+        affected = is_new | is_changed
+        if not affected.any():
+            self._link_unchanged(base_dir, base_meta)
+            return
+        self.vectorizer = joblib.load(os.path.join(base_dir, TFIDF_FILE))
+        # rows in `affected` order: edited items keep their row, new ones are appended
+        changed_rows = base_rows[is_changed]
+        new_ids = ids[is_new]
+        n_total = n_base + len(new_ids)
+        target_rows = np.empty(int(affected.sum()), dtype=np.int64)
+        target_rows[is_changed[affected]] = changed_rows
+        target_rows[is_new[affected]] = np.arange(n_base, n_total)
+
+        base_tfidf = _load_csr(base_dir)
+        new_rows = csr_matrix(self.vectorizer.transform(texts[affected]), dtype=np.float32)
+        order = np.arange(n_total)
+        order[target_rows] = n_base + np.arange(len(target_rows))
+        tfidf = vstack([base_tfidf, new_rows], format="csr")[order]
+        item_ids = base_ids.extended(new_ids.tolist())
+        row_hashes = np.concatenate([base_hashes, np.zeros(len(new_ids), dtype=np.uint64)])
+        row_hashes[target_rows] = hashes[affected]
+
+        with timed("similarity.neighbors"):
+            neighbor_idx, neighbor_scores = self._update_neighbors(base_dir, tfidf, target_rows, changed_rows)
+        now = pd.Timestamp.now(tz="UTC").isoformat()
+        self._save(tfidf, item_ids, row_hashes, {
+            "mode": "incremental",
+            "built_at": now,
+            "last_full_at": base_meta.get("last_full_at"),
+            "updated_items": int(len(target_rows)),
+            "base_version_dir": os.path.basename(os.path.normpath(base_dir)),
+        }, (neighbor_idx, neighbor_scores), vectorizer_from=base_dir)
+        logger.info("Content similarity updated (%d new, %d edited of %d items).",
+                    len(new_ids), len(changed_rows), n_total)
+
+    def _link_unchanged(self, base_dir: str, base_meta):
+        """No new or edited items: every base artifact is reused as is."""
+        os.makedirs(self.model_dir, exist_ok=True)
+        for name in SIMILARITY_FILES:
+            if name != CONTENT_META_FILE and os.path.exists(os.path.join(base_dir, name)):
+                self._link_from(base_dir, name)
+        meta = {**base_meta, "mode": "unchanged", "built_at": pd.Timestamp.now(tz="UTC").isoformat(),
+                "updated_items": 0, "base_version_dir": os.path.basename(os.path.normpath(base_dir))}
+        with open(self._path(CONTENT_META_FILE), "w") as f:
+            json.dump(meta, f, indent=2)
+        self._load()
+        logger.info("Content similarity unchanged; linked from %s.", base_dir)
+
+    def _link_from(self, src_dir: str, name: str):
+        """Replace this directory's `name` with a link to (or copy of) `src_dir`'s."""
+        target = self._path(name)
+        if os.path.exists(target):
+            os.remove(target)
+        try:
+            os.link(os.path.join(src_dir, name), target)
+        except OSError:
+            shutil.copy2(os.path.join(src_dir, name), target)
+
+    def _update_neighbors(self, base_dir: str, tfidf, affected_rows: np.ndarray, changed_rows: np.ndarray):
+        n_total = tfidf.shape[0]
+        base_idx = np.load(os.path.join(base_dir, NEIGHBORS_IDX_FILE))
+        k = max(0, min(NEIGHBORS_K, n_total - 1))
+        if base_idx.shape[1] != k:
+            # the catalog was smaller than k + 1 items; lists change length
+            return compute_neighbors(tfidf)
+        neighbor_idx = np.full((n_total, k), -1, dtype=np.int32)
+        neighbor_scores = np.zeros((n_total, k), dtype=np.float32)
+        neighbor_idx[:len(base_idx)] = base_idx
+        neighbor_scores[:len(base_idx)] = np.load(os.path.join(base_dir, NEIGHBORS_SCORE_FILE))
+
+        # lists holding an edited item have a stale score and may lose it: recompute them
+        stale = np.zeros(n_total, dtype=bool)
+        stale[affected_rows] = True
+        if len(changed_rows):
+            stale[:len(base_idx)] |= np.isin(base_idx, changed_rows).any(axis=1)
+        recompute = np.flatnonzero(stale)
+        neighbor_idx[recompute], neighbor_scores[recompute] = compute_neighbors(tfidf, rows=recompute)
+        # every other list only gains new / edited items that beat its k-th neighbor
+        merge_neighbors(tfidf, neighbor_idx, neighbor_scores, np.flatnonzero(~stale), affected_rows)
+        return neighbor_idx, neighbor_scores
+
+    def _save(self, tfidf, item_ids: IdIndex, row_hashes: np.ndarray, meta, neighbors=None,
+              vectorizer_from: str = None):
+        """Write the artifacts; without `neighbors` ((idx, scores) arrays) the table is computed on disk."""
+        os.makedirs(self.model_dir, exist_ok=True)
+        if vectorizer_from is not None:
+            # unchanged vectorizer: link rather than rewrite
+            self._link_from(vectorizer_from, TFIDF_FILE)
+        _save_csr(self.model_dir, tfidf)
+        item_ids.save(self.model_dir, CONTENT_IDS_PREFIX)
+        np.save(self._path(CONTENT_HASH_FILE), row_hashes)
+        if neighbors is None:
+            with timed("similarity.neighbors"):
+                write_neighbor_files(self.model_dir)
+            neighbor_idx = np.load(self._path(NEIGHBORS_IDX_FILE), mmap_mode="r")
+            neighbor_scores = np.load(self._path(NEIGHBORS_SCORE_FILE), mmap_mode="r")
+        else:
+            neighbor_idx, neighbor_scores = neighbors
+            np.save(self._path(NEIGHBORS_IDX_FILE), neighbor_idx)
+            np.save(self._path(NEIGHBORS_SCORE_FILE), neighbor_scores)
+        meta.update({"items": int(tfidf.shape[0]), "k": int(neighbor_idx.shape[1])})
+        with open(self._path(CONTENT_META_FILE), "w") as f:
+            json.dump(meta, f, indent=2)
         self.tfidf_matrix = tfidf
-        self.items_index = items_index
-        logger.info("Content similarity built and saved.")
+        self.item_ids = item_ids
+        self.neighbor_idx = neighbor_idx
+        self.neighbor_scores = neighbor_scores
 
+    def _path(self, name: str) -> str:
+        return os.path.join(self.model_dir, name)
+
+    @timed("load.similarity")
     def _load(self):
-        if os.path.exists(TFIDF_FILE) and os.path.exists(TFIDF_MATRIX_FILE) and os.path.exists(ITEMS_IDX_FILE):
+        try:
+            self.item_ids = IdIndex.load(self.model_dir, CONTENT_IDS_PREFIX)
+            if self.item_ids is None and os.path.exists(self._path(ITEMS_IDX_FILE)):
+                items_index = joblib.load(self._path(ITEMS_IDX_FILE))
+                self.item_ids = IdIndex.from_ids([items_index[i] for i in range(len(items_index))])
+            if self.item_ids is not None:
+                self.tfidf_matrix = _load_csr(self.model_dir)
+        except Exception as e:
+            logger.warning("Failed loading TFIDF artifacts: %s", e)
+            self.item_ids = None
+        if os.path.exists(self._path(NEIGHBORS_IDX_FILE)) and os.path.exists(self._path(NEIGHBORS_SCORE_FILE)):
             try:
-                self.vectorizer = joblib.load(TFIDF_FILE)
-                mat = np.load(TFIDF_MATRIX_FILE)
-                # mat saved as dense; convert back to csr if needed
-                from scipy.sparse import csr_matrix
-                self.tfidf_matrix = csr_matrix(mat)
-                self.items_index = joblib.load(ITEMS_IDX_FILE)
+                self.neighbor_idx = np.load(self._path(NEIGHBORS_IDX_FILE), mmap_mode="r")
+                self.neighbor_scores = np.load(self._path(NEIGHBORS_SCORE_FILE), mmap_mode="r")
             except Exception as e:
-                logger.warning("Failed loading TFIDF artifacts: %s", e)
+                logger.warning("Failed loading neighbor table: %s", e)
 
     def is_ready(self):
-        return self.vectorizer is not None and self.tfidf_matrix is not None and self.items_index is not None
+        return self.tfidf_matrix is not None and self.item_ids is not None
 
     def most_similar(self, item_id, topn=8):
         if not self.is_ready():
             return None
-        # find index for item_id
-        inv = {v:k for k,v in self.items_index.items()}
-        if item_id not in inv:
+        idx = self.item_ids.get(item_id)
+        if idx is None:
             return []
-        idx = inv[item_id]
+        if self.neighbor_idx is not None and topn <= self.neighbor_idx.shape[1]:
+            indices = self.neighbor_idx[idx, :topn]
+            scores = self.neighbor_scores[idx, :topn]
+        else:
+            indices, scores = self._score_live(idx, topn)
+        return [
+            {"itemId": self.item_ids.id_of(int(i)), "score": float(s)}
+            for i, s in zip(indices, scores)
+            if i >= 0
+        ]
+
+    def _score_live(self, idx, topn):
         cosine_similarities = linear_kernel(self.tfidf_matrix[idx:idx+1], self.tfidf_matrix).flatten()
-        related_docs_indices = cosine_similarities.argsort()[:-topn-1:-1]
-        results = []
-        for i in related_docs_indices:
-            if i == idx:  # skip self
-                continue
-            results.append({"itemId": self.items_index.get(int(i)), "score": float(cosine_similarities[i])})
-        return results
+        cosine_similarities[idx] = -np.inf  # skip self
+        top = top_n_indices(cosine_similarities, min(topn, len(cosine_similarities) - 1))
+        return top, cosine_similarities[top]
@@ -1,8 +1,9 @@
 # app/routers/debug.py
-from fastapi import APIRouter
-from app.recommender.lightfm_model import LightFMRecommender
-from app.recommender.similarity import ContentSimilarity
-from app.services.data_loader import load_data_from_express
+from fastapi import APIRouter, Query
+from app.services.cache import response_cache
+from app.services.inference import inference
+from app.services.model_manager import model_manager
+from app.services.snapshots import latest_snapshot, refresh_snapshot, snapshot_summary
 
 router = APIRouter()
 
@@ -10,11 +11,17 @@ router = APIRouter()
     "/status",
     summary="Check model status",
     description="""
-    Returns the current status of the recommendation models.
+    Returns the current status of the recommendation models that serve requests.
+    
+    Reports on the models already loaded in this process, so polling it (e.g. from a health probe) reads nothing from disk.
     
     **Returns:**
     - **lightfm_loaded**: Whether the collaborative filtering model is loaded and ready
     - **similarity_ready**: Whether the content similarity model is ready
+    - **ranker_ready**: Whether the hybrid ranking stage is available
+    - **version**, **loaded_at**, **load_seconds**: Served model version and when / how fast it was loaded
+    - **users**, **items**, **content_items**: Sizes of the loaded models
+    - **memory**: Bytes in memory-mapped artifact arrays (shared between workers), in private arrays, and the process RSS
     
     Use this endpoint to verify that models are trained and available before making recommendation requests.
     """,
@@ -22,38 +29,57 @@ router = APIRouter()
     tags=["Debug"]
 )
 def status():
-    """Check if recommendation models are loaded and ready"""
-    rec = LightFMRecommender()
-    sim = ContentSimilarity()
-    return {
-        "lightfm_loaded": rec.is_ready(),
-        "similarity_ready": sim.is_ready()
-    }
+    """Report on the loaded recommendation models"""
+    return model_manager.get().status()
 
 @router.get(
     "/data_sample",
     summary="Get data sample",
     description="""
-    Fetches and returns a sample of the training data from the backend API.
+    Returns a sample of the training data from the latest data snapshot.
+    
+    Counts and head rows come from the snapshot metadata, so no data is downloaded
+    unless there is no snapshot yet or `refresh` is set.
     
     This endpoint is useful for:
-    - Verifying data connectivity with the Express backend
+    - Verifying data connectivity with the Express backend (with `refresh=true`)
     - Inspecting data format and quality
     - Debugging data loading issues
     
+    **Parameters:**
+    - **refresh**: Fetch from Express into a new snapshot first (only interactions newer than the last snapshot are fetched)
+    
     **Returns:**
+    - Snapshot version, creation time and newest interaction timestamp
     - Count of items and interactions
     - Sample records from both datasets (first 5 rows)
     """,
-    response_description="Sample data from backend",
+    response_description="Sample data from the latest snapshot",
+    tags=["Debug"]
+)
+def data_sample(refresh: bool = Query(False, description="Fetch from Express into a new snapshot first")):
+    """Display counts and sample rows of the latest data snapshot"""
+    snapshot = None if refresh else latest_snapshot()
+    if snapshot is None:
+        snapshot = refresh_snapshot()
+    return snapshot_summary(snapshot)
+
+@router.get(
+    "/cache",
+    summary="Recommendation cache statistics",
+    description="""
+    Returns hit/miss counters for the recommendation response cache.
+    
+    Entries are keyed by endpoint, id, `n` and model version, and are dropped whenever a new model version is loaded.
+    
+    **Returns:**
+    - Backend name, entry count and TTL
+    - Hits, misses, hit rate and number of invalidations since startup
+    - Inference executor load: requests in flight, rejected (503) and timed out (504)
+    """,
+    response_description="Cache statistics",
     tags=["Debug"]
 )
-def data_sample():
-    """Fetch and display sample data from the backend API"""
-    items, interactions = load_data_from_express()
-    return {
-        "items_count": len(items),
-        "interactions_count": len(interactions),
-        "items_head": items.head(5).to_dict(orient="records"),
-        "interactions_head": interactions.head(5).to_dict(orient="records")
-    }
+def cache_stats():
+    """Report recommendation cache and inference executor counters"""
+    return {**response_cache.stats(), "inference": inference.stats()}
@@ -0,0 +1,124 @@
+# app/routers/export.py
+import gzip
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from app.services.export import export_path, load_export_meta
+from app.services.model_manager import model_manager, version_dir
+
+router = APIRouter()
+# Decompressed bytes per chunk for clients that do not accept gzip
+STREAM_CHUNK_BYTES = 1 << 16
+
+
+def _decompressed(path: str):
+    with gzip.open(path, "rb") as f:
+        while True:
+            chunk = f.read(STREAM_CHUNK_BYTES)
+            if not chunk:
+                return
+            yield chunk
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Whether an Accept-Encoding header allows gzip: listed (or as x-gzip) with
+    q > 0, or covered by "*" with q > 0 when not listed at all.
+    """
+    weights = {}
+    for coding in accept_encoding.split(","):
+        name, *params = [part.strip() for part in coding.split(";")]
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name.lower()] = q
+    for name in ("gzip", "x-gzip", "*"):
+        if name in weights:
+            return weights[name] > 0
+    return False
+
+
+def _export_response(request: Request, kind: str):
+    # the export of the version this process serves, so it matches live responses
+    version = model_manager.get().version
+    path = export_path(version_dir(version), kind)
+    if path is None:
+        raise HTTPException(status_code=404, detail="No export for the served model version; run training first")
+    headers = {"X-Model-Version": version or "", "Vary": "Accept-Encoding"}
+    if _accepts_gzip(request.headers.get("accept-encoding", "")):
+        # the file is already gzipped: send it as is
+        return FileResponse(path, media_type="application/x-ndjson", headers={**headers, "Content-Encoding": "gzip"})
+    return StreamingResponse(_decompressed(path), media_type="application/x-ndjson", headers=headers)
+
+@router.get(
+    "",
+    summary="Describe the bulk export",
+    description="""
+    Returns what the bulk export of the served model version contains. Training writes the export right
+    before publishing a version, so it is available as soon as the training job has succeeded.
+
+    **Returns:**
+    - **version**: Served model version the export belongs to
+    - **users** / **items**: File name, row count, items per row (**n**), size in bytes and write time of each export
+    """,
+    response_description="Export description",
+    tags=["Export"]
+)
+def export_meta():
+    """Describe the exports of the served model version"""
+    version = model_manager.get().version
+    meta = load_export_meta(version_dir(version))
+    if not meta:
+        raise HTTPException(status_code=404, detail="No export for the served model version; run training first")
+    return {"version": version, **meta}
+
+@router.get(
+    "/users",
+    summary="Download precomputed user recommendations",
+    description="""
+    Streams the top recommendations of every user known to the model as NDJSON, one user per line:
+    `{"userId": "user-123", "items": ["place-1", "event-2"], "scores": [1.92, 1.71]}`.
+
+    Rankings are those of `/recommend/user/{user_id}` and `POST /recommend/users` with their default
+    parameters: collaborative, content and popularity scores blended, already-booked items left out.
+    Users without interactions are not listed; serve them `/recommend/popular`.
+
+    Intended for bulk-loading feeds into the backend database after each training run, instead of calling
+    `/recommend/user/{user_id}` per session. Send `Accept-Encoding: gzip` to receive the stored compressed file.
+
+    **Returns:**
+    - NDJSON stream; the `X-Model-Version` header names the model version it came from
+    - 404 if the served version has no export
+    """,
+    response_description="NDJSON user recommendations",
+    tags=["Export"]
+)
+def export_users(request: Request):
+    """Stream the user recommendations export"""
+    return _export_response(request, "users")
+
+@router.get(
+    "/items",
+    summary="Download precomputed similar items",
+    description="""
+    Streams the most content-similar items of every catalog item as NDJSON, one item per line:
+    `{"itemId": "place-1", "items": ["place-5", "place-9"], "scores": [0.48, 0.46]}`.
+
+    Same results as `/recommend/item/{item_id}` in content mode. Both exports are also rewritten by `POST /train/items`.
+
+    **Returns:**
+    - NDJSON stream; the `X-Model-Version` header names the model version it came from
+    - 404 if the served version has no export
+    """,
+    response_description="NDJSON similar items",
+    tags=["Export"]
+)
+def export_items(request: Request):
+    """Stream the similar items export"""
+    return _export_response(request, "items")
@@ -0,0 +1,26 @@
+# app/routers/metrics.py
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.utils.metrics import REGISTRY
+
+router = APIRouter()
+
+@router.get(
+    "",
+    summary="Prometheus metrics",
+    description="""
+    Exposes service metrics in the Prometheus text format.
+    
+    **Includes:**
+    - Request latency histograms per route, and time spent in model code per request
+    - Duration histograms of data fetch, training, similarity build and artifact load stages
+    - Served model version, load time and user/item counts
+    - Training job outcomes and rejected or timed-out inference requests
+    """,
+    response_class=PlainTextResponse,
+    response_description="Metrics in Prometheus text exposition format",
+    tags=["Metrics"]
+)
+def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
@@ -1,12 +1,56 @@
 # app/routers/recommend.py
 from fastapi import APIRouter, HTTPException, Query
-from typing import List
-from app.recommender.lightfm_model import LightFMRecommender
-from app.recommender.similarity import ContentSimilarity
+from typing import List, Optional
+from app.recommender.ranker import RankFilters
+from app.schemas import BatchRecommendationRequest
+from app.services.cache import response_cache
+from app.services.inference import inference
+from app.services.model_manager import model_manager
 
 router = APIRouter()
-_recommender = LightFMRecommender()
-_sim = ContentSimilarity()
+# cached responses belong to the model version that produced them
+model_manager.add_listener(response_cache.invalidate)
+
+
+# Model calls run on the inference executor, never on the event loop. Version
+# loads happen on the model manager's reload thread, outside either.
+def _user_recommendations(user_id: str, n: int, approximate: Optional[bool], rerank: bool, filters: RankFilters):
+    bundle = model_manager.get()
+    if rerank and bundle.ranker is not None:
+        compute = lambda: bundle.ranker.rank_for_user(user_id, n, filters, approximate)
+    elif filters.min_price is not None or filters.max_price is not None:
+        raise HTTPException(status_code=400,
+                            detail="Price filters need the ranking stage (rerank=true and a model with ranking data)")
+    else:
+        compute = lambda: bundle.recommender.recommend_for_user(
+            user_id, n, approximate=approximate, category=filters.category)
+    return response_cache.get_or_compute(
+        response_cache.key(f"user:{approximate}:{rerank}:{filters}", user_id, n, bundle.version), compute)
+
+def _batch_recommendations(user_ids: List[str], n: int, rerank: bool):
+    bundle = model_manager.get()
+    # same rankings as /recommend/user with its default parameters
+    if rerank and bundle.ranker is not None:
+        return bundle.ranker.rank_for_users(user_ids, n)
+    return bundle.recommender.recommend_for_users(user_ids, n)
+
+def _popular_items(n: int, category: Optional[str]):
+    bundle = model_manager.get()
+    return response_cache.get_or_compute(
+        response_cache.key("popular", category or "", n, bundle.version),
+        lambda: bundle.recommender.popular_items(n, category),
+    )
+
+def _similar_items(item_id: str, n: int, mode: str, filters: RankFilters):
+    bundle = model_manager.get()
+    if mode == "embedding":
+        compute = lambda: bundle.recommender.similar_items(item_id, n)
+    elif mode == "hybrid" and bundle.ranker is not None:
+        compute = lambda: bundle.ranker.rank_similar(item_id, n, filters)
+    else:
+        compute = lambda: bundle.similarity.most_similar(item_id, topn=n)
+    return response_cache.get_or_compute(
+        response_cache.key(f"item:{mode}:{filters}", item_id, n, bundle.version), compute)
 
 @router.get(
     "/user/{user_id}",
@@ -14,11 +58,20 @@ _sim = ContentSimilarity()
     description="""
     Returns personalized recommendations for a specific user based on their interaction history.
     
-    The recommendations are generated using a collaborative filtering model (LightFM) trained on user-item interactions.
+    Candidates come from a collaborative filtering model (LightFM) trained on user-item interactions, from items
+    similar in content to the user's recent interactions, and from popular items. The ranking stage blends the
+    three scores and applies the filters below.
     
     **Parameters:**
     - **user_id**: The unique identifier of the user
     - **n**: Number of recommendations to return (default: 10)
+    - **approximate**: Retrieve candidates from the approximate nearest-neighbor index over item embeddings
+      instead of scoring every item (default: automatic, on for large catalogs)
+    - **category**: Only recommend items of this category
+    - **min_price** / **max_price**: Only recommend items within this price range
+    - **exclude_booked**: Leave out items the user already booked (default: true)
+    - **rerank**: Set to false for plain LightFM scores. Only **category** applies to those: price filters are
+      rejected with 400 and booked items are not excluded. The same holds for models without ranking data.
     
     **Returns:**
     - List of recommended item IDs ranked by relevance
@@ -26,27 +79,98 @@ _sim = ContentSimilarity()
     response_description="User recommendations with item IDs",
     tags=["Recommendations"]
 )
-def recommend_user(
+async def recommend_user(
     user_id: str,
-    n: int = Query(default=10, ge=1, le=100, description="Number of recommendations")
+    n: int = Query(default=10, ge=1, le=100, description="Number of recommendations"),
+    approximate: Optional[bool] = Query(default=None, description="Use the ANN index (default: automatic)"),
+    category: Optional[str] = Query(default=None, description="Category filter"),
+    min_price: Optional[float] = Query(default=None, ge=0, description="Minimum item price"),
+    max_price: Optional[float] = Query(default=None, ge=0, description="Maximum item price"),
+    exclude_booked: bool = Query(default=True, description="Leave out items the user already booked"),
+    rerank: bool = Query(default=True, description="Apply the hybrid ranking stage")
 ):
     """Get personalized recommendations for a user"""
-    recs = _recommender.recommend_for_user(user_id, n)
+    filters = RankFilters(category, min_price, max_price, exclude_booked)
+    recs = await inference.run(_user_recommendations, user_id, n, approximate, rerank, filters)
     if recs is None:
         raise HTTPException(status_code=404, detail="Model not trained or user not found")
     return {"userId": user_id, "recommendations": recs}
 
+@router.get(
+    "/popular",
+    summary="Get popular items",
+    description="""
+    Returns the most popular items, as served to users without interaction history.
+    
+    Popularity is precomputed at training time from interaction weights (views, clicks, favorites,
+    bookings, reviews), with older interactions decayed exponentially.
+    
+    **Parameters:**
+    - **n**: Number of items to return (default: 10)
+    - **category**: Only return items of this category
+    
+    **Returns:**
+    - List of item IDs ranked by popularity score
+    """,
+    response_description="Popular items with IDs",
+    tags=["Recommendations"]
+)
+async def popular(
+    n: int = Query(default=10, ge=1, le=100, description="Number of items"),
+    category: Optional[str] = Query(default=None, description="Category filter")
+):
+    """Get the most popular items"""
+    recs = await inference.run(_popular_items, n, category)
+    if recs is None:
+        raise HTTPException(status_code=404, detail="Model not trained")
+    return {"category": category, "items": recs}
+
+@router.post(
+    "/users",
+    summary="Get personalized recommendations for many users",
+    description="""
+    Returns personalized recommendations for a batch of users in one call, ranked exactly as
+    `/recommend/user/{user_id}` ranks them with its default parameters.
+    
+    All known users are scored together with a single matrix product over the cached
+    LightFM user/item representations; the ranking stage then blends those scores with
+    content similarity and popularity and leaves out items each user already booked.
+    Unknown users receive cold-start recommendations.
+    
+    **Body:**
+    - **userIds**: List of user identifiers (max 1000)
+    - **n**: Number of recommendations per user (default: 10)
+    - **rerank**: Set to false for plain LightFM scores, as `/recommend/user/{user_id}?rerank=false`
+    
+    **Returns:**
+    - One entry per requested user, in request order
+    """,
+    response_description="Recommendations for every requested user",
+    tags=["Recommendations"]
+)
+async def recommend_users(payload: BatchRecommendationRequest):
+    """Get personalized recommendations for a batch of users"""
+    results = await inference.run(_batch_recommendations, payload.userIds, payload.n, payload.rerank)
+    if results is None:
+        raise HTTPException(status_code=404, detail="Model not trained")
+    return {"results": results}
+
 @router.get(
     "/item/{item_id}",
     summary="Find similar items",
     description="""
     Returns items similar to the specified item based on content features.
     
-    Uses content-based similarity (cosine similarity on item features) to find related places or events.
+    By default uses content-based similarity (cosine similarity on item features) to find related places or events.
+    With **mode=embedding** items are instead ranked by the dot product of their LightFM embeddings, i.e. by
+    how similarly users interact with them, served from the approximate nearest-neighbor index on large catalogs.
+    With **mode=hybrid** both similarities are blended with item popularity by the ranking stage.
     
     **Parameters:**
     - **item_id**: The unique identifier of the item (place or event)
     - **n**: Number of similar items to return (default: 8)
+    - **mode**: `content` (default), `embedding` or `hybrid`
+    - **category**, **min_price**, **max_price**: Filters, applied in `hybrid` mode
     
     **Returns:**
     - List of similar item IDs ranked by similarity score
@@ -54,12 +178,17 @@ def recommend_user(
     response_description="Similar items with IDs",
     tags=["Recommendations"]
 )
-def similar_item(
+async def similar_item(
     item_id: str,
-    n: int = Query(default=8, ge=1, le=50, description="Number of similar items")
+    n: int = Query(default=8, ge=1, le=50, description="Number of similar items"),
+    mode: str = Query(default="content", regex="^(content|embedding|hybrid)$", description="Similarity source"),
+    category: Optional[str] = Query(default=None, description="Category filter (hybrid mode)"),
+    min_price: Optional[float] = Query(default=None, ge=0, description="Minimum item price (hybrid mode)"),
+    max_price: Optional[float] = Query(default=None, ge=0, description="Maximum item price (hybrid mode)")
 ):
     """Find items similar to the given item"""
-    recs = _sim.most_similar(item_id, topn=n)
+    filters = RankFilters(category, min_price, max_price, exclude_booked=False)
+    recs = await inference.run(_similar_items, item_id, n, mode, filters)
     if recs is None:
         raise HTTPException(status_code=404, detail="No similarity data available")
     return {"itemId": item_id, "similar": recs}
@@ -1,8 +1,7 @@
 # app/routers/train.py
-from fastapi import APIRouter, BackgroundTasks
-from app.services.data_loader import load_data_from_express
-from app.recommender.lightfm_model import Trainer
-from app.utils.logger import logger
+from fastapi import APIRouter, HTTPException, Query
+from app.schemas import ItemsUpdateRequest
+from app.services.jobs import training_jobs
 
 router = APIRouter()
 
@@ -10,32 +9,104 @@ router = APIRouter()
     "/",
     summary="Train the recommendation model",
     description="""
-    Initiates model training in the background using the latest data from the backend API.
+    Initiates model training in a separate worker process using the latest data from the backend API.
     
     This endpoint:
     1. Fetches items (places/events) and user interactions from the Express backend
-    2. Trains a LightFM collaborative filtering model
+    2. Trains a LightFM collaborative filtering model. By default only interactions newer than the
+       current model's watermark are fetched and the existing model is trained further; a full
+       rebuild runs when **full=true** or when the last one is older than `ML_FULL_RETRAIN_HOURS`
     3. Computes content-based similarity matrices
-    4. Saves the trained models to disk
+    4. Writes the bulk export of recommendations and similar items (see `/export`)
+    5. Saves the trained models to a new versioned directory and publishes it atomically
     
-    **Note:** Training runs asynchronously in the background. Use the `/debug/status` endpoint to check if the model is ready.
+    **Note:** Training runs asynchronously, one job at a time. If a job is already running, its id is returned
+    instead of starting another one. Poll `/train/jobs/{job_id}` for progress; serving switches to the new
+    version once it is published, and the export of that version can be downloaded from `/export/users` and
+    `/export/items`.
     
     **Returns:**
-    - Status message indicating training has started
+    - Job id and status
     """,
-    response_description="Training status",
+    response_description="Training job",
     tags=["Training"]
 )
-def train(background: BackgroundTasks):
+def train(
+    full: bool = Query(default=False, description="Rebuild from scratch instead of training incrementally")
+):
     """
-    Start training in background; returns immediately.
+    Start training in a worker process; returns immediately.
     """
-    def _train_task():
-        logger.info("Load data")
-        items_df, interactions_df = load_data_from_express()
-        trainer = Trainer()
-        trainer.train(items_df, interactions_df)
-        logger.info("Training finished.")
+    job, created = training_jobs.submit(full=full)
+    if not created:
+        return {"status": "already_running", "jobId": job.job_id, "message": "A training job is already in progress"}
+    return {"status": "started", "jobId": job.job_id, "message": "Model training initiated in background"}
 
-    background.add_task(_train_task)
-    return {"status": "started", "message": "Model training initiated in background"}
+@router.post(
+    "/items",
+    summary="Update content similarity for new or edited items",
+    description="""
+    Publishes a new model version in which only the given items are re-vectorized with the saved TF-IDF
+    vectorizer: new items are appended, edited ones replaced, and only the neighbor lists they can affect
+    are recomputed. All other artifacts are shared with the current version.
+    
+    Call this when items are created or edited in the backend so that similar-item results include them
+    before the next training run. Training itself also picks up edited items and periodically refits
+    the vectorizer from scratch (`ML_CONTENT_REFIT_HOURS`).
+    
+    **Parameters:**
+    - **items**: Item records in the `/api/ml/items` export format (itemId, title, description, tags, ...)
+    
+    **Returns:**
+    - Job id and status; poll `/train/jobs/{job_id}`
+    - 409 if a training job is running; retry once it has finished
+    """,
+    response_description="Item update job",
+    tags=["Training"]
+)
+def update_items(payload: ItemsUpdateRequest):
+    """
+    Start a content-similarity update for the given items; returns immediately.
+    """
+    job, created = training_jobs.submit_items(payload.items)
+    if not created:
+        raise HTTPException(status_code=409, detail=f"Training job {job.job_id} is in progress; retry later")
+    return {"status": "started", "jobId": job.job_id, "message": f"Updating {len(payload.items)} items in background"}
+
+@router.get(
+    "/jobs",
+    summary="List training jobs",
+    description="""
+    Returns recent training jobs, newest first.
+    
+    **Returns:**
+    - Job id, kind (`train` or `items`), status (`running`, `succeeded`, `failed`), timestamps, published version and error if any
+    """,
+    response_description="Training jobs",
+    tags=["Training"]
+)
+def list_jobs():
+    """List recent training jobs"""
+    return {"jobs": [job.to_dict() for job in training_jobs.list()]}
+
+@router.get(
+    "/jobs/{job_id}",
+    summary="Get training job status",
+    description="""
+    Returns the status of a training job started with `POST /train` or `POST /train/items`.
+    
+    **Parameters:**
+    - **job_id**: Identifier returned by `POST /train` or `POST /train/items`
+    
+    **Returns:**
+    - Job status, timestamps, published version and error if any
+    """,
+    response_description="Training job status",
+    tags=["Training"]
+)
+def job_status(job_id: str):
+    """Get the status of a training job"""
+    job = training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    return job.to_dict()
@@ -5,6 +5,19 @@ class RecommendationResponse(BaseModel):
     userId: str = Field(..., example="user-123")
     recommendations: List[str] = Field(..., example=["place-1", "event-2"])
 
+class BatchRecommendationRequest(BaseModel):
+    userIds: List[str] = Field(..., min_items=1, max_items=1000, example=["user-123", "user-456"])
+    n: int = Field(10, ge=1, le=100, example=10)
+    rerank: bool = Field(True, example=True)
+
+class ItemsUpdateRequest(BaseModel):
+    items: List[Dict[str, Any]] = Field(..., min_items=1, max_items=5000,
+                                        example=[{"itemId": "event-7", "title": "Lake festival", "description": "",
+                                                  "tags": ["music", "lake"], "category": "event", "price": 150}])
+
+class BatchRecommendationResponse(BaseModel):
+    results: List[Dict[str, Any]]
+
 class SimilarItemResponse(BaseModel):
     itemId: str = Field(..., example="place-1")
     similar: List[str] = Field(..., example=["place-5", "place-9"])
@@ -0,0 +1,164 @@
+# app/serve.py
+"""
+Pre-forking server: one parent loads the published model version, then forks
+worker processes that serve app.main:app on a shared listening socket. Model
+arrays are memory-mapped files (see Trainer._save), so every worker maps the
+same page-cache pages, and anything the loaders keep on the heap is shared
+copy-on-write with the parent. Memory therefore stays roughly flat as workers
+are added.
+
+The parent also coordinates reloads: it polls CURRENT, loads a new version and
+touches its pages first, then sends SIGHUP so every worker swaps right away
+instead of at its next poll. Workers that exit unexpectedly are replaced.
+
+    python -m app.serve --workers 4 --port 8000
+"""
+import argparse
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import uvicorn
+from app.utils.helpers import touch_mapped
+from app.utils.logger import logger
+
+SERVE_WORKERS = int(os.getenv("ML_SERVE_WORKERS", str(os.cpu_count() or 1)))
+# Seconds between the parent's checks of CURRENT
+RELOAD_POLL_INTERVAL = float(os.getenv("ML_SERVE_RELOAD_POLL", "1.0"))
+# Seconds between a worker's checks that its parent is still alive
+PARENT_CHECK_INTERVAL = 1.0
+# Seconds a worker gets to finish in-flight requests on shutdown
+GRACEFUL_TIMEOUT = float(os.getenv("ML_SERVE_GRACEFUL_TIMEOUT", "30"))
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _preload(model_manager):
+    bundle = model_manager.refresh()
+    started = time.perf_counter()
+    touched = touch_mapped(bundle.recommender, bundle.similarity, bundle.ranker)
+    logger.info("Preloaded model version %s (%d mapped bytes touched in %.2fs)",
+                bundle.version or "unversioned", touched, time.perf_counter() - started)
+    return bundle
+
+
+def _exit_with_parent(parent: int):
+    """Shut the worker down gracefully if the supervisor dies without stopping it."""
+    while os.getppid() == parent:
+        time.sleep(PARENT_CHECK_INTERVAL)
+    logger.warning("Supervisor %d is gone; stopping worker %d", parent, os.getpid())
+    os.kill(os.getpid(), signal.SIGTERM)
+
+
+def _run_worker(sock: socket.socket, app, log_level: str, parent: int):
+    from app.services.model_manager import model_manager
+
+    threading.Thread(target=_exit_with_parent, args=(parent,), daemon=True).start()
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    # reload on the parent's signal, off the event loop thread
+    signal.signal(signal.SIGHUP, lambda *_: threading.Thread(target=model_manager.refresh, daemon=True).start())
+    config = uvicorn.Config(app, log_level=log_level, timeout_graceful_shutdown=GRACEFUL_TIMEOUT)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Supervisor:
+    def __init__(self, sock: socket.socket, workers: int, log_level: str):
+        self.sock = sock
+        self.workers = workers
+        self.log_level = log_level
+        self.children = set()
+        self.stopping = False
+
+    def spawn(self, app):
+        parent = os.getpid()
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                _run_worker(self.sock, app, self.log_level, parent)
+                code = 0
+            finally:
+                os._exit(code)
+        self.children.add(pid)
+        logger.info("Started worker %d", pid)
+
+    def signal_workers(self, signum: int):
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                self.children.discard(pid)
+
+    def reap(self):
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.children.clear()
+                return
+            if pid == 0:
+                return
+            self.children.discard(pid)
+            if not self.stopping:
+                logger.warning("Worker %d exited with status %d; replacing it", pid, status)
+
+    def stop(self, *_):
+        self.stopping = True
+
+    def run(self, app, model_manager, current_version):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        served = model_manager.get().version
+        while not self.stopping:
+            self.reap()
+            while len(self.children) < self.workers and not self.stopping:
+                self.spawn(app)
+            version = current_version()
+            if version != served:
+                served = version
+                # a version the parent cannot load is not pushed to the workers
+                if _preload(model_manager).version == version:
+                    self.signal_workers(signal.SIGHUP)
+            time.sleep(RELOAD_POLL_INTERVAL)
+
+        logger.info("Stopping %d workers", len(self.children))
+        self.signal_workers(signal.SIGTERM)
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT + 5
+        while self.children and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        self.signal_workers(signal.SIGKILL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=SERVE_WORKERS)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    # import and load in the parent so workers inherit both
+    from app.main import app
+    from app.services.model_manager import current_version, model_manager
+
+    sock = _bind(args.host, args.port)
+    _preload(model_manager)
+    logger.info("Serving on %s:%d with %d workers", args.host, args.port, args.workers)
+    Supervisor(sock, args.workers, args.log_level).run(app, model_manager, current_version)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
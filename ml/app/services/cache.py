@@ -0,0 +1,170 @@
+# app/services/cache.py
+import json
+import os
+from abc import ABC, abstractmethod
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+from app.utils.logger import logger
+
+CACHE_TTL = float(os.getenv("ML_CACHE_TTL", "300"))
+CACHE_MAX_ENTRIES = int(os.getenv("ML_CACHE_MAX_ENTRIES", "10000"))
+# e.g. redis://localhost:6379/0 to share entries between workers; empty = in-process only
+CACHE_URL = os.getenv("ML_CACHE_URL", "")
+
+
+class CacheBackend(ABC):
+    """Storage used by ResponseCache. Values are JSON-serialisable responses."""
+
+    name = "base"
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """The value stored under `key`, or None if missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float):
+        """Store `value` under `key` for `ttl` seconds."""
+
+    @abstractmethod
+    def clear(self):
+        """Drop every entry (or make them unreachable)."""
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+class LocalLRUBackend(CacheBackend):
+    """Bounded in-process LRU with per-entry expiry. Also the stand-in for a shared backend."""
+
+    name = "local"
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def size(self):
+        return len(self._entries)
+
+
+class RedisBackend(CacheBackend):
+    """Shared cache across workers. Requires the optional `redis` package."""
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "ml-cache:"):
+        import redis  # optional dependency
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self._client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self._client.set(self.prefix + key, json.dumps(value), ex=max(int(ttl), 1))
+
+    def clear(self):
+        # keys embed the model version, so entries of older versions are never
+        # read again and simply expire through their TTL
+        pass
+
+
+def _make_backend() -> CacheBackend:
+    if CACHE_URL.startswith("redis://") or CACHE_URL.startswith("rediss://"):
+        try:
+            return RedisBackend(CACHE_URL)
+        except Exception as e:
+            logger.warning("Shared cache unavailable (%s); using in-process cache", e)
+    return LocalLRUBackend()
+
+
+class ResponseCache:
+    """
+    Cache for recommendation responses keyed by (endpoint, id, n, model version).
+    Call invalidate() whenever a new model version is swapped in.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None, ttl: float = CACHE_TTL):
+        self.backend = backend or _make_backend()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(endpoint: str, item_or_user_id: str, n: int, version: Optional[str]) -> str:
+        return f"{endpoint}:{version or 'unversioned'}:{n}:{item_or_user_id}"
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.warning("Cache get failed: %s", e)
+            value = None
+        if value is not None:
+            self._count(hit=True)
+            return value
+        self._count(hit=False)
+        value = compute()
+        # None means "model not ready"; let that be retried
+        if value is not None:
+            try:
+                self.backend.set(key, value, self.ttl)
+            except Exception as e:
+                logger.warning("Cache set failed: %s", e)
+        return value
+
+    def invalidate(self, *_):
+        self.backend.clear()
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "backend": self.backend.name,
+                "entries": self.backend.size(),
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+response_cache = ResponseCache()
@@ -1,11 +1,15 @@
 # app/services/data_loader.py
 import os
+import threading
 import requests
-import math
 import pandas as pd
-from typing import Tuple, List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from app.utils.logger import logger
-from app.config import config 
+from app.utils.metrics import timed
+from app.config import config
 
 EXPRESS_BASE = config.EXPRESS_ML_URL
 ML_SECRET = config.ML_SECRET
@@ -15,68 +19,153 @@ HEADERS = {
     "Accept": "application/json"
 }
 
-def _fetch_all(endpoint: str, page_size: int = 1000) -> List[Dict]:
+# Pages fetched in parallel per endpoint; also the size of the connection pool
+FETCH_CONCURRENCY = int(os.getenv("ML_FETCH_CONCURRENCY", "4"))
+FETCH_RETRIES = 3
+FETCH_BACKOFF = 0.5
+# safety cap
+MAX_PAGES = 5000
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """Shared keep-alive session with a bounded pool and retry/backoff on transient errors."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=FETCH_RETRIES,
+                backoff_factor=FETCH_BACKOFF,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(["GET"]),
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(FETCH_CONCURRENCY, 1), max_retries=retry)
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+@timed("fetch.page")
+def _fetch_page(base_url: str, endpoint: str, page: int, page_size: int,
+                params: Optional[Dict[str, str]] = None) -> List[Dict]:
     """
-    Generic paginated fetcher from Express. Expects response.json() to contain:
+    Fetch one page from Express. Expects response.json() to contain:
     { status:"ok", count: N, items: [ ... ] } or for interactions { interactions: [...] }
     """
-    results = []
-    page = 1
-    while True:
-        url = f"{EXPRESS_BASE}/api/ml/{endpoint}?page={page}&pageSize={page_size}"
-        logger.info("Fetching ML data from %s", url)
-        r = requests.get(url, headers=HEADERS, timeout=30)
-        if r.status_code != 200:
-            logger.error("Failed fetching %s: %s %s", endpoint, r.status_code, r.text)
-            raise RuntimeError(f"Failed to fetch {endpoint}: {r.status_code}")
-        j = r.json()
-        # flexible handling
-        chunk = j.get("items") or j.get("interactions") or j.get("users") or []
-        if not chunk:
-            break
-        results.extend(chunk)
-        # if result size < page_size assume last page
-        if len(chunk) < page_size:
-            break
-        page += 1
-        # safety cap
-        if page > 5000:
-            break
-    return results
-
-def load_data_from_express() -> Tuple[pd.DataFrame, pd.DataFrame]:
+    url = f"{base_url}/api/ml/{endpoint}?page={page}&pageSize={page_size}"
+    logger.info("Fetching ML data from %s", url)
+    r = _get_session().get(url, params=params, timeout=30)
+    if r.status_code != 200:
+        logger.error("Failed fetching %s: %s %s", endpoint, r.status_code, r.text)
+        raise RuntimeError(f"Failed to fetch {endpoint}: {r.status_code}")
+    j = r.json()
+    # flexible handling
+    return j.get("items") or j.get("interactions") or j.get("users") or []
+
+
+def _fetch_chunks(endpoint: str, page_size: int, to_frame: Callable[[List[Dict]], pd.DataFrame],
+                  base_url: str = EXPRESS_BASE, concurrency: int = FETCH_CONCURRENCY,
+                  params: Optional[Dict[str, str]] = None) -> Iterator[pd.DataFrame]:
     """
-    Returns: items_df, interactions_df
-    Items must contain itemId, title, description, tags, category, price
-    Interactions must contain userId, itemId, interaction, timestamp
+    Paginated fetcher from Express. Keeps up to `concurrency` pages in flight and
+    yields each page, in order, as a typed DataFrame chunk, so raw JSON rows are
+    only held for the pages currently being fetched. An empty or short page is
+    taken as the last one.
     """
-    items = _fetch_all("items", page_size=500)
-    interactions = _fetch_all("interactions", page_size=1000)
+    concurrency = max(concurrency, 1)
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"fetch-{endpoint}") as pool:
+        pending = {}
+        next_page = 1
+        last_page = None
 
-    items_df = pd.DataFrame(items)
-    interactions_df = pd.DataFrame(interactions)
+        def _refill():
+            nonlocal next_page
+            while last_page is None and len(pending) < concurrency and next_page <= MAX_PAGES:
+                pending[next_page] = pool.submit(_fetch_page, base_url, endpoint, next_page, page_size, params)
+                next_page += 1
+
+        _refill()
+        page = 1
+        try:
+            while page in pending:
+                rows = pending.pop(page).result()
+                if len(rows) < page_size:
+                    last_page = page
+                if rows:
+                    yield to_frame(rows)
+                page += 1
+                _refill()
+        finally:
+            # pages requested past the last one (or after an error) are dropped
+            for future in pending.values():
+                future.cancel()
 
-    # normalize columns if necessary
-    if "tags" in items_df.columns and isinstance(items_df.loc[0,"tags"], list):
-        items_df["tags"] = items_df["tags"].apply(lambda t: ",".join(t) if isinstance(t, list) else (t or ""))
 
+def items_frame(rows: List[Dict]) -> pd.DataFrame:
+    """Item rows as returned by /api/ml/items, as a DataFrame with tags joined and numeric prices."""
+    df = pd.DataFrame.from_records(rows)
+    # normalize columns if necessary
+    if "tags" in df.columns:
+        df["tags"] = df["tags"].map(lambda t: ",".join(t) if isinstance(t, list) else (t or ""))
     # ensure price numeric
-    if "price" in items_df.columns:
-        items_df["price"] = pd.to_numeric(items_df["price"], errors="coerce").fillna(0.0)
+    if "price" in df.columns:
+        df["price"] = pd.to_numeric(df["price"], errors="coerce").fillna(0.0).astype("float64")
+    return df
 
-    # ensure interactions canonical names
-    if "interaction" in interactions_df.columns:
-        interactions_df["interaction"] = interactions_df["interaction"].str.lower().fillna("view")
-    else:
-        interactions_df["interaction"] = "view"
 
+def _interactions_frame(rows: List[Dict]) -> pd.DataFrame:
+    df = pd.DataFrame.from_records(rows)
     # ensure required columns exist
     for c in ["userId", "itemId", "interaction", "timestamp"]:
-        if c not in interactions_df.columns:
-            interactions_df[c] = None
+        if c not in df.columns:
+            df[c] = None
+    df["userId"] = df["userId"].fillna("").astype(str)
+    df["itemId"] = df["itemId"].fillna("").astype(str)
+    # ensure interactions canonical names
+    df["interaction"] = df["interaction"].fillna("view").astype(str).str.lower()
+    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", utc=True, format="ISO8601")
+    return df
+
+
+def _concat(chunks: Iterator[pd.DataFrame]) -> pd.DataFrame:
+    frames = list(chunks)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_data_from_express(base_url: str = EXPRESS_BASE,
+                           concurrency: int = FETCH_CONCURRENCY,
+                           since: Optional[pd.Timestamp] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Returns: items_df, interactions_df
+    Items must contain itemId, title, description, tags, category, price
+    Interactions must contain userId, itemId, interaction, timestamp
+    Interaction ids and types come back as categoricals, timestamps as UTC datetimes.
+    With `since`, only interactions at or after that timestamp are returned.
+    """
+    params = {"since": since.isoformat()} if since is not None else None
+    with timed("fetch.items"):
+        items_df = _concat(_fetch_chunks("items", 500, items_frame, base_url, concurrency))
+    with timed("fetch.interactions"):
+        interactions_df = _concat(_fetch_chunks("interactions", 1000, _interactions_frame, base_url, concurrency, params))
+
+    # If no interactions present, return empty df with the expected columns
+    if interactions_df.empty:
+        interactions_df = _interactions_frame([])
+    elif since is not None:
+        # older Express builds ignore `since`; filter here as well
+        interactions_df = interactions_df[interactions_df["timestamp"] >= since].reset_index(drop=True)
+    for c in ["userId", "itemId", "interaction"]:
+        interactions_df[c] = interactions_df[c].astype("category")
 
-    # If no interactions present, return empty df
-    return items_df.fillna(""), interactions_df.fillna("")
+    return items_df.fillna(""), interactions_df
 
 # Small helper used by debug endpoints
 def quick_preview():
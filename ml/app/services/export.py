@@ -0,0 +1,125 @@
+# app/services/export.py
+import gzip
+import json
+import os
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterator, Optional
+from app.recommender.lightfm_model import LightFMRecommender
+from app.recommender.ranker import RANK_BATCH_ROWS, HybridRanker, RankFilters, RankingData
+from app.recommender.similarity import ContentSimilarity
+from app.utils.logger import logger
+from app.utils.metrics import timed
+
+# Layout (inside each model version directory, served by /export):
+#   export_users.ndjson.gz   {"userId": ..., "items": [...], "scores": [...]} per known user,
+#                            ranked like /recommend/user with its default parameters
+#   export_items.ndjson.gz   {"itemId": ..., "items": [...], "scores": [...]} per catalog item
+#   export_meta.json         row counts, sizes and when the files were written
+# Files are written under a temporary name and renamed, so an export hardlinked
+# from another version is replaced rather than rewritten.
+USER_EXPORT_FILE = "export_users.ndjson.gz"
+ITEM_EXPORT_FILE = "export_items.ndjson.gz"
+EXPORT_META_FILE = "export_meta.json"
+EXPORT_FILES = {"users": USER_EXPORT_FILE, "items": ITEM_EXPORT_FILE}
+# Recommendations per user and similar items per item (capped at the neighbor table width)
+EXPORT_USER_N = int(os.getenv("ML_EXPORT_USER_N", "20"))
+EXPORT_SIMILAR_N = int(os.getenv("ML_EXPORT_SIMILAR_N", "10"))
+EXPORT_SCORE_DECIMALS = 4
+# Rows of the neighbor table converted per block
+EXPORT_ITEM_BLOCK_ROWS = 4096
+
+
+def _all_ids(index) -> np.ndarray:
+    """Every id of an IdIndex as an object array, so rows translate with one fancy index."""
+    return np.array(index.ids_of(range(len(index))), dtype=object)
+
+
+def _user_rows(ranker: HybridRanker, n: int) -> Iterator[Dict[str, Any]]:
+    user_map = ranker.recommender.user_map
+    filters = RankFilters()
+    for start in range(0, len(user_map), RANK_BATCH_ROWS):
+        users = np.arange(start, min(start + RANK_BATCH_ROWS, len(user_map)))
+        for user_id, recs in zip(user_map.ids_of(users), ranker.rank_for_indices(users, n, filters)):
+            yield {"userId": user_id, "items": [r["itemId"] for r in recs],
+                   "scores": [round(r["score"], EXPORT_SCORE_DECIMALS) for r in recs]}
+
+
+def _item_rows(similarity: ContentSimilarity, n: int) -> Iterator[Dict[str, Any]]:
+    item_ids = _all_ids(similarity.item_ids)
+    n = min(n, similarity.neighbor_idx.shape[1])
+    for start in range(0, len(item_ids), EXPORT_ITEM_BLOCK_ROWS):
+        stop = start + EXPORT_ITEM_BLOCK_ROWS
+        idx = np.asarray(similarity.neighbor_idx[start:stop, :n])
+        scores = np.round(np.asarray(similarity.neighbor_scores[start:stop, :n], dtype=np.float64),
+                          EXPORT_SCORE_DECIMALS)
+        for item_id, row, row_scores in zip(item_ids[start:stop], idx, scores):
+            # rows of tiny catalogs are padded with -1
+            keep = row >= 0
+            yield {"itemId": item_id, "items": item_ids[row[keep]].tolist(), "scores": row_scores[keep].tolist()}
+
+
+def _write_ndjson(path: str, rows: Iterator[Dict[str, Any]]) -> int:
+    tmp = f"{path}.tmp"
+    count = 0
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, separators=(",", ":")))
+            f.write("\n")
+            count += 1
+    os.replace(tmp, path)
+    return count
+
+
+def load_export_meta(model_dir: str) -> Dict[str, Any]:
+    path = os.path.join(model_dir, EXPORT_META_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _export_entry(model_dir: str, name: str, rows: int, n: int) -> Dict[str, Any]:
+    return {"file": name, "rows": rows, "n": n, "bytes": os.path.getsize(os.path.join(model_dir, name)),
+            "written_at": pd.Timestamp.now(tz="UTC").isoformat()}
+
+
+@timed("export.write")
+def write_exports(model_dir: str, user_n: int = EXPORT_USER_N, similar_n: int = EXPORT_SIMILAR_N) -> Dict[str, Any]:
+    """
+    Precompute the bulk export of the artifacts in `model_dir`: the top
+    `user_n` ranked recommendations for every user in the user map (the
+    ranking stage with its default filters, collaborative candidates
+    retrieved in blocks of RANK_BATCH_ROWS users) and the top `similar_n`
+    content neighbors of every item, as gzipped NDJSON. Returns the export meta.
+    """
+    meta = {}
+    similarity = ContentSimilarity(model_dir)
+    recommender = LightFMRecommender(model_dir)
+    ranking = RankingData.load(model_dir) if recommender.is_ready() else None
+    if ranking is not None:
+        ranker = HybridRanker(recommender, similarity, ranking)
+        with timed("export.users"):
+            rows = _write_ndjson(os.path.join(model_dir, USER_EXPORT_FILE), _user_rows(ranker, user_n))
+        meta["users"] = _export_entry(model_dir, USER_EXPORT_FILE, rows, user_n)
+    else:
+        logger.warning("No ranking data in %s; skipping the user export", model_dir)
+    if similarity.is_ready() and similarity.neighbor_idx is not None:
+        with timed("export.items"):
+            rows = _write_ndjson(os.path.join(model_dir, ITEM_EXPORT_FILE), _item_rows(similarity, similar_n))
+        meta["items"] = _export_entry(model_dir, ITEM_EXPORT_FILE, rows,
+                                      min(similar_n, similarity.neighbor_idx.shape[1]))
+
+    path = os.path.join(model_dir, EXPORT_META_FILE)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+    logger.info("Wrote exports to %s (%s)", model_dir,
+                ", ".join(f"{kind}: {entry['rows']} rows" for kind, entry in meta.items()) or "nothing to export")
+    return meta
+
+
+def export_path(model_dir: str, kind: str) -> Optional[str]:
+    """Path of the `kind` ("users" or "items") export in `model_dir`, if it was written."""
+    path = os.path.join(model_dir, EXPORT_FILES[kind])
+    return path if os.path.exists(path) else None
@@ -0,0 +1,93 @@
+# app/services/inference.py
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from app.utils.metrics import INFERENCE_REJECTED, INFERENCE_SECONDS
+
+# Threads running model code; kept small so serving never saturates the CPU
+INFERENCE_WORKERS = int(os.getenv("ML_INFERENCE_WORKERS", "4"))
+# Requests allowed to wait for a worker before new ones are rejected with 503
+INFERENCE_QUEUE = int(os.getenv("ML_INFERENCE_QUEUE", "64"))
+# Seconds a request may wait for its result before answering 504
+INFERENCE_TIMEOUT = float(os.getenv("ML_INFERENCE_TIMEOUT", "2.0"))
+
+
+class InferenceOverloaded(Exception):
+    """All inference slots are taken; the caller should retry later."""
+
+
+class InferenceTimeout(Exception):
+    """The inference call did not finish within the request timeout."""
+
+
+class InferenceExecutor:
+    """
+    Bounded thread pool for model calls from async handlers. At most
+    workers + queue_size calls are admitted at once; a slot is only freed when
+    the call actually finishes, so timed-out work still counts against the
+    limit and overload turns into fast 503s instead of a growing backlog.
+    """
+
+    def __init__(self, workers: int = INFERENCE_WORKERS, queue_size: int = INFERENCE_QUEUE,
+                 timeout: float = INFERENCE_TIMEOUT):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.timeout = timeout
+        self.rejected = 0
+        self.timeouts = 0
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            INFERENCE_REJECTED.inc(reason="overloaded")
+            raise InferenceOverloaded()
+        with self._lock:
+            self._in_flight += 1
+
+        def _call():
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                INFERENCE_SECONDS.observe(time.perf_counter() - started, function=fn.__name__)
+                with self._lock:
+                    self._in_flight -= 1
+                self._slots.release()
+
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._pool, _call)
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+            raise
+        try:
+            # shield: a timeout must not cancel a queued call, or its slot would never be released
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            INFERENCE_REJECTED.inc(reason="timeout")
+            raise InferenceTimeout()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "in_flight": self._in_flight,
+                "timeout_seconds": self.timeout,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+            }
+
+
+inference = InferenceExecutor()
@@ -0,0 +1,234 @@
+# app/services/jobs.py
+import fcntl
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from app.recommender.lightfm_model import MODELS_DIR
+from app.services.model_manager import model_manager
+from app.services.training import run_item_update_job, run_training_job
+from app.utils.logger import logger
+from app.utils.metrics import TRAINING_JOBS, replay_stages
+
+# Layout (next to CURRENT, shared by every serving worker on the host):
+#   models/jobs/<job_id>.json   state of each job, replaced atomically on every change
+#   models/jobs/LOCK            flock held by the worker running the active job, which
+#                               also writes the job id into it; released by the kernel
+#                               if that worker dies
+JOBS_DIR = os.path.join(MODELS_DIR, "jobs")
+LOCK_FILE = "LOCK"
+# Finished jobs kept for the status endpoint
+MAX_FINISHED_JOBS = 50
+# Attempts (50 ms apart) to read the active job id a worker writes right after taking the lock
+LOCK_READ_ATTEMPTS = 20
+# Niceness added to the training process so serving keeps CPU priority
+TRAINING_NICENESS = int(os.getenv("ML_TRAINING_NICENESS", "10"))
+
+
+def _init_training_process():
+    try:
+        os.nice(TRAINING_NICENESS)
+    except (AttributeError, OSError):
+        pass
+
+
+@dataclass
+class TrainingJob:
+    job_id: str
+    full: bool
+    # "train" (POST /train) or "items" (POST /train/items)
+    kind: str = "train"
+    items: Optional[int] = None
+    status: str = "queued"
+    submitted_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    version: Optional[str] = None
+    error: Optional[str] = None
+    # serving worker that submitted the job
+    pid: Optional[int] = None
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def _alive(pid: Optional[int]) -> bool:
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class TrainingJobs:
+    """
+    Runs training in a separate worker process, one job at a time, so a LightFM
+    fit never competes with request handling for the GIL or the serving threads.
+    A new request while a job is queued or running returns that job instead.
+    Job state and the one-job lock live in JOBS_DIR, so every serving worker
+    sees the same jobs and only one of them trains at a time.
+    """
+
+    def __init__(self, jobs_dir: str = JOBS_DIR):
+        self.jobs_dir = jobs_dir
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # job run by this process, and its descriptor of the held LOCK file
+        self._active: Optional[TrainingJob] = None
+        self._lock_fd: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: never fork a process that is running serving threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_training_process,
+            )
+        return self._pool
+
+    def submit(self, full: bool = False) -> Tuple[TrainingJob, bool]:
+        """Start a job, or return the active one. The flag tells whether a new job was created."""
+        return self._submit(TrainingJob(job_id=uuid.uuid4().hex, full=full), run_training_job, full)
+
+    def submit_items(self, items: List[Dict[str, Any]]) -> Tuple[TrainingJob, bool]:
+        """Start a content-similarity update for new/edited items, or return the active job."""
+        job = TrainingJob(job_id=uuid.uuid4().hex, full=False, kind="items", items=len(items))
+        return self._submit(job, run_item_update_job, items)
+
+    def _submit(self, job: TrainingJob, fn, *args) -> Tuple[TrainingJob, bool]:
+        with self._lock:
+            if self._active is not None:
+                return self._active, False
+            if not self._acquire(job.job_id):
+                return self._locked_job(), False
+            self._active = job
+            job.status = "running"
+            job.pid = os.getpid()
+            self._save(job)
+            self._forget_old_jobs()
+            try:
+                future = self._executor().submit(fn, *args)
+            except Exception as e:
+                self._finish_failed(job, e)
+                raise
+        future.add_done_callback(lambda f: self._finish(job, f))
+        logger.info("Training job %s submitted (kind=%s, full=%s)", job.job_id, job.kind, job.full)
+        return job, True
+
+    def _finish(self, job: TrainingJob, future: Future):
+        try:
+            version, stages = future.result()
+        except Exception as e:
+            logger.error("Training job %s failed: %s", job.job_id, e)
+            if isinstance(e, BrokenProcessPool):
+                # the worker died (e.g. OOM); start a fresh pool for the next job
+                self._pool = None
+            self._finish_failed(job, e)
+            return
+        replay_stages(stages)
+        # serve the new version here before reporting success; other workers poll CURRENT
+        model_manager.refresh()
+        job.version = version
+        job.status = "succeeded"
+        self._close(job)
+
+    def _finish_failed(self, job: TrainingJob, error: Exception):
+        job.status = "failed"
+        job.error = str(error) or type(error).__name__
+        self._close(job)
+
+    def _close(self, job: TrainingJob):
+        job.finished_at = time.time()
+        self._save(job)
+        TRAINING_JOBS.inc(status=job.status)
+        with self._lock:
+            if self._active is job:
+                self._active = None
+                self._release()
+        logger.info("Training job %s %s (version %s)", job.job_id, job.status, job.version)
+
+    def _acquire(self, job_id: str) -> bool:
+        """Take the host-wide training lock for `job_id`; False if another process holds it."""
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        fd = os.open(os.path.join(self.jobs_dir, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.pwrite(fd, job_id.encode("ascii"), 0)
+        self._lock_fd = fd
+        return True
+
+    def _release(self):
+        os.ftruncate(self._lock_fd, 0)
+        fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+        os.close(self._lock_fd)
+        self._lock_fd = None
+
+    def _locked_job(self) -> TrainingJob:
+        """The job of the process holding the lock."""
+        path = os.path.join(self.jobs_dir, LOCK_FILE)
+        for _ in range(LOCK_READ_ATTEMPTS):
+            with open(path) as f:
+                job = self.get(f.read().strip())
+            if job is not None:
+                return job
+            time.sleep(0.05)
+        # the holder has not written its job yet
+        return TrainingJob(job_id="", full=False, status="running")
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def _save(self, job: TrainingJob):
+        tmp = f"{self._path(job.job_id)}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(job.to_dict(), f)
+        os.replace(tmp, self._path(job.job_id))
+
+    def _forget_old_jobs(self):
+        finished = [j for j in self.list() if j.finished_at is not None]
+        finished.sort(key=lambda j: j.finished_at)
+        for job in finished[:-MAX_FINISHED_JOBS]:
+            try:
+                os.remove(self._path(job.job_id))
+            except FileNotFoundError:
+                pass
+
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        if not re.fullmatch(r"[0-9a-f]{32}", job_id):
+            return None
+        try:
+            with open(self._path(job_id)) as f:
+                job = TrainingJob(**json.load(f))
+        except (FileNotFoundError, ValueError, TypeError):
+            return None
+        if job.finished_at is None and not _alive(job.pid):
+            # the serving worker that ran it is gone, and with it the training process
+            job.status = "failed"
+            job.error = "worker process exited"
+            job.finished_at = time.time()
+            self._save(job)
+        return job
+
+    def list(self) -> List[TrainingJob]:
+        if not os.path.isdir(self.jobs_dir):
+            return []
+        jobs = [self.get(name[:-len(".json")]) for name in os.listdir(self.jobs_dir) if name.endswith(".json")]
+        return sorted((j for j in jobs if j is not None), key=lambda j: j.submitted_at, reverse=True)
+
+
+training_jobs = TrainingJobs()
@@ -0,0 +1,217 @@
+# app/services/model_manager.py
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.recommender.lightfm_model import LightFMRecommender, MODELS_DIR
+from app.recommender.ranker import HybridRanker, RankingData
+from app.recommender.similarity import ContentSimilarity
+from app.utils.helpers import memory_footprint, process_rss_bytes
+from app.utils.logger import logger
+from app.utils.metrics import record_stage, set_model_gauges
+
+# Layout:
+#   models/versions/<version>/...   one directory of artifacts per training run
+#   models/CURRENT                  name of the published version (replaced atomically)
+# When CURRENT is missing the flat artifacts directly under models/ are served.
+VERSIONS_DIR = os.path.join(MODELS_DIR, "versions")
+CURRENT_FILE = os.path.join(MODELS_DIR, "CURRENT")
+KEEP_VERSIONS = 3
+# Seconds between checks of CURRENT; keeps the per-request cost to a clock read
+RELOAD_CHECK_INTERVAL = float(os.getenv("ML_RELOAD_CHECK_INTERVAL", "2.0"))
+
+
+def version_dir(version: Optional[str]) -> str:
+    return os.path.join(VERSIONS_DIR, version) if version else MODELS_DIR
+
+
+def current_version() -> Optional[str]:
+    try:
+        with open(CURRENT_FILE) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def new_version_dir() -> Tuple[str, str]:
+    """Create an empty, unpublished artifact directory for a training run."""
+    # microsecond timestamps keep version names unique and sortable by age
+    version = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S-%f")
+    path = version_dir(version)
+    os.makedirs(path)
+    return version, path
+
+
+def link_version_files(src_dir: str, dst_dir: str, exclude=()):
+    """
+    Populate `dst_dir` with hardlinks to the files of `src_dir`, except
+    `exclude`, for a version that only rewrites some artifacts. Linked files
+    must never be written in place; writers replace them with new files.
+    """
+    exclude = set(exclude)
+    for name in os.listdir(src_dir):
+        src = os.path.join(src_dir, name)
+        if name in exclude or not os.path.isfile(src):
+            continue
+        try:
+            os.link(src, os.path.join(dst_dir, name))
+        except OSError:
+            shutil.copy2(src, os.path.join(dst_dir, name))
+
+
+def publish_version(version: str):
+    """
+    Point CURRENT at a fully written version directory. os.replace is atomic,
+    so readers see either the old or the new version, never a partial one.
+    """
+    tmp = f"{CURRENT_FILE}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, CURRENT_FILE)
+    logger.info("Published model version %s", version)
+    _prune_versions(keep={version})
+
+
+def _prune_versions(keep):
+    if not os.path.isdir(VERSIONS_DIR):
+        return
+    versions = sorted(os.listdir(VERSIONS_DIR))
+    stale = [v for v in versions[:-KEEP_VERSIONS] if v not in keep]
+    for v in stale:
+        # workers still holding an old version keep their open/mmapped files
+        shutil.rmtree(version_dir(v), ignore_errors=True)
+
+
+@dataclass
+class ModelBundle:
+    version: Optional[str]
+    recommender: LightFMRecommender
+    similarity: ContentSimilarity
+    ranker: Optional[HybridRanker] = None
+    loaded_at: float = field(default_factory=time.time)
+    load_seconds: float = 0.0
+    # array bytes of the loaded objects, measured once at load (see memory_footprint)
+    memory: Dict[str, int] = field(default_factory=dict)
+
+    def is_ready(self):
+        return self.recommender.is_ready() or self.similarity.is_ready()
+
+    def users(self) -> int:
+        return len(self.recommender.user_map) if self.recommender.is_ready() else 0
+
+    def items(self) -> int:
+        if self.recommender.is_ready():
+            return len(self.recommender.item_map)
+        return len(self.similarity.item_ids) if self.similarity.is_ready() else 0
+
+    def status(self) -> Dict[str, Any]:
+        """Readiness, version, sizes and memory of this bundle; reads no artifacts."""
+        return {
+            "lightfm_loaded": self.recommender.is_ready(),
+            "similarity_ready": self.similarity.is_ready(),
+            "ranker_ready": self.ranker is not None,
+            "version": self.version,
+            "loaded_at": datetime.fromtimestamp(self.loaded_at, timezone.utc).isoformat(),
+            "load_seconds": round(self.load_seconds, 3),
+            "users": self.users(),
+            "items": self.items(),
+            "content_items": len(self.similarity.item_ids) if self.similarity.is_ready() else 0,
+            "memory": {**self.memory, "process_rss_bytes": process_rss_bytes()},
+        }
+
+
+class ModelManager:
+    """
+    Process-wide registry of the served models. Requests grab the current
+    bundle with get(); a new version is loaded next to the old one on a
+    background thread and swapped in with a single reference assignment, so
+    requests never wait for a load and in-flight ones finish on the bundle
+    they started with. Each version is loaded at most once per process.
+    """
+
+    def __init__(self, check_interval: float = RELOAD_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._bundle: Optional[ModelBundle] = None
+        self._failed_version: Optional[str] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self._reloader: Optional[threading.Thread] = None
+        self._listeners: List[Callable[[ModelBundle], None]] = []
+
+    def add_listener(self, callback: Callable[[ModelBundle], None]):
+        """Call `callback(bundle)` after every swap, e.g. to drop cached responses."""
+        self._listeners.append(callback)
+
+    def get(self) -> ModelBundle:
+        """
+        The current bundle. A newer published version is loaded in the
+        background and served once complete; only the very first load, with
+        nothing to serve meanwhile, blocks (startup normally does it first).
+        """
+        if self._bundle is None:
+            return self.refresh()
+        now = time.monotonic()
+        if now - self._last_check >= self.check_interval:
+            self._last_check = now
+            if self._stale(current_version()) and not self._lock.locked():
+                self._reloader = threading.Thread(target=self._maybe_reload, name="model-reload", daemon=True)
+                self._reloader.start()
+        return self._bundle
+
+    def refresh(self) -> ModelBundle:
+        """Check CURRENT immediately, e.g. right after publishing a version."""
+        self._last_check = time.monotonic()
+        self._maybe_reload(wait=True)
+        return self._bundle
+
+    def _stale(self, version: Optional[str]) -> bool:
+        bundle = self._bundle
+        return bundle is None or (version != bundle.version and version != self._failed_version)
+
+    def _maybe_reload(self, wait: bool = False):
+        version = current_version()
+        bundle = self._bundle
+        if not self._stale(version):
+            return
+        # only one thread loads; the rest keep serving the old bundle meanwhile
+        if not self._lock.acquire(blocking=wait or bundle is None):
+            return
+        try:
+            bundle = self._bundle
+            if bundle is not None and version == bundle.version:
+                return
+            self._load(version)
+        finally:
+            self._lock.release()
+
+    def _load(self, version: Optional[str]):
+        started = time.perf_counter()
+        path = version_dir(version)
+        recommender, similarity = LightFMRecommender(path), ContentSimilarity(path)
+        ranking = RankingData.load(path) if recommender.is_ready() else None
+        ranker = HybridRanker(recommender, similarity, ranking) if ranking is not None else None
+        candidate = ModelBundle(version, recommender, similarity, ranker)
+        if self._bundle is not None and self._bundle.is_ready() and not candidate.is_ready():
+            logger.error("Model version %s failed to load; keeping %s", version, self._bundle.version)
+            self._failed_version = version
+            return
+        candidate.memory = memory_footprint(recommender, similarity, ranker)
+        candidate.load_seconds = seconds = time.perf_counter() - started
+        self._bundle = candidate
+        self._failed_version = None
+        record_stage("load.model", seconds)
+        set_model_gauges(version, candidate.loaded_at, users=candidate.users(), items=candidate.items())
+        logger.info("Loaded model version %s in %.2fs", version or "unversioned", seconds)
+        for callback in self._listeners:
+            try:
+                callback(candidate)
+            except Exception as e:
+                logger.warning("Model swap listener failed: %s", e)
+
+
+model_manager = ModelManager()
@@ -0,0 +1,222 @@
+# app/services/snapshots.py
+import json
+import os
+import shutil
+import pandas as pd
+import pyarrow as pa
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+from app.recommender.lightfm_model import MODELS_DIR
+from app.services.data_loader import load_data_from_express
+from app.utils.logger import logger
+from app.utils.metrics import timed
+
+# Layout:
+#   data/snapshots/<version>/items.parquet
+#   data/snapshots/<version>/interactions/part-00000.parquet ...   one part per fetch
+#   data/snapshots/<version>/meta.json                             counts, watermark, head rows
+# A snapshot is extended by hardlinking the previous parts and adding one for
+# the interactions fetched since its watermark.
+SNAPSHOTS_DIR = os.getenv("ML_SNAPSHOTS_DIR", os.path.join(MODELS_DIR, "..", "data", "snapshots"))
+ITEMS_FILE = "items.parquet"
+INTERACTIONS_DIR = "interactions"
+META_FILE = "meta.json"
+KEEP_SNAPSHOTS = 3
+# Interactions are refetched in full once the last full fetch is this old
+# (picks up deletions and edits on the Express side)
+REFETCH_HOURS = float(os.getenv("ML_SNAPSHOT_REFETCH_HOURS", "168"))
+HEAD_ROWS = 5
+# Every interaction part is written and read with this schema. Plain strings, not
+# the categoricals the loader returns: their dictionary index width varies with
+# the cardinality of each fetch, and parts of different widths do not read back
+# as one dataset.
+INTERACTIONS_SCHEMA = pa.schema([
+    ("userId", pa.string()),
+    ("itemId", pa.string()),
+    ("interaction", pa.string()),
+    ("timestamp", pa.timestamp("us", tz="UTC")),
+])
+INTERACTION_KEY = [field.name for field in INTERACTIONS_SCHEMA]
+
+
+def _jsonable(df: pd.DataFrame) -> list:
+    return json.loads(df.to_json(orient="records", date_format="iso"))
+
+
+def _parquet_ready(df: pd.DataFrame) -> pd.DataFrame:
+    """Nested values (lists, dicts) in object columns are stored as JSON strings."""
+    df = df.copy()
+    for c in df.columns:
+        if df[c].dtype == object and not df[c].map(lambda v: isinstance(v, str)).all():
+            df[c] = df[c].map(lambda v: v if isinstance(v, str) else json.dumps(v, default=str))
+    return df
+
+
+@dataclass
+class Snapshot:
+    version: str
+    path: str
+    meta: Dict[str, Any]
+
+    @classmethod
+    def open(cls, version: str) -> Optional["Snapshot"]:
+        path = os.path.join(SNAPSHOTS_DIR, version)
+        try:
+            with open(os.path.join(path, META_FILE)) as f:
+                return cls(version, path, json.load(f))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    @property
+    def watermark(self) -> Optional[pd.Timestamp]:
+        value = self.meta.get("watermark")
+        return pd.Timestamp(value) if value else None
+
+    def items(self) -> pd.DataFrame:
+        return pd.read_parquet(os.path.join(self.path, ITEMS_FILE))
+
+    def interactions(self, since: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """
+        All interactions, or only those at or after `since` (row groups older
+        than that are skipped). Inclusive, because interactions sharing the
+        watermark timestamp can arrive after the fetch that set it.
+        """
+        filters = [("timestamp", ">=", since)] if since is not None else None
+        df = pd.read_parquet(os.path.join(self.path, INTERACTIONS_DIR), filters=filters, schema=INTERACTIONS_SCHEMA)
+        for c in ["userId", "itemId", "interaction"]:
+            df[c] = df[c].astype("category")
+        return df
+
+
+def _new_rows(base: Snapshot, interactions: pd.DataFrame) -> pd.DataFrame:
+    """`interactions` minus rows `base` already holds; only rows at its watermark can overlap."""
+    if base.watermark is None or not len(interactions):
+        return interactions
+    held = base.interactions(since=base.watermark)[INTERACTION_KEY].astype({c: str for c in INTERACTION_KEY[:3]})
+    keys = interactions[INTERACTION_KEY].astype({c: str for c in INTERACTION_KEY[:3]})
+    seen = keys.merge(held.drop_duplicates(), how="left", indicator=True)["_merge"].eq("both").to_numpy()
+    return interactions[~seen]
+
+
+def latest_snapshot() -> Optional[Snapshot]:
+    if not os.path.isdir(SNAPSHOTS_DIR):
+        return None
+    for version in sorted(os.listdir(SNAPSHOTS_DIR), reverse=True):
+        if not version.startswith("."):
+            snapshot = Snapshot.open(version)
+            if snapshot is not None:
+                return snapshot
+    return None
+
+
+@timed("snapshot.write")
+def write_snapshot(items_df: pd.DataFrame, new_interactions: pd.DataFrame,
+                   base: Optional[Snapshot] = None, source: Optional[str] = None) -> Snapshot:
+    """
+    Write a new snapshot version: `items_df` as the full catalog and
+    `new_interactions` appended to the parts of `base` (or alone without one),
+    minus rows `base` already holds. The directory is written under a hidden
+    name and renamed into place.
+    """
+    if base is not None:
+        new_interactions = _new_rows(base, new_interactions)
+    os.makedirs(SNAPSHOTS_DIR, exist_ok=True)
+    version = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S-%f")
+    tmp = os.path.join(SNAPSHOTS_DIR, f".{version}.tmp")
+    parts_dir = os.path.join(tmp, INTERACTIONS_DIR)
+    os.makedirs(parts_dir)
+
+    parts = 0
+    interactions_count = 0
+    if base is not None:
+        base_parts = os.path.join(base.path, INTERACTIONS_DIR)
+        for name in sorted(os.listdir(base_parts)):
+            os.link(os.path.join(base_parts, name), os.path.join(parts_dir, name))
+            parts += 1
+        interactions_count = base.meta["interactions_count"]
+    if len(new_interactions) or parts == 0:
+        new_interactions.to_parquet(os.path.join(parts_dir, f"part-{parts:05d}.parquet"), index=False,
+                                    schema=INTERACTIONS_SCHEMA)
+        parts += 1
+    _parquet_ready(items_df).to_parquet(os.path.join(tmp, ITEMS_FILE), index=False)
+
+    now = datetime.now(timezone.utc).isoformat()
+    newest = new_interactions["timestamp"].max() if len(new_interactions) else None
+    watermarks = [w for w in (base.watermark if base else None, newest) if w is not None and not pd.isna(w)]
+    head = base.meta["interactions_head"] if base else _jsonable(new_interactions.head(HEAD_ROWS))
+    meta = {
+        "version": version,
+        "created_at": now,
+        "full_fetch_at": base.meta["full_fetch_at"] if base else now,
+        "base_version": base.version if base else None,
+        "source": source,
+        "watermark": max(watermarks).isoformat() if watermarks else None,
+        "items_count": len(items_df),
+        "interactions_count": interactions_count + len(new_interactions),
+        "interaction_parts": parts,
+        "items_head": _jsonable(items_df.head(HEAD_ROWS)),
+        "interactions_head": head,
+        "dtypes": {"items": {c: str(t) for c, t in items_df.dtypes.items()},
+                   "interactions": {c: str(t) for c, t in new_interactions.dtypes.items()}},
+    }
+    with open(os.path.join(tmp, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+    os.rename(tmp, os.path.join(SNAPSHOTS_DIR, version))
+    logger.info("Wrote data snapshot %s (%d items, %d interactions)", version,
+                meta["items_count"], meta["interactions_count"])
+    _prune_snapshots(keep={version})
+    return Snapshot(version, os.path.join(SNAPSHOTS_DIR, version), meta)
+
+
+def _prune_snapshots(keep):
+    versions = sorted(v for v in os.listdir(SNAPSHOTS_DIR) if not v.startswith("."))
+    for v in versions[:-KEEP_SNAPSHOTS]:
+        if v not in keep:
+            # parts are hardlinked, so newer snapshots keep their data
+            shutil.rmtree(os.path.join(SNAPSHOTS_DIR, v), ignore_errors=True)
+
+
+def _refetch_due(snapshot: Snapshot) -> bool:
+    if snapshot.watermark is None:
+        return True
+    age = pd.Timestamp.now(tz="UTC") - pd.Timestamp(snapshot.meta["full_fetch_at"])
+    return age >= pd.Timedelta(hours=REFETCH_HOURS)
+
+
+def refresh_snapshot(full: bool = False) -> Snapshot:
+    """
+    Fetch from Express into a new snapshot. Items are always fetched in full;
+    interactions only from the latest snapshot's watermark on, unless `full`
+    is set or the last full fetch is older than REFETCH_HOURS.
+    """
+    base = latest_snapshot()
+    if full or base is None or _refetch_due(base):
+        base = None
+    items_df, interactions_df = load_data_from_express(since=base.watermark if base else None)
+    return write_snapshot(items_df, interactions_df, base=base, source="express")
+
+
+def load_training_data(since: Optional[pd.Timestamp] = None,
+                       full: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Same frames as load_data_from_express, served from a refreshed snapshot:
+    the fetch only covers what the latest snapshot does not have yet.
+    """
+    snapshot = refresh_snapshot(full=full)
+    with timed("snapshot.read"):
+        return snapshot.items(), snapshot.interactions(since=since)
+
+
+def snapshot_summary(snapshot: Snapshot) -> Dict[str, Any]:
+    """Counts and head rows straight from meta.json, without reading the data files."""
+    meta = snapshot.meta
+    return {
+        "snapshot": snapshot.version,
+        "created_at": meta["created_at"],
+        "watermark": meta["watermark"],
+        "items_count": meta["items_count"],
+        "interactions_count": meta["interactions_count"],
+        "items_head": meta["items_head"],
+        "interactions_head": meta["interactions_head"],
+    }
@@ -0,0 +1,102 @@
+# app/services/training.py
+import os
+import pandas as pd
+from typing import Any, Dict, List, Tuple
+from app.recommender.lightfm_model import Trainer, load_train_meta
+from app.recommender.similarity import SIMILARITY_FILES, ContentSimilarity
+from app.services.data_loader import items_frame
+from app.services.export import write_exports
+from app.services.model_manager import (current_version, link_version_files, new_version_dir, publish_version,
+                                        version_dir)
+from app.services.snapshots import load_training_data
+from app.utils.logger import logger
+from app.utils.metrics import capture_stages, timed
+
+# Incremental runs fall back to a full rebuild once the last one is this old
+FULL_RETRAIN_HOURS = float(os.getenv("ML_FULL_RETRAIN_HOURS", "168"))
+
+
+def _write_exports(model_dir: str):
+    # the model is usable without its bulk export, so a failed export does not fail the run
+    try:
+        write_exports(model_dir)
+    except Exception as e:
+        logger.error("Writing exports to %s failed: %s", model_dir, e)
+
+
+def _full_rebuild_due(meta) -> bool:
+    last_full = meta.get("last_full_at")
+    if not last_full or not meta.get("watermark"):
+        return True
+    age = pd.Timestamp.now(tz="UTC") - pd.Timestamp(last_full)
+    return age >= pd.Timedelta(hours=FULL_RETRAIN_HOURS)
+
+
+@timed("training.run")
+def run_training(full: bool = False) -> str:
+    """
+    Refresh the data snapshot, train into a new version directory, write its
+    bulk export and publish it. Unless `full` is set (or a scheduled full
+    rebuild is due), only interactions from the published model's
+    watermark are fetched and the previous model is trained further. Returns
+    the published version.
+    """
+    base_version = current_version()
+    base_dir = version_dir(base_version)
+    meta = load_train_meta(base_dir) if base_version else {}
+    incremental = not full and base_version is not None and not _full_rebuild_due(meta)
+    since = pd.Timestamp(meta["watermark"]) if incremental else None
+
+    logger.info("Load data (%s)", f"incremental since {since}" if incremental else "full")
+    # a full rebuild also refetches, so the snapshot picks up deleted and edited rows
+    items_df, interactions_df = load_training_data(since=since, full=not incremental)
+
+    version, model_dir = new_version_dir()
+    trainer = Trainer()
+    if incremental:
+        trainer.train_incremental(items_df, interactions_df, base_dir, model_dir)
+        # re-vectorizes only new and edited items unless a full refit is due
+        ContentSimilarity(model_dir).update(items_df, base_dir)
+    else:
+        trainer.train(items_df, interactions_df, model_dir=model_dir)
+        ContentSimilarity(model_dir).build(items_df)
+    _write_exports(model_dir)
+    publish_version(version)
+    return version
+
+
+@timed("training.items")
+def run_item_update(items: List[Dict[str, Any]]) -> str:
+    """
+    Publish a version that differs from the current one only in the content
+    similarity of `items` (new or edited catalog entries, as returned by the
+    Express items export). Every other artifact is hardlinked.
+    """
+    base_version = current_version()
+    if base_version is None:
+        raise ValueError("no published model version to update")
+    base_dir = version_dir(base_version)
+    version, model_dir = new_version_dir()
+    link_version_files(base_dir, model_dir, exclude=SIMILARITY_FILES)
+    ContentSimilarity(model_dir).update(items_frame(items).fillna(""), base_dir, full_catalog=False)
+    # rankings use content similarity too, so both exports are rewritten
+    _write_exports(model_dir)
+    publish_version(version)
+    return version
+
+
+def run_training_job(full: bool = False) -> Tuple[str, List[Tuple[str, float]]]:
+    """
+    Worker-process entry point: run_training plus the stage timings it
+    recorded, which the serving process adds to its own metrics.
+    """
+    with capture_stages() as stages:
+        version = run_training(full)
+    return version, stages
+
+
+def run_item_update_job(items: List[Dict[str, Any]]) -> Tuple[str, List[Tuple[str, float]]]:
+    """Worker-process entry point for run_item_update, like run_training_job."""
+    with capture_stages() as stages:
+        version = run_item_update(items)
+    return version, stages
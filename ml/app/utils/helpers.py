@@ -0,0 +1,81 @@
+# app/utils/helpers.py
+import os
+import numpy as np
+
+
+def top_n_indices(scores: np.ndarray, n: int) -> np.ndarray:
+    """
+    Indices of the n largest scores along the last axis, highest first.
+    Uses argpartition so only the selected n entries get sorted.
+    Works for a single score vector or a (rows, items) score matrix.
+    """
+    scores = np.asarray(scores)
+    size = scores.shape[-1]
+    n = min(int(n), size)
+    if n <= 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.int64)
+    if n < size:
+        part = np.argpartition(-scores, n - 1, axis=-1)[..., :n]
+    else:
+        part = np.broadcast_to(np.arange(size), scores.shape).copy()
+    order = np.argsort(-np.take_along_axis(scores, part, axis=-1), axis=-1, kind="stable")
+    return np.take_along_axis(part, order, axis=-1)
+
+
+def _is_mapped(array: np.ndarray) -> bool:
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base if isinstance(array.base, np.ndarray) else None
+    return False
+
+
+def _reachable_arrays(objects):
+    """Numpy arrays reachable from `objects` through attributes of app and scipy.sparse objects, once each."""
+    seen = set()
+    stack = list(objects)
+    while stack:
+        obj = stack.pop()
+        if obj is None or id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, np.ndarray):
+            yield obj
+        elif type(obj).__module__.startswith(("app.", "scipy.sparse")) and hasattr(obj, "__dict__"):
+            stack.extend(vars(obj).values())
+
+
+def memory_footprint(*objects) -> dict:
+    """
+    Bytes held in numpy arrays reachable from `objects`, split into
+    memory-mapped artifact files (page cache, shared between processes) and
+    private heap arrays.
+    """
+    totals = {"mapped_bytes": 0, "heap_bytes": 0}
+    for array in _reachable_arrays(objects):
+        totals["mapped_bytes" if _is_mapped(array) else "heap_bytes"] += int(array.nbytes)
+    return totals
+
+
+def touch_mapped(*objects, page_size: int = 4096) -> int:
+    """
+    Read one byte per page of every memory-mapped array reachable from
+    `objects`, so the pages are resident (and mapped in this process, hence
+    in children forked from it) before requests need them. Returns the bytes touched.
+    """
+    touched = 0
+    for array in _reachable_arrays(objects):
+        if _is_mapped(array) and array.nbytes and array.flags.c_contiguous:
+            flat = array.reshape(-1).view(np.uint8)
+            int(flat[::page_size].sum())
+            touched += flat.nbytes
+    return touched
+
+
+def process_rss_bytes():
+    """Resident set size of this process (Linux), or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
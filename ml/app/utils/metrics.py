@@ -0,0 +1,219 @@
+# app/utils/metrics.py
+"""
+Minimal in-process metrics with Prometheus text exposition, rendered by
+GET /metrics. Each process keeps its own values; the training worker reports
+its stage timings back to the serving process (see app/services/jobs.py).
+"""
+import threading
+import time
+from contextlib import ContextDecorator, contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Request-sized buckets (seconds)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Pipeline stages run from milliseconds (artifact loads) to tens of minutes (fits)
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 1800.0, 3600.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._values: Dict[Tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Tuple:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.label_names)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key: Tuple, value) -> List[str]:
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value)
+
+    def _render_value(self, key, value):
+        counts, total = value
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+        labels = _format_labels(self.label_names, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "ml_http_request_duration_seconds", "HTTP request latency by route, including serialization.",
+    ["method", "route", "status"]))
+INFERENCE_SECONDS = REGISTRY.register(Histogram(
+    "ml_inference_duration_seconds", "Time spent in model code per request, excluding queueing.",
+    ["function"]))
+INFERENCE_REJECTED = REGISTRY.register(Counter(
+    "ml_inference_rejected_total", "Requests rejected (503) or timed out (504) by the inference executor.",
+    ["reason"]))
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "ml_stage_duration_seconds", "Duration of data loading, training, similarity build and artifact load stages.",
+    ["stage"], buckets=STAGE_BUCKETS))
+TRAINING_JOBS = REGISTRY.register(Counter(
+    "ml_training_jobs_total", "Finished training jobs by outcome.", ["status"]))
+MODEL_INFO = REGISTRY.register(Gauge(
+    "ml_model_info", "Served model version (value is always 1).", ["version"]))
+MODEL_LOADED_AT = REGISTRY.register(Gauge(
+    "ml_model_loaded_timestamp_seconds", "Unix time the served model version was loaded."))
+MODEL_USERS = REGISTRY.register(Gauge("ml_model_users", "Users known to the served model."))
+MODEL_ITEMS = REGISTRY.register(Gauge("ml_model_items", "Items in the served model's catalog."))
+
+# stage timings recorded while a capture is active (see capture_stages)
+_captures: List[List[Tuple[str, float]]] = []
+_captures_lock = threading.Lock()
+
+
+class timed(ContextDecorator):
+    """
+    Record the duration of a block or function call as a pipeline stage:
+
+        with timed("train.fit"):
+            ...
+
+        @timed("similarity.build")
+        def build(...):
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._started = 0.0
+
+    def _recreate_cm(self):
+        # fresh instance per decorated call, so concurrent calls keep their own start time
+        return timed(self.stage)
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record_stage(self.stage, time.perf_counter() - self._started)
+        return False
+
+
+def record_stage(stage: str, seconds: float):
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    with _captures_lock:
+        for captured in _captures:
+            captured.append((stage, seconds))
+
+
+@contextmanager
+def capture_stages():
+    """Collect the (stage, seconds) pairs recorded in this process while the block runs."""
+    captured: List[Tuple[str, float]] = []
+    with _captures_lock:
+        _captures.append(captured)
+    try:
+        yield captured
+    finally:
+        with _captures_lock:
+            _captures.remove(captured)
+
+
+def replay_stages(stages: Iterable[Tuple[str, float]]):
+    """Observe stage timings captured in another process (e.g. the training worker)."""
+    for stage, seconds in stages:
+        STAGE_SECONDS.observe(seconds, stage=stage)
+
+
+def set_model_gauges(version: Optional[str], loaded_at: float, users: int, items: int):
+    MODEL_INFO.clear()
+    MODEL_INFO.set(1, version=version or "unversioned")
+    MODEL_LOADED_AT.set(loaded_at)
+    MODEL_USERS.set(users)
+    MODEL_ITEMS.set(items)
@@ -0,0 +1,73 @@
+# benchmarks/bench_ann.py
+"""
+Recall and latency of the IVF index in app/recommender/ann.py against
+brute-force dot products, on synthetic LightFM-shaped item vectors
+([embedding, bias]) and user queries ([embedding, 1]). Run from ml/:
+
+    python -m benchmarks.bench_ann --items 10000 100000 --nprobe 4 8 16 32
+"""
+import argparse
+import json
+import time
+import numpy as np
+from app.recommender.ann import IVFIndex
+from app.utils.helpers import top_n_indices
+from benchmarks.common import percentiles, write_report
+
+
+def _synthetic_vectors(n: int, dim: int, rng) -> np.ndarray:
+    # clustered embeddings, like items sharing audiences, plus a small bias column
+    centers = rng.normal(0, 1, (max(8, n // 500), dim))
+    vectors = centers[rng.integers(0, len(centers), n)] + rng.normal(0, 0.5, (n, dim))
+    biases = rng.normal(0, 0.1, (n, 1))
+    return np.hstack([vectors, biases]).astype(np.float32)
+
+
+def run(item_counts, nprobes, dim, k, queries, seed=0):
+    rng = np.random.default_rng(seed)
+    results = []
+    for n in item_counts:
+        items = _synthetic_vectors(n, dim, rng)
+        users = np.hstack([_synthetic_vectors(queries, dim, rng)[:, :-1], np.ones((queries, 1), np.float32)])
+
+        started = time.perf_counter()
+        index = IVFIndex.build(items, seed=seed)
+        build_s = time.perf_counter() - started
+
+        truth, brute_times = [], []
+        for q in users:
+            t = time.perf_counter()
+            truth.append(set(top_n_indices(items @ q, k).tolist()))
+            brute_times.append(time.perf_counter() - t)
+        row = {"items": n, "dim": dim, "k": k, "cells": index.n_cells, "build_s": round(build_s, 3),
+               "brute_force": percentiles(brute_times), "ivf": []}
+
+        for nprobe in nprobes:
+            hits, times = 0, []
+            for q, expected in zip(users, truth):
+                t = time.perf_counter()
+                found, _ = index.search(q, k, nprobe=nprobe)
+                times.append(time.perf_counter() - t)
+                hits += len(expected.intersection(found.tolist()))
+            row["ivf"].append({"nprobe": nprobe, f"recall@{k}": round(hits / (k * queries), 4), **percentiles(times)})
+        results.append(row)
+        print(json.dumps(row))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--dim", type=int, default=30, help="LightFM no_components")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+    results = run(args.items, args.nprobe, args.dim, args.k, args.queries)
+    if args.output:
+        write_report(args.output, "ann", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/bench_interactions.py
+"""
+Compare the vectorized interaction weighting in Trainer.train against the
+previous iterrows() loop. Run from the ml/ directory:
+
+    python -m benchmarks.bench_interactions --sizes 10000 100000 1000000
+"""
+import argparse
+import json
+from lightfm.data import Dataset
+from app.recommender.lightfm_model import INTERACTION_WEIGHTS, build_weight_matrices
+from benchmarks.common import timed, write_report
+from benchmarks.synthetic import make_interactions, make_items
+
+
+def _legacy(dataset, interactions_df):
+    interaction_records = []
+    for _, r in interactions_df.iterrows():
+        user = str(r["userId"])
+        item = str(r["itemId"])
+        itype = str(r.get("interaction", "view")).lower()
+        weight = INTERACTION_WEIGHTS.get(itype, 1.0)
+        interaction_records.append((user, item, weight))
+    return dataset.build_interactions(interaction_records)
+
+
+def run(sizes, legacy_limit):
+    results = []
+    for n in sizes:
+        n_items = max(100, n // 50)
+        n_users = max(100, n // 20)
+        items_df = make_items(n_items)
+        interactions_df = make_interactions(n, n_users, n_items)
+        dataset = Dataset()
+        dataset.fit(interactions_df["userId"].unique().tolist(), items_df["itemId"].tolist())
+
+        (_, weights), vectorized_s = timed(
+            build_weight_matrices, interactions_df, dataset._user_id_mapping, dataset._item_id_mapping
+        )
+        row = {"interactions": n, "users": n_users, "items": n_items, "vectorized_s": round(vectorized_s, 4)}
+        if n <= legacy_limit:
+            (_, legacy_weights), legacy_s = timed(_legacy, dataset, interactions_df)
+            # duplicates are summed in both cases once converted to CSR
+            assert abs(weights.tocsr() - legacy_weights.tocsr()).max() < 1e-4
+            row["legacy_s"] = round(legacy_s, 4)
+            row["speedup"] = round(legacy_s / vectorized_s, 1)
+        results.append(row)
+        print(json.dumps(row))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--legacy-limit", type=int, default=1_000_000,
+                        help="skip the slow iterrows() path above this many interactions")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+    results = run(args.sizes, args.legacy_limit)
+    if args.output:
+        write_report(args.output, "interactions", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/bench_pipeline.py
+"""
+End-to-end cost of the ML pipeline at several data scales: Trainer.train and
+ContentSimilarity.build time, artifact size, artifact load time, and per-call
+latency of recommend_for_user, recommend_for_users, the HybridRanker's
+rank_for_user and rank_for_users (what /recommend/user and /recommend/users
+serve by default), most_similar and similar_items. Scales are ITEMSxUSERSxINTERACTIONS. Run from ml/:
+
+    python -m benchmarks.bench_pipeline --scales 1000x2000x50000 10000x20000x500000 --output pipeline.json
+"""
+import argparse
+import json
+import shutil
+import tempfile
+import numpy as np
+from app.recommender.lightfm_model import LightFMRecommender, Trainer
+from app.recommender.ranker import HybridRanker, RankingData
+from app.recommender.similarity import ContentSimilarity
+from benchmarks.common import dir_size, percentiles, timed, write_report
+from benchmarks.synthetic import make_interactions, make_items
+
+
+def _parse_scale(text: str):
+    try:
+        items, users, interactions = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected ITEMSxUSERSxINTERACTIONS, got {text!r}")
+    return items, users, interactions
+
+
+def _latencies(fn, args_list):
+    samples = []
+    for args in args_list:
+        _, seconds = timed(fn, *args)
+        samples.append(seconds)
+    return percentiles(samples)
+
+
+def run_scale(n_items, n_users, n_interactions, epochs, queries, n, seed=0):
+    items_df = make_items(n_items, seed)
+    interactions_df = make_interactions(n_interactions, n_users, n_items, seed)
+    model_dir = tempfile.mkdtemp(prefix="bench-pipeline-")
+    try:
+        _, train_s = timed(Trainer().train, items_df, interactions_df, epochs=epochs, model_dir=model_dir)
+        _, similarity_s = timed(ContentSimilarity(model_dir=model_dir).build, items_df)
+        recommender, load_recommender_s = timed(LightFMRecommender, model_dir)
+        similarity, load_similarity_s = timed(ContentSimilarity, model_dir)
+        ranking, load_ranking_s = timed(RankingData.load, model_dir)
+        ranker = HybridRanker(recommender, similarity, ranking)
+
+        rng = np.random.default_rng(seed)
+        known_users = interactions_df["userId"].unique()
+        users = known_users[rng.integers(0, len(known_users), queries)].tolist()
+        items = items_df["itemId"].to_numpy()[rng.integers(0, n_items, queries)].tolist()
+        batch = [users[i:i + 100] for i in range(0, len(users), 100)]
+
+        return {
+            "items": n_items,
+            "users": n_users,
+            "interactions": n_interactions,
+            "epochs": epochs,
+            "train_s": round(train_s, 3),
+            "similarity_build_s": round(similarity_s, 3),
+            "artifact_bytes": dir_size(model_dir),
+            "load_recommender_s": round(load_recommender_s, 4),
+            "load_similarity_s": round(load_similarity_s, 4),
+            "load_ranking_s": round(load_ranking_s, 4),
+            "latency": {
+                "recommend_for_user": _latencies(recommender.recommend_for_user, [(u, n) for u in users]),
+                "recommend_for_user_cold": _latencies(recommender.recommend_for_user,
+                                                      [(f"unknown-{i}", n) for i in range(queries)]),
+                "recommend_for_users_100": _latencies(recommender.recommend_for_users, [(b, n) for b in batch]),
+                "rank_for_user": _latencies(ranker.rank_for_user, [(u, n) for u in users]),
+                "rank_for_user_cold": _latencies(ranker.rank_for_user, [(f"unknown-{i}", n) for i in range(queries)]),
+                "rank_for_users_100": _latencies(ranker.rank_for_users, [(b, n) for b in batch]),
+                "most_similar": _latencies(similarity.most_similar, [(i, n) for i in items]),
+                "similar_items": _latencies(recommender.similar_items, [(i, n) for i in items]),
+            },
+        }
+    finally:
+        shutil.rmtree(model_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=_parse_scale, nargs="+",
+                        default=[_parse_scale("1000x2000x50000"), _parse_scale("10000x20000x500000")])
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=500, help="calls per latency measurement")
+    parser.add_argument("--n", type=int, default=10, help="results per call")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+    results = []
+    for n_items, n_users, n_interactions in args.scales:
+        row = run_scale(n_items, n_users, n_interactions, args.epochs, args.queries, args.n)
+        results.append(row)
+        print(json.dumps(row))
+    if args.output:
+        write_report(args.output, "pipeline", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
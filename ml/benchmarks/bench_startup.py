@@ -0,0 +1,131 @@
+# benchmarks/bench_startup.py
+"""
+Per-worker cold start: time and memory for a fresh process to load the
+serving models (LightFMRecommender + ContentSimilarity) from the array format
+written by Trainer._save, versus the pickled format of older model
+directories (LightFM model, Dataset and id-map dicts via joblib). Each
+measurement runs in a new interpreter, like a newly started worker. Run from ml/:
+
+    python -m benchmarks.bench_startup --scales 10000x100000x1000000 --output startup.json
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import joblib
+from app.recommender import lightfm_model as lfm
+from app.recommender import similarity as sim
+from app.recommender.id_index import IdIndex
+from app.recommender.lightfm_model import Trainer
+from app.recommender.similarity import ContentSimilarity
+from benchmarks.bench_pipeline import _parse_scale
+from benchmarks.common import dir_size, write_report
+from benchmarks.synthetic import make_interactions, make_items
+
+# Runs in the child interpreter; prints one JSON line
+_CHILD = """
+import json, os, resource, sys, time
+
+def rss_kb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:  # not Linux: peak RSS instead
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+started = time.perf_counter()
+from app.recommender.lightfm_model import LightFMRecommender
+from app.recommender.similarity import ContentSimilarity
+imported = time.perf_counter()
+rss_before = rss_kb()
+rec = LightFMRecommender(sys.argv[1])
+similarity = ContentSimilarity(sys.argv[1])
+loaded = time.perf_counter()
+assert rec.is_ready() and similarity.is_ready()
+rec.recommend_for_user(next(iter(sys.argv[2:])), 10)
+first = time.perf_counter()
+rss_after = rss_kb()
+print(json.dumps({"import_s": imported - started, "load_s": loaded - imported,
+                  "first_request_s": first - loaded, "load_rss_kb": rss_after - rss_before}))
+"""
+
+# Files only the array format has; removed to emulate an older model directory
+_ARRAY_ONLY = [lfm.USER_EMB_FILE, lfm.USER_BIAS_FILE, lfm.ITEM_BIAS_FILE, sim.TFIDF_SHAPE_FILE]
+
+
+def _write_pickled_copy(model_dir: str, items_df) -> str:
+    """Copy of `model_dir` laid out like a pre-array model directory."""
+    legacy_dir = model_dir + "-pickled"
+    shutil.copytree(model_dir, legacy_dir)
+    dataset = joblib.load(os.path.join(model_dir, lfm.DATASET_FILE))
+    joblib.dump(dataset._user_id_mapping, os.path.join(legacy_dir, lfm.USER_MAP_FILE))
+    joblib.dump(dataset._item_id_mapping, os.path.join(legacy_dir, lfm.ITEM_MAP_FILE))
+    joblib.dump(dict(enumerate(items_df["itemId"].tolist())), os.path.join(legacy_dir, sim.ITEMS_IDX_FILE))
+    for name in os.listdir(legacy_dir):
+        is_id_index = any(name.startswith(p + "_") for p in
+                          (lfm.USER_IDS_PREFIX, lfm.ITEM_IDS_PREFIX, sim.CONTENT_IDS_PREFIX))
+        if is_id_index or name in _ARRAY_ONLY:
+            os.remove(os.path.join(legacy_dir, name))
+    return legacy_dir
+
+
+def _measure(model_dir: str, user_id: str, repeats: int):
+    runs = []
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-c", _CHILD, model_dir, user_id], capture_output=True,
+                             text=True, check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    # best of n: the first run may still be reading the files from disk
+    best = min(runs, key=lambda r: r["load_s"])
+    return {k: round(v, 4) if isinstance(v, float) else v for k, v in best.items()}
+
+
+def run_scale(n_items, n_users, n_interactions, epochs, repeats, seed=0):
+    items_df = make_items(n_items, seed)
+    interactions_df = make_interactions(n_interactions, n_users, n_items, seed)
+    model_dir = tempfile.mkdtemp(prefix="bench-startup-")
+    legacy_dir = None
+    try:
+        Trainer().train(items_df, interactions_df, epochs=epochs, model_dir=model_dir)
+        ContentSimilarity(model_dir=model_dir).build(items_df)
+        legacy_dir = _write_pickled_copy(model_dir, items_df)
+        user_id = IdIndex.load(model_dir, lfm.USER_IDS_PREFIX).id_of(0)
+        arrays = _measure(model_dir, user_id, repeats)
+        pickled = _measure(legacy_dir, user_id, repeats)
+        return {
+            "items": n_items,
+            "users": n_users,
+            "interactions": n_interactions,
+            "artifact_bytes": dir_size(model_dir),
+            "arrays": arrays,
+            "pickled": pickled,
+            "load_speedup": round(pickled["load_s"] / max(arrays["load_s"], 1e-9), 1),
+        }
+    finally:
+        shutil.rmtree(model_dir, ignore_errors=True)
+        if legacy_dir:
+            shutil.rmtree(legacy_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=_parse_scale, nargs="+",
+                        default=[_parse_scale("5000x50000x500000"), _parse_scale("10000x200000x2000000")])
+    parser.add_argument("--epochs", type=int, default=1, help="fit quality does not matter here")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+    results = []
+    for n_items, n_users, n_interactions in args.scales:
+        row = run_scale(n_items, n_users, n_interactions, args.epochs, args.repeats)
+        results.append(row)
+        print(json.dumps(row))
+    if args.output:
+        write_report(args.output, "startup", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
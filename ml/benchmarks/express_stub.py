@@ -0,0 +1,104 @@
+# benchmarks/express_stub.py
+"""
+Local stand-in for the Express /api/ml/* export endpoints, serving synthetic
+data with the same pagination and response shape. Useful for exercising
+app.services.data_loader without a database:
+
+    python -m benchmarks.express_stub --items 5000 --users 2000 --interactions 200000 --port 3999
+    EXPRESS_ML_URL=http://localhost:3999 uvicorn app.main:app
+"""
+import argparse
+import json
+import threading
+import time
+import pandas as pd
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from benchmarks.synthetic import make_interactions, make_items
+
+
+class ExpressStub:
+    """
+    Serves pre-rendered pages from an in-memory dataset on a background thread.
+    Interactions honor `since` like Express does, unless `honor_since` is off
+    (older builds). `failures` maps (endpoint, page) to the number of 503s
+    served for that page before it succeeds.
+    """
+
+    def __init__(self, items_df, interactions_df, port: int = 0, latency: float = 0.0,
+                 honor_since: bool = True, failures=None):
+        self.items = items_df.to_dict(orient="records")
+        self.interactions = interactions_df.to_dict(orient="records")
+        self.timestamps = pd.to_datetime(interactions_df["timestamp"], utc=True).reset_index(drop=True)
+        self.latency = latency
+        self.honor_since = honor_since
+        self.failures = dict(failures or {})
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                qs = parse_qs(url.query)
+                page = int(qs.get("page", ["1"])[0])
+                page_size = int(qs.get("pageSize", ["200"])[0])
+                key = url.path.rsplit("/", 1)[-1]
+                rows = {"items": stub.items, "interactions": stub.interactions}.get(key)
+                if rows is None:
+                    self.send_error(404)
+                    return
+                stub.requests += 1
+                if stub.failures.get((key, page), 0) > 0:
+                    stub.failures[key, page] -= 1
+                    self.send_error(503)
+                    return
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if key == "interactions" and "since" in qs and stub.honor_since:
+                    keep = (stub.timestamps >= pd.Timestamp(qs["since"][0])).to_numpy()
+                    rows = [row for row, kept in zip(rows, keep) if kept]
+                chunk = rows[(page - 1) * page_size: page * page_size]
+                body = json.dumps({"status": "ok", "count": len(chunk), key: chunk}, default=str).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--interactions", type=int, default=200_000)
+    parser.add_argument("--port", type=int, default=3999)
+    parser.add_argument("--latency", type=float, default=0.0, help="artificial seconds per page")
+    args = parser.parse_args()
+    items_df = make_items(args.items)
+    interactions_df = make_interactions(args.interactions, args.users, args.items)
+    with ExpressStub(items_df, interactions_df, port=args.port, latency=args.latency) as stub:
+        print(f"Serving synthetic /api/ml/* on {stub.url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
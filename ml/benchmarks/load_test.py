@@ -0,0 +1,124 @@
+# benchmarks/load_test.py
+"""
+HTTP load driver for the FastAPI service. Each concurrency level runs a
+closed loop (every worker sends its next request as soon as the previous one
+returns) over a weighted mix of endpoints for a fixed duration, and reports
+throughput, latency percentiles per endpoint and status codes (503 = inference
+queue full, 504 = inference timeout).
+
+Ids follow benchmarks.synthetic, so serve a model trained on the stub data:
+
+    python -m benchmarks.express_stub --items 5000 --users 2000 --port 3999
+    EXPRESS_ML_URL=http://localhost:3999 uvicorn app.main:app --port 8000
+    curl -X POST 'http://localhost:8000/train?full=true'
+    python -m benchmarks.load_test --url http://localhost:8000 --items 5000 --users 2000 --concurrency 1 8 32
+"""
+import argparse
+import json
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import requests
+from benchmarks.common import percentiles, write_report
+
+# endpoint -> share of requests
+DEFAULT_MIX = {"user": 0.6, "item": 0.25, "popular": 0.1, "users": 0.05}
+
+
+def _request(session, base_url, endpoint, rng, n_users, n_items, n, timeout):
+    params = {"n": n}
+    if endpoint == "user":
+        return session.get(f"{base_url}/recommend/user/user-{rng.integers(n_users)}", params=params, timeout=timeout)
+    if endpoint == "item":
+        return session.get(f"{base_url}/recommend/item/item-{rng.integers(n_items)}", params=params, timeout=timeout)
+    if endpoint == "popular":
+        return session.get(f"{base_url}/recommend/popular", params=params, timeout=timeout)
+    if endpoint == "users":
+        ids = [f"user-{u}" for u in rng.integers(n_users, size=50)]
+        return session.post(f"{base_url}/recommend/users", json={"userIds": ids, "n": n}, timeout=timeout)
+    raise ValueError(f"unknown endpoint {endpoint!r}")
+
+
+def run_level(base_url, concurrency, duration, mix, n_users, n_items, n, timeout, seed=0):
+    endpoints = list(mix)
+    weights = np.array([mix[e] for e in endpoints], dtype=float)
+    weights /= weights.sum()
+    latencies = defaultdict(list)
+    statuses = Counter()
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(worker_id):
+        rng = np.random.default_rng(seed + worker_id)
+        session = requests.Session()
+        local_latencies = defaultdict(list)
+        local_statuses = Counter()
+        while time.perf_counter() < deadline:
+            endpoint = endpoints[rng.choice(len(endpoints), p=weights)]
+            started = time.perf_counter()
+            try:
+                status = _request(session, base_url, endpoint, rng, n_users, n_items, n, timeout).status_code
+            except requests.RequestException:
+                status = "error"
+            local_latencies[endpoint].append(time.perf_counter() - started)
+            local_statuses[status] += 1
+        with lock:
+            for endpoint, samples in local_latencies.items():
+                latencies[endpoint].extend(samples)
+            statuses.update(local_statuses)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    total = sum(statuses.values())
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "statuses": {str(k): v for k, v in sorted(statuses.items(), key=str)},
+        "latency": percentiles([s for samples in latencies.values() for s in samples]),
+        "endpoints": {endpoint: percentiles(samples) for endpoint, samples in sorted(latencies.items())},
+    }
+
+
+def _parse_mix(text: str):
+    mix = {}
+    for part in text.split(","):
+        endpoint, _, share = part.partition("=")
+        mix[endpoint.strip()] = float(share or 1.0)
+    unknown = set(mix) - set(DEFAULT_MIX)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown endpoints: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per concurrency level")
+    parser.add_argument("--users", type=int, default=2000, help="synthetic user ids to draw from")
+    parser.add_argument("--items", type=int, default=5000, help="synthetic item ids to draw from")
+    parser.add_argument("--n", type=int, default=10, help="results per request")
+    parser.add_argument("--mix", type=_parse_mix, default=DEFAULT_MIX,
+                        help="endpoint shares, e.g. user=0.6,item=0.3,popular=0.1")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+    results = []
+    for concurrency in args.concurrency:
+        row = run_level(args.url.rstrip("/"), concurrency, args.duration, args.mix,
+                        args.users, args.items, args.n, args.timeout)
+        results.append(row)
+        print(json.dumps(row))
+    if args.output:
+        write_report(args.output, "load", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# benchmarks/synthetic.py
+"""
+Synthetic data shaped like the Express /api/ml/items and /api/ml/interactions
+payloads, after load_data_from_express has turned them into DataFrames.
+"""
+import numpy as np
+import pandas as pd
+from app.recommender.lightfm_model import INTERACTION_WEIGHTS
+
+CATEGORIES = ["hotel", "restaurant", "park", "museum", "resort", "event"]
+WORDS = ["lake", "spring", "view", "coffee", "family", "music", "garden", "pool",
+         "local", "market", "hiking", "night", "festival", "traditional", "modern"]
+
+
+def make_items(n_items: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    words = np.array(WORDS)
+    return pd.DataFrame({
+        "itemId": [f"item-{i}" for i in range(n_items)],
+        "itemType": rng.choice(["PLACE", "EVENT"], n_items),
+        "title": [" ".join(rng.choice(words, 3)) for _ in range(n_items)],
+        "description": [" ".join(rng.choice(words, 12)) for _ in range(n_items)],
+        "category": rng.choice(CATEGORIES, n_items),
+        "tags": [",".join(rng.choice(words, 2)) for _ in range(n_items)],
+        "price": rng.integers(0, 2000, n_items).astype(float),
+    })
+
+
+def make_interactions(n_interactions: int, n_users: int, n_items: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    # zipf-like item popularity so a few items collect most interactions
+    item_p = 1.0 / np.arange(1, n_items + 1) ** 0.8
+    item_p /= item_p.sum()
+    users = rng.integers(0, n_users, n_interactions)
+    items = rng.choice(n_items, n_interactions, p=item_p)
+    start = np.datetime64("2025-01-01T00:00:00")
+    seconds = np.sort(rng.integers(0, 365 * 24 * 3600, n_interactions))
+    return pd.DataFrame({
+        "userId": np.char.add("user-", users.astype(str)),
+        "itemId": np.char.add("item-", items.astype(str)),
+        "interaction": rng.choice(list(INTERACTION_WEIGHTS), n_interactions, p=[0.6, 0.2, 0.1, 0.05, 0.05]),
+        "timestamp": (start + seconds.astype("timedelta64[s]")).astype(str),
+    })
@@ -0,0 +1,145 @@
+# benchmarks/tune.py
+"""
+Offline evaluation and hyperparameter search for the LightFM model. Interactions
+are split on timestamp (the newest --test-fraction is held out), every config
+is trained with Trainer.train on the older part and scored with precision@k,
+recall@k and AUC on the newer part. Trials run in a process pool sized so
+workers x --threads-per-trial fills the machine. The leaderboard lists quality
+next to train time and artifact size; with --min-precision / --min-auc the
+cheapest config meeting the bar is reported as well. Run from ml/:
+
+    python -m benchmarks.tune --source express --components 16 32 64 --epochs 10 20 --output tune.json
+    python -m benchmarks.tune --source synthetic --search random --trials 20 --min-precision 0.05
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from app.recommender.evaluation import evaluate, time_split
+from app.recommender.lightfm_model import Trainer
+from benchmarks.bench_pipeline import _parse_scale
+from benchmarks.common import dir_size, timed, write_report
+from benchmarks.synthetic import make_interactions, make_items
+
+# Set in every worker by _init_worker
+_data = {}
+
+
+def _init_worker(items_df, train_df, test_df, threads, k):
+    _data.update(items=items_df, train=train_df, test=test_df, threads=threads, k=k)
+
+
+def run_trial(config):
+    model_dir = tempfile.mkdtemp(prefix="tune-")
+    try:
+        _, train_s = timed(Trainer().train, _data["items"], _data["train"], model_dir=model_dir,
+                           num_threads=_data["threads"], **config)
+        scores, eval_s = timed(evaluate, model_dir, _data["items"], _data["train"], _data["test"],
+                               k=_data["k"], num_threads=_data["threads"])
+        return {"config": config, "train_s": round(train_s, 3), "eval_s": round(eval_s, 3),
+                "model_bytes": dir_size(model_dir), **scores}
+    except Exception as e:
+        return {"config": config, "error": str(e)}
+    finally:
+        shutil.rmtree(model_dir, ignore_errors=True)
+
+
+def search_space(args):
+    grid = {
+        "loss": args.loss,
+        "no_components": args.components,
+        "epochs": args.epochs,
+        "learning_rate": args.learning_rate,
+        "item_features": [bool(v) for v in args.item_features],
+    }
+    configs = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+    if args.search == "random":
+        configs = random.Random(args.seed).sample(configs, min(args.trials, len(configs)))
+    return configs
+
+
+def _load(args):
+    if args.source == "express":
+        from app.services.data_loader import load_data_from_express
+        return load_data_from_express()
+    n_items, n_users, n_interactions = args.scale
+    return make_items(n_items, args.seed), make_interactions(n_interactions, n_users, n_items, args.seed)
+
+
+def cheapest(rows, min_precision, min_auc, k):
+    """Fastest-to-train config meeting the quality bar (smaller artifacts break ties)."""
+    passing = [r for r in rows if "error" not in r
+               and r[f"precision_at_{k}"] >= min_precision and r["auc"] >= min_auc]
+    return min(passing, key=lambda r: (r["train_s"], r["model_bytes"])) if passing else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", choices=["express", "synthetic"], default="express")
+    parser.add_argument("--scale", type=_parse_scale, default=_parse_scale("2000x5000x200000"),
+                        help="synthetic data size, ITEMSxUSERSxINTERACTIONS")
+    parser.add_argument("--test-fraction", type=float, default=0.2)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--search", choices=["grid", "random"], default="grid")
+    parser.add_argument("--trials", type=int, default=10, help="configs sampled from the grid with --search random")
+    parser.add_argument("--loss", nargs="+", default=["warp"], choices=["warp", "bpr", "warp-kos", "logistic"])
+    parser.add_argument("--components", type=int, nargs="+", default=[16, 32, 64])
+    parser.add_argument("--epochs", type=int, nargs="+", default=[10, 20])
+    parser.add_argument("--learning-rate", type=float, nargs="+", default=[0.05])
+    parser.add_argument("--item-features", type=int, nargs="+", default=[0], choices=[0, 1])
+    parser.add_argument("--threads-per-trial", type=int, default=1)
+    parser.add_argument("--workers", type=int, help="default: cpus / threads-per-trial")
+    parser.add_argument("--min-precision", type=float, default=0.0)
+    parser.add_argument("--min-auc", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the leaderboard as JSON to this path")
+    args = parser.parse_args()
+
+    items_df, interactions_df = _load(args)
+    train_df, test_df, cutoff = time_split(interactions_df, args.test_fraction)
+    print(f"split at {cutoff}: {len(train_df)} train / {len(test_df)} test interactions")
+
+    configs = search_space(args)
+    workers = args.workers or max(1, (os.cpu_count() or 1) // args.threads_per_trial)
+    # BLAS pools in the workers follow the per-trial limit too (read when numpy loads there)
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(args.threads_per_trial)
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(configs)),
+                             mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker,
+                             initargs=(items_df, train_df, test_df, args.threads_per_trial, args.k)) as pool:
+        futures = [pool.submit(run_trial, config) for config in configs]
+        for future in as_completed(futures):
+            row = future.result()
+            rows.append(row)
+            print(json.dumps(row))
+
+    metric = f"precision_at_{args.k}"
+    rows.sort(key=lambda r: ("error" in r, -r.get(metric, 0.0), -r.get("auc", 0.0)))
+    best = cheapest(rows, args.min_precision, args.min_auc, args.k)
+    print(f"\n{'loss':<9}{'dim':>5}{'ep':>4}{'lr':>7}{'feat':>6}{metric:>16}{'recall':>9}{'auc':>8}"
+          f"{'train_s':>9}{'MB':>8}")
+    for r in rows:
+        c = r["config"]
+        head = f"{c['loss']:<9}{c['no_components']:>5}{c['epochs']:>4}{c['learning_rate']:>7}{c['item_features']!s:>6}"
+        if "error" in r:
+            print(f"{head}  error: {r['error']}")
+            continue
+        print(f"{head}{r[metric]:>16.4f}{r[f'recall_at_{args.k}']:>9.4f}{r['auc']:>8.4f}"
+              f"{r['train_s']:>9.2f}{r['model_bytes'] / 1e6:>8.1f}")
+    print(f"\ncheapest meeting the bar: {json.dumps(best['config']) if best else 'none'}")
+
+    if args.output:
+        params = {**vars(args), "cutoff": str(cutoff), "train_interactions": len(train_df),
+                  "test_interactions": len(test_df), "workers": workers}
+        write_report(args.output, "tune", params, {"leaderboard": rows, "cheapest": best})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+# tests/conftest.py
+import pytest
+from app.recommender.lightfm_model import LightFMRecommender, Trainer
+from app.recommender.ranker import HybridRanker, RankingData
+from app.recommender.similarity import ContentSimilarity
+from benchmarks.synthetic import make_interactions, make_items
+
+
+@pytest.fixture(scope="session")
+def training_data():
+    return make_items(400, seed=0), make_interactions(20000, 600, 400, seed=0)
+
+
+@pytest.fixture(scope="session")
+def trained_dir(tmp_path_factory, training_data):
+    """A model directory with LightFM and content similarity artifacts; treat as read-only."""
+    items, interactions = training_data
+    model_dir = str(tmp_path_factory.mktemp("model"))
+    Trainer().train(items, interactions, model_dir=model_dir, epochs=2, num_threads=1)
+    ContentSimilarity(model_dir).build(items)
+    return model_dir
+
+
+@pytest.fixture(scope="session")
+def ranker(trained_dir):
+    recommender = LightFMRecommender(trained_dir)
+    return HybridRanker(recommender, ContentSimilarity(trained_dir), RankingData.load(trained_dir))
+
+
+@pytest.fixture
+def versions(tmp_path, monkeypatch):
+    """Point the versioned layout (versions/, CURRENT) at a temporary models directory."""
+    from app.services import model_manager
+    monkeypatch.setattr(model_manager, "VERSIONS_DIR", str(tmp_path / "versions"))
+    monkeypatch.setattr(model_manager, "CURRENT_FILE", str(tmp_path / "CURRENT"))
+    return tmp_path
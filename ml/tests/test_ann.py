@@ -0,0 +1,34 @@
+# tests/test_ann.py
+import numpy as np
+from app.recommender.ann import IVFIndex
+from app.utils.helpers import top_n_indices
+from benchmarks.bench_ann import _synthetic_vectors
+
+
+def test_top_k_recall_against_exact_scores(tmp_path):
+    rng = np.random.default_rng(0)
+    items = _synthetic_vectors(4000, 16, rng)
+    queries = np.hstack([_synthetic_vectors(50, 16, rng)[:, :-1], np.ones((50, 1), np.float32)])
+    index = IVFIndex.build(items, seed=0)
+    index.save(str(tmp_path))
+    index = IVFIndex.load(str(tmp_path))
+
+    k, hits = 10, 0
+    for query in queries:
+        found, scores = index.search(query, k, nprobe=16)
+        assert len(found) == k
+        np.testing.assert_allclose(scores, items[found] @ query, rtol=1e-5, atol=1e-5)
+        assert np.all(np.diff(scores) <= 0)
+        hits += len(set(found.tolist()) & set(top_n_indices(items @ query, k).tolist()))
+    assert hits / (k * len(queries)) >= 0.9
+    # probing every cell is exact
+    exact, _ = index.search(queries[0], k, nprobe=index.n_cells)
+    assert set(exact.tolist()) == set(top_n_indices(items @ queries[0], k).tolist())
+
+
+def test_excluded_item_is_never_returned():
+    items = _synthetic_vectors(500, 8, np.random.default_rng(1))
+    index = IVFIndex.build(items, seed=0)
+    query = items[7].copy()
+    found, _ = index.search(query, 5, exclude=7)
+    assert 7 not in found.tolist() and len(found) == 5
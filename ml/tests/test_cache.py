@@ -0,0 +1,57 @@
+# tests/test_cache.py
+import time
+import pytest
+from app.services.cache import CacheBackend, LocalLRUBackend, ResponseCache
+
+
+def test_entries_expire_after_their_ttl():
+    backend = LocalLRUBackend()
+    backend.set("short", [1], ttl=0.05)
+    backend.set("long", [2], ttl=60)
+    assert backend.get("short") == [1]
+    time.sleep(0.1)
+    assert backend.get("short") is None
+    assert backend.get("long") == [2]
+    assert backend.size() == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    backend = LocalLRUBackend(max_entries=2)
+    backend.set("a", 1, ttl=60)
+    backend.set("b", 2, ttl=60)
+    assert backend.get("a") == 1  # b is now the least recently used
+    backend.set("c", 3, ttl=60)
+    assert backend.get("b") is None
+    assert (backend.get("a"), backend.get("c")) == (1, 3)
+
+
+def test_response_cache_counts_and_invalidates():
+    cache = ResponseCache(LocalLRUBackend(), ttl=60)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return [{"itemId": "i1", "score": 1.0}]
+
+    key = cache.key("user", "u1", 10, "v1")
+    assert cache.get_or_compute(key, compute) == cache.get_or_compute(key, compute)
+    assert len(calls) == 1
+    # model not ready: nothing is cached
+    assert cache.get_or_compute(cache.key("user", "u2", 10, "v1"), lambda: None) is None
+    assert cache.stats()["entries"] == 1
+
+    cache.invalidate()
+    cache.get_or_compute(key, compute)
+    assert len(calls) == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (1, 3, 1)
+    assert cache.key("user", "u1", 10, "v2") != key
+
+
+def test_backends_must_implement_the_interface():
+    class Incomplete(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
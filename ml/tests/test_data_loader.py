@@ -0,0 +1,58 @@
+# tests/test_data_loader.py
+import pandas as pd
+import pytest
+from app.services import data_loader
+from app.services.data_loader import load_data_from_express
+from benchmarks.express_stub import ExpressStub
+from benchmarks.synthetic import make_interactions, make_items
+
+# page sizes used by load_data_from_express
+ITEMS_PAGE, INTERACTIONS_PAGE = 500, 1000
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    """A fresh session per test, retrying without backoff."""
+    monkeypatch.setattr(data_loader, "FETCH_BACKOFF", 0.0)
+    monkeypatch.setattr(data_loader, "_session", None)
+
+
+def test_totals_on_a_page_boundary():
+    # both totals are exact multiples of the page size: the empty page after them ends the fetch
+    items = make_items(2 * ITEMS_PAGE)
+    interactions = make_interactions(3 * INTERACTIONS_PAGE, 200, 2 * ITEMS_PAGE)
+    with ExpressStub(items, interactions) as stub:
+        items_df, interactions_df = load_data_from_express(stub.url, concurrency=2)
+    assert items_df["itemId"].tolist() == items["itemId"].tolist()
+    assert len(interactions_df) == len(interactions)
+    assert interactions_df["userId"].astype(str).tolist() == interactions["userId"].tolist()
+    assert str(interactions_df["timestamp"].dt.tz) == "UTC"
+
+
+@pytest.mark.parametrize("honor_since", [True, False])
+def test_since_returns_interactions_at_or_after_it(honor_since):
+    items = make_items(50)
+    interactions = make_interactions(2500, 100, 50)
+    stamps = pd.to_datetime(interactions["timestamp"], utc=True)
+    since = stamps.iloc[1800]
+    with ExpressStub(items, interactions, honor_since=honor_since) as stub:
+        _, interactions_df = load_data_from_express(stub.url, since=since)
+    expected = interactions[(stamps >= since).to_numpy()]
+    assert len(interactions_df) == len(expected)
+    assert interactions_df["timestamp"].min() == since
+
+
+def test_failed_page_is_retried():
+    items = make_items(3 * ITEMS_PAGE)
+    interactions = make_interactions(100, 20, 3 * ITEMS_PAGE)
+    with ExpressStub(items, interactions, failures={("items", 2): data_loader.FETCH_RETRIES}) as stub:
+        items_df, _ = load_data_from_express(stub.url)
+    assert items_df["itemId"].tolist() == items["itemId"].tolist()
+
+
+def test_page_failing_past_the_retries_raises():
+    items = make_items(3 * ITEMS_PAGE)
+    interactions = make_interactions(100, 20, 3 * ITEMS_PAGE)
+    with ExpressStub(items, interactions, failures={("items", 2): data_loader.FETCH_RETRIES + 1}) as stub:
+        with pytest.raises(RuntimeError, match="items: 503"):
+            load_data_from_express(stub.url)
@@ -0,0 +1,45 @@
+# tests/test_evaluation.py
+import pandas as pd
+import pytest
+from app.recommender.evaluation import time_split
+from benchmarks import tune
+
+
+def test_time_split_holds_out_the_newest_interactions(training_data):
+    _, interactions = training_data
+    train, test, cutoff = time_split(interactions, test_fraction=0.25)
+    assert len(train) + len(test) == len(interactions)
+    assert len(test) == pytest.approx(0.25 * len(interactions), rel=0.01)
+    assert pd.to_datetime(train["timestamp"], utc=True).max() <= cutoff
+    assert pd.to_datetime(test["timestamp"], utc=True).min() > cutoff
+    with pytest.raises(ValueError):
+        time_split(interactions.assign(timestamp=None))
+
+
+def test_trial_reports_quality_time_and_size(training_data):
+    items, interactions = training_data
+    train, test, _ = time_split(interactions)
+    tune._init_worker(items, train, test, 1, 10)
+    config = {"loss": "warp", "no_components": 8, "epochs": 2, "learning_rate": 0.05, "item_features": False}
+    row = tune.run_trial(config)
+    assert "error" not in row, row
+    assert row["config"] == config
+    assert 0.0 <= row["precision_at_10"] <= 1.0 and 0.0 <= row["recall_at_10"] <= 1.0
+    # the synthetic data is popularity-skewed, so any fitted model beats random
+    assert row["auc"] > 0.6
+    assert row["test_users"] > 0 and row["model_bytes"] > 0 and row["train_s"] > 0
+
+    failed = tune.run_trial({**config, "loss": "no-such-loss"})
+    assert failed["config"]["loss"] == "no-such-loss" and "error" in failed
+
+
+def test_cheapest_config_meeting_the_bar():
+    rows = [
+        {"config": "slow", "precision_at_10": 0.3, "auc": 0.9, "train_s": 9.0, "model_bytes": 10},
+        {"config": "fast", "precision_at_10": 0.2, "auc": 0.8, "train_s": 1.0, "model_bytes": 10},
+        {"config": "weak", "precision_at_10": 0.01, "auc": 0.6, "train_s": 0.1, "model_bytes": 1},
+        {"config": "broken", "error": "boom"},
+    ]
+    assert tune.cheapest(rows, min_precision=0.1, min_auc=0.5, k=10)["config"] == "fast"
+    assert tune.cheapest(rows, min_precision=0.25, min_auc=0.5, k=10)["config"] == "slow"
+    assert tune.cheapest(rows, min_precision=0.5, min_auc=0.5, k=10) is None
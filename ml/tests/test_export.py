@@ -0,0 +1,93 @@
+# tests/test_export.py
+import gzip
+import json
+import shutil
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.recommender.similarity import ContentSimilarity
+from app.routers import export as export_router
+from app.services.export import ITEM_EXPORT_FILE, USER_EXPORT_FILE, load_export_meta, write_exports
+
+
+@pytest.fixture(scope="module")
+def export_dir(tmp_path_factory, trained_dir):
+    model_dir = str(tmp_path_factory.mktemp("export") / "model")
+    shutil.copytree(trained_dir, model_dir)
+    write_exports(model_dir, user_n=15, similar_n=5)
+    return model_dir
+
+
+def _rows(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_user_export_matches_live_ranking(export_dir, ranker):
+    rows = _rows(f"{export_dir}/{USER_EXPORT_FILE}")
+    user_map = ranker.recommender.user_map
+    assert [row["userId"] for row in rows] == user_map.ids_of(range(len(user_map)))
+    for u_index in (0, 17, len(rows) - 1):
+        row = rows[u_index]
+        live = ranker.rank_for_user(row["userId"], 15)
+        assert row["items"] == [r["itemId"] for r in live]
+        assert row["scores"] == pytest.approx([r["score"] for r in live], abs=1e-4)
+        booked = set(ranker.recommender.item_map.ids_of(ranker.data.booked(u_index)))
+        assert not booked & set(row["items"])
+
+
+def test_item_export_matches_similar_items(export_dir):
+    rows = _rows(f"{export_dir}/{ITEM_EXPORT_FILE}")
+    similarity = ContentSimilarity(export_dir)
+    assert len(rows) == len(similarity.item_ids)
+    for row in rows[:20]:
+        assert row["items"] == [r["itemId"] for r in similarity.most_similar(row["itemId"], 5)]
+
+    meta = load_export_meta(export_dir)
+    assert meta["users"]["n"] == 15 and meta["items"]["n"] == 5
+    assert meta["items"]["rows"] == len(rows)
+
+
+@pytest.mark.parametrize("header, gzip_ok", [
+    ("gzip", True),
+    ("deflate, gzip;q=0.5", True),
+    ("GZIP; Q=1", True),
+    ("x-gzip", True),
+    ("*", True),
+    ("gzip;q=0", False),
+    ("gzip;q=0.000, *", False),
+    ("*;q=0", False),
+    ("identity", False),
+    ("deflate, br", False),
+    ("gzip;q=oops", False),
+    ("", False),
+])
+def test_accept_encoding_q_values(header, gzip_ok):
+    assert export_router._accepts_gzip(header) is gzip_ok
+
+
+def test_export_endpoints_stream_ndjson(export_dir, monkeypatch):
+    class Bundle:
+        version = "v1"
+
+    monkeypatch.setattr(export_router.model_manager, "get", lambda: Bundle())
+    monkeypatch.setattr(export_router, "version_dir", lambda version: export_dir)
+    app = FastAPI()
+    app.include_router(export_router.router, prefix="/export")
+    client = TestClient(app)
+
+    plain = client.get("/export/users", headers={"Accept-Encoding": "identity"})
+    assert plain.status_code == 200
+    assert plain.headers["x-model-version"] == "v1"
+    assert "content-encoding" not in plain.headers
+    compressed = client.get("/export/users", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.text == plain.text
+    refused = client.get("/export/users", headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert "content-encoding" not in refused.headers
+    assert refused.text == plain.text
+    assert [json.loads(line) for line in plain.text.splitlines()] == _rows(f"{export_dir}/{USER_EXPORT_FILE}")
+    assert client.get("/export").json()["version"] == "v1"
+
+    monkeypatch.setattr(export_router, "version_dir", lambda version: export_dir + "-missing")
+    assert client.get("/export/items").status_code == 404
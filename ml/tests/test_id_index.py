@@ -0,0 +1,52 @@
+# tests/test_id_index.py
+import os
+import shutil
+import joblib
+import numpy as np
+from app.recommender.id_index import IdIndex
+from app.recommender.lightfm_model import (DATASET_FILE, ITEM_BIAS_FILE, ITEM_EMB_FILE, ITEM_MAP_FILE,
+                                           USER_BIAS_FILE, USER_EMB_FILE, USER_MAP_FILE, LightFMRecommender)
+
+
+def test_lookup_of_known_and_missing_ids(tmp_path):
+    ids = ["user-10", "user-2", "ünïcode", "user-1"]
+    index = IdIndex.from_ids(ids)
+    index.save(str(tmp_path), "test")
+    index = IdIndex.load(str(tmp_path), "test")
+
+    assert len(index) == 4
+    assert [index.get(i) for i in ids] == [0, 1, 2, 3]
+    assert index.ids_of(range(4)) == ids
+    # missing ids sorting before, between and after the known ones
+    for missing in ("a", "user-0", "user-3", "zzz"):
+        assert index.get(missing) is None and missing not in index
+    assert index.lookup(["user-1", "a", "zzz", "ünïcode", "user-3"]).tolist() == [3, -1, -1, 2, -1]
+    assert IdIndex.from_ids([]).lookup(["user-1"]).tolist() == [-1]
+    assert IdIndex.load(str(tmp_path), "other") is None
+
+
+def test_extended_and_translated_indices():
+    index = IdIndex.from_ids(["b", "a", "c"])
+    extended = index.extended(["aa", "d"])
+    assert extended.ids_of(range(5)) == ["b", "a", "c", "aa", "d"]
+    assert index.translate(extended).tolist() == [0, 1, 2]
+    assert extended.translate(index).tolist() == [0, 1, 2, -1, -1]
+
+
+def test_serving_arrays_match_the_pickled_model(tmp_path, trained_dir):
+    # the layout before serving arrays: pickled model plus dict id maps
+    legacy_dir = str(tmp_path / "legacy")
+    shutil.copytree(trained_dir, legacy_dir)
+    dataset = joblib.load(os.path.join(trained_dir, DATASET_FILE))
+    joblib.dump(dataset._user_id_mapping, os.path.join(legacy_dir, USER_MAP_FILE))
+    joblib.dump(dataset._item_id_mapping, os.path.join(legacy_dir, ITEM_MAP_FILE))
+    for name in (USER_EMB_FILE, USER_BIAS_FILE, ITEM_EMB_FILE, ITEM_BIAS_FILE):
+        os.remove(os.path.join(legacy_dir, name))
+
+    served, legacy = LightFMRecommender(trained_dir), LightFMRecommender(legacy_dir)
+    assert isinstance(served.user_vectors, np.memmap) and not isinstance(legacy.user_vectors, np.memmap)
+    for u_index in (0, 5, len(served.user_map) - 1):
+        user_id = served.user_map.id_of(u_index)
+        ranked, expected = served.recommend_for_user(user_id, 10), legacy.recommend_for_user(user_id, 10)
+        assert [r["itemId"] for r in ranked] == [r["itemId"] for r in expected]
+        np.testing.assert_allclose([r["score"] for r in ranked], [r["score"] for r in expected], rtol=1e-5)
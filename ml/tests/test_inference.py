@@ -0,0 +1,44 @@
+# tests/test_inference.py
+import asyncio
+import threading
+import pytest
+from fastapi.testclient import TestClient
+from app import main
+from app.routers import recommend as recommend_router
+from app.services.inference import InferenceExecutor, InferenceOverloaded, InferenceTimeout
+
+
+def test_full_queue_rejects_and_slow_calls_time_out():
+    executor = InferenceExecutor(workers=1, queue_size=1, timeout=0.2)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        # one call running, one queued: the next is turned away
+        with pytest.raises(InferenceOverloaded):
+            await executor.run(lambda: 1)
+        for call in blocked:
+            with pytest.raises(InferenceTimeout):
+                await call
+        # timed-out calls keep their slots until they actually finish
+        assert executor.stats()["in_flight"] == 2
+        release.set()
+        await asyncio.sleep(0.05)
+        return await executor.run(lambda: 42)
+
+    assert asyncio.run(scenario()) == 42
+    stats = executor.stats()
+    assert (stats["rejected"], stats["timeouts"], stats["in_flight"]) == (1, 2, 0)
+
+
+@pytest.mark.parametrize("error, status", [(InferenceOverloaded, 503), (InferenceTimeout, 504)])
+def test_executor_errors_map_to_status_codes(monkeypatch, error, status):
+    async def run(*args, **kwargs):
+        raise error()
+
+    monkeypatch.setattr(recommend_router.inference, "run", run)
+    response = TestClient(main.app).get("/recommend/popular")
+    assert response.status_code == status
+    if status == 503:
+        assert response.headers["retry-after"] == "1"
@@ -0,0 +1,44 @@
+# tests/test_item_features.py
+import os
+import joblib
+import numpy as np
+import pandas as pd
+from lightfm.data import Dataset
+from app.recommender.item_features import feature_names, item_feature_pairs
+from app.recommender.lightfm_model import (DATASET_FILE, MODEL_FILE, LightFMRecommender, Trainer,
+                                           dataset_item_features, load_train_meta)
+
+
+def test_feature_pairs_from_item_metadata():
+    items = pd.DataFrame({"itemId": ["a", "b"], "category": ["Park", ""], "tags": ["lake, view", ""],
+                          "price": [0.0, 300.0]})
+    pairs = item_feature_pairs(items)
+    assert sorted(map(tuple, pairs.to_numpy())) == [
+        ("a", "category:park"), ("a", "price:0"), ("a", "tag:lake"), ("a", "tag:view"), ("b", "price:3")]
+
+
+def test_feature_matrix_matches_lightfm_dataset(training_data):
+    items, _ = training_data
+    items = items.head(50)
+    pairs = item_feature_pairs(items)
+    dataset = Dataset()
+    dataset.fit(["u"], items["itemId"], item_features=feature_names(pairs))
+    expected = dataset.build_item_features(pairs.groupby("itemId")["feature"].apply(list).items())
+    np.testing.assert_allclose(dataset_item_features(dataset, pairs).toarray(), expected.toarray(), rtol=1e-6)
+
+
+def test_serving_scores_include_item_features(tmp_path, training_data):
+    items, interactions = training_data
+    model_dir = str(tmp_path / "model")
+    Trainer().train(items, interactions, model_dir=model_dir, epochs=1, num_threads=1, item_features=True)
+    assert load_train_meta(model_dir)["item_features"] is True
+
+    model = joblib.load(os.path.join(model_dir, MODEL_FILE))
+    dataset = joblib.load(os.path.join(model_dir, DATASET_FILE))
+    features = dataset_item_features(dataset, item_feature_pairs(items))
+    recommender = LightFMRecommender(model_dir)
+    user_id = recommender.user_map.id_of(3)
+    recs = recommender.recommend_for_user(user_id, 10, approximate=False)
+    item_indices = np.array([recommender.item_map.get(r["itemId"]) for r in recs], dtype=np.int32)
+    predicted = model.predict(3, item_indices, item_features=features)
+    np.testing.assert_allclose([r["score"] for r in recs], predicted, rtol=1e-4, atol=1e-4)
@@ -0,0 +1,65 @@
+# tests/test_jobs.py
+import subprocess
+import time
+import uuid
+import pytest
+from app.services import jobs
+from app.services.jobs import TrainingJob, TrainingJobs
+
+
+def _fake_job(seconds):
+    time.sleep(seconds)
+    return "v-test", []
+
+
+@pytest.fixture(autouse=True)
+def no_model_reload(monkeypatch):
+    monkeypatch.setattr(jobs.model_manager, "refresh", lambda: None)
+
+
+def _wait(workers: TrainingJobs, job_id: str, timeout: float = 60.0) -> TrainingJob:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = workers.get(job_id)
+        if job.finished_at is not None:
+            return job
+        time.sleep(0.1)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_job_state_and_lock_are_shared_between_workers(tmp_path):
+    # two instances over one directory stand in for two serving workers
+    first, second = TrainingJobs(str(tmp_path)), TrainingJobs(str(tmp_path))
+    job, created = first._submit(TrainingJob(job_id=uuid.uuid4().hex, full=False), _fake_job, 2.0)
+    assert created
+
+    other, created = second._submit(TrainingJob(job_id=uuid.uuid4().hex, full=False), _fake_job, 0.0)
+    assert not created
+    assert other.job_id == job.job_id
+    assert second.get(job.job_id).status == "running"
+    assert [j.job_id for j in second.list()] == [job.job_id]
+
+    finished = _wait(second, job.job_id)
+    assert (finished.status, finished.version) == ("succeeded", "v-test")
+    job, created = second._submit(TrainingJob(job_id=uuid.uuid4().hex, full=False), _fake_job, 0.0)
+    assert created
+    _wait(first, job.job_id)
+    assert len(first.list()) == 2
+
+
+def test_job_of_exited_worker_is_reported_failed(tmp_path):
+    workers = TrainingJobs(str(tmp_path))
+    process = subprocess.Popen(["true"])
+    process.wait()
+    job = TrainingJob(job_id=uuid.uuid4().hex, full=False, status="running", pid=process.pid)
+    workers._save(job)
+
+    reported = workers.get(job.job_id)
+    assert reported.status == "failed"
+    assert reported.finished_at is not None
+
+
+def test_unknown_and_malformed_job_ids(tmp_path):
+    workers = TrainingJobs(str(tmp_path))
+    assert workers.get(uuid.uuid4().hex) is None
+    assert workers.get("../CURRENT") is None
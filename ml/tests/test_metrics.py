@@ -0,0 +1,47 @@
+# tests/test_metrics.py
+from fastapi.testclient import TestClient
+from app.main import app
+from app.utils.metrics import Counter, Histogram, Registry, capture_stages, timed
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.register(Histogram("test_seconds", "Test latency.", ["route"], buckets=(0.1, 1.0)))
+    counter = registry.register(Counter("test_total", "Test count."))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, route="/a")
+    counter.inc()
+    counter.inc(2)
+
+    lines = registry.render().splitlines()
+    assert 'test_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{route="/a",le="1.0"} 2' in lines
+    assert 'test_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'test_seconds_sum{route="/a"} 5.55' in lines
+    assert 'test_seconds_count{route="/a"} 3' in lines
+    assert "test_total 3.0" in lines
+    assert "# TYPE test_seconds histogram" in lines
+
+
+def test_timed_records_stages_for_captures():
+    @timed("test.decorated")
+    def work():
+        return 42
+
+    with capture_stages() as captured:
+        assert work() == 42
+        with timed("test.block"):
+            pass
+    assert [stage for stage, _ in captured] == ["test.decorated", "test.block"]
+    assert all(seconds >= 0 for _, seconds in captured)
+
+
+def test_metrics_endpoint_reports_request_latency_by_route():
+    client = TestClient(app)
+    client.get("/metrics")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'ml_http_request_duration_seconds_count{method="GET",route="/metrics",status="200"}' in body
+    assert "# TYPE ml_stage_duration_seconds histogram" in body
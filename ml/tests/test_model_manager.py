@@ -0,0 +1,58 @@
+# tests/test_model_manager.py
+import os
+import shutil
+from app.services import model_manager as mm
+from app.services.model_manager import ModelManager, current_version, new_version_dir, publish_version
+
+
+def _publish_copy(trained_dir: str) -> str:
+    version, path = new_version_dir()
+    shutil.rmtree(path)
+    shutil.copytree(trained_dir, path)
+    publish_version(version)
+    return version
+
+
+def test_publish_points_current_at_version_and_prunes_old_ones(versions, monkeypatch):
+    monkeypatch.setattr(mm, "KEEP_VERSIONS", 2)
+    assert current_version() is None
+    published = []
+    for _ in range(4):
+        version, _ = new_version_dir()
+        publish_version(version)
+        published.append(version)
+        assert current_version() == version
+    assert sorted(os.listdir(versions / "versions")) == published[-2:]
+    assert not [name for name in os.listdir(versions) if name.endswith(".tmp")]
+
+
+def test_hot_reload_swaps_bundle_and_keeps_old_one_usable(versions, trained_dir):
+    first = _publish_copy(trained_dir)
+    manager = ModelManager(check_interval=0.0)
+    swaps = []
+    manager.add_listener(swaps.append)
+    old = manager.get()
+    assert old.version == first and old.is_ready()
+    assert manager.get() is old
+
+    second = _publish_copy(trained_dir)
+    # the new version loads in the background; meanwhile the old one is served
+    assert manager.get() is old
+    manager._reloader.join(timeout=60)
+    new = manager.get()
+    assert new.version == second and new is not old
+    assert [bundle.version for bundle in swaps] == [first, second]
+    # requests that started on the old bundle finish on it
+    user_id = old.recommender.user_map.id_of(0)
+    assert old.recommender.recommend_for_user(user_id, 5) == new.recommender.recommend_for_user(user_id, 5)
+
+
+def test_broken_version_keeps_serving_previous(versions, trained_dir):
+    good = _publish_copy(trained_dir)
+    manager = ModelManager(check_interval=0.0)
+    assert manager.get().version == good
+
+    broken, _ = new_version_dir()
+    publish_version(broken)
+    assert manager.refresh().version == good
+    assert manager.get().version == good
@@ -0,0 +1,36 @@
+# tests/test_popularity.py
+import numpy as np
+import pandas as pd
+from app.recommender.popularity import PopularityIndex, decay, decayed_item_scores, item_categories
+
+AS_OF = pd.Timestamp("2025-03-01", tz="UTC")
+
+
+def test_interactions_decay_with_their_age():
+    stamps = pd.Series([AS_OF, AS_OF - pd.Timedelta(days=30), AS_OF - pd.Timedelta(days=60), None])
+    scores = decayed_item_scores(np.array([0, 1, 2, 3]), np.array([4.0, 4.0, 4.0, 4.0]), stamps,
+                                 n_items=5, as_of=AS_OF, half_life_days=30)
+    np.testing.assert_allclose(scores, [4.0, 2.0, 1.0, 4.0, 0.0])
+    # unknown items are skipped
+    assert decayed_item_scores(np.array([-1, 0]), np.array([1.0, 1.0]), None, 2, AS_OF).tolist() == [1.0, 0.0]
+    np.testing.assert_allclose(decay(scores, AS_OF, AS_OF + pd.Timedelta(days=30), half_life_days=30), scores / 2)
+
+
+def test_rankings_globally_and_per_category(tmp_path):
+    items = pd.DataFrame({"itemId": ["a", "b", "c", "d"], "category": ["park", "hotel", "park", None]})
+    categories = item_categories(items, pd.Index(["a", "b", "c", "d", "e"]))
+    assert categories.tolist() == ["park", "hotel", "park", "", ""]
+
+    index = PopularityIndex.build(np.array([1.0, 5.0, 3.0, 2.0, 0.0]), categories)
+    index.save(str(tmp_path))
+    index = PopularityIndex.load(str(tmp_path))
+    assert index.top(3).tolist() == [1, 2, 3]
+    assert index.top(5, "park").tolist() == [2, 0]
+    assert index.top(1, "park").tolist() == [2]
+    assert index.top(5, "museum").tolist() == []
+    assert index.category_members("hotel").tolist() == [1]
+    assert index.item_category_codes().tolist() == [index.category_code(c) for c in categories]
+
+
+def test_missing_index_loads_as_none(tmp_path):
+    assert PopularityIndex.load(str(tmp_path)) is None
@@ -0,0 +1,41 @@
+# tests/test_ranker.py
+from app.recommender.ranker import RankFilters
+
+
+def _user_ids(ranker, count):
+    return ranker.recommender.user_map.ids_of(range(count))
+
+
+def test_batched_ranking_matches_single_user(ranker):
+    user_ids = _user_ids(ranker, 30) + ["unknown-user"]
+    batched = ranker.rank_for_users(user_ids, 10)
+    assert [row["userId"] for row in batched] == user_ids
+    for row in batched:
+        assert row["recommendations"] == ranker.rank_for_user(row["userId"], 10)
+
+
+def test_ranking_excludes_booked_items(ranker):
+    rec = ranker.recommender
+    for u_index in range(len(rec.user_map)):
+        booked = set(rec.item_map.ids_of(ranker.data.booked(u_index)))
+        if booked:
+            break
+    user_id = rec.user_map.id_of(u_index)
+    items = {r["itemId"] for r in ranker.rank_for_user(user_id, 50)}
+    assert not items & booked
+    unfiltered = {r["itemId"] for r in ranker.rank_for_user(user_id, 400, RankFilters(exclude_booked=False))}
+    assert unfiltered & booked
+
+
+def test_approximate_is_passed_to_candidate_retrieval(ranker, monkeypatch):
+    ann = ranker.recommender.ann
+    calls = []
+    search = ann.search
+    monkeypatch.setattr(ann, "search", lambda *args, **kwargs: calls.append(1) or search(*args, **kwargs))
+    user_id = _user_ids(ranker, 1)[0]
+
+    ranker.rank_for_user(user_id, 10, approximate=False)
+    assert not calls
+    assert ranker.rank_for_user(user_id, 10, approximate=True)
+    assert calls
+    assert len(ranker.rank_for_users([user_id], 10, approximate=True)[0]["recommendations"]) == 10
@@ -0,0 +1,56 @@
+# tests/test_recommend.py
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.recommender.lightfm_model import LightFMRecommender
+from app.recommender.similarity import ContentSimilarity
+from app.routers import recommend as recommend_router
+from app.services.model_manager import ModelBundle
+
+
+@pytest.fixture
+def client_for(monkeypatch, trained_dir):
+    """A client whose model manager serves the trained artifacts, with or without the ranking stage."""
+    def make(ranker):
+        bundle = ModelBundle(f"test-{id(ranker)}", LightFMRecommender(trained_dir), ContentSimilarity(trained_dir), ranker)
+        monkeypatch.setattr(recommend_router.model_manager, "get", lambda: bundle)
+        app = FastAPI()
+        app.include_router(recommend_router.router, prefix="/recommend")
+        return TestClient(app)
+    return make
+
+
+def _categories(training_data):
+    items, _ = training_data
+    return dict(zip(items["itemId"], items["category"]))
+
+
+def test_plain_scores_apply_the_category_filter(client_for, ranker, training_data):
+    client = client_for(ranker)
+    user_id = ranker.recommender.user_map.id_of(0)
+    categories = _categories(training_data)
+
+    unfiltered = client.get(f"/recommend/user/{user_id}", params={"rerank": "false", "n": 20}).json()
+    assert {categories[r["itemId"]] for r in unfiltered["recommendations"]} != {"park"}
+
+    recs = client.get(f"/recommend/user/{user_id}", params={"rerank": "false", "n": 20, "category": "park"}).json()
+    items = [r["itemId"] for r in recs["recommendations"]]
+    assert len(items) == 20
+    assert {categories[item] for item in items} == {"park"}
+    scores = [r["score"] for r in recs["recommendations"]]
+    assert scores == sorted(scores, reverse=True)
+    assert client.get(f"/recommend/user/{user_id}",
+                      params={"rerank": "false", "category": "no-such-category"}).json()["recommendations"] == []
+
+
+def test_price_filters_need_the_ranking_stage(client_for, ranker):
+    user_id = ranker.recommender.user_map.id_of(0)
+    with_ranker = client_for(ranker)
+    assert with_ranker.get(f"/recommend/user/{user_id}", params={"max_price": 500}).status_code == 200
+    assert with_ranker.get(f"/recommend/user/{user_id}", params={"max_price": 500, "rerank": "false"}).status_code == 400
+
+    without_ranker = client_for(None)
+    assert without_ranker.get(f"/recommend/user/{user_id}", params={"min_price": 100}).status_code == 400
+    response = without_ranker.get(f"/recommend/user/{user_id}", params={"category": "park"})
+    assert response.status_code == 200
+    assert response.json()["recommendations"]
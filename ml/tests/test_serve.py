@@ -0,0 +1,78 @@
+# tests/test_serve.py
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import time
+import pytest
+import requests
+from app.recommender.lightfm_model import LightFMRecommender
+from app.services.model_manager import new_version_dir, publish_version
+from app.utils.helpers import touch_mapped
+
+# Runs app.serve with the versioned layout redirected to the test directory
+SERVE = """
+import sys
+from app.services import model_manager
+model_manager.VERSIONS_DIR, model_manager.CURRENT_FILE = sys.argv[1], sys.argv[2]
+sys.argv = ["app.serve", "--workers", "2", "--port", sys.argv[3], "--host", "127.0.0.1", "--log-level", "warning"]
+from app.serve import main
+main()
+"""
+
+
+def _publish_copy(trained_dir: str) -> str:
+    version, path = new_version_dir()
+    shutil.rmtree(path)
+    shutil.copytree(trained_dir, path)
+    publish_version(version)
+    return version
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _served_versions(url: str, requests_n: int = 10) -> set:
+    return {requests.get(f"{url}/debug/status", timeout=5).json()["version"] for _ in range(requests_n)}
+
+
+def _wait_for(condition, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if condition():
+                return
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.2)
+    raise AssertionError("condition not met in time")
+
+
+def test_touch_mapped_reads_the_memory_mapped_arrays(trained_dir):
+    recommender = LightFMRecommender(trained_dir)
+    touched = touch_mapped(recommender)
+    assert touched >= recommender.user_vectors.nbytes + recommender.item_vectors.nbytes
+    assert touch_mapped(object()) == 0
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="pre-forking server needs fork")
+def test_workers_swap_to_a_published_version(versions, trained_dir):
+    first = _publish_copy(trained_dir)
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    server = subprocess.Popen([sys.executable, "-c", SERVE, str(versions / "versions"), str(versions / "CURRENT"),
+                               str(port)], cwd=cwd)
+    try:
+        _wait_for(lambda: _served_versions(url) == {first})
+        second = _publish_copy(trained_dir)
+        # the parent loads the new version and signals every worker to swap
+        _wait_for(lambda: _served_versions(url) == {second}, timeout=15.0)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=60) == 0
@@ -0,0 +1,71 @@
+# tests/test_similarity.py
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from app.recommender import similarity
+from app.recommender.similarity import (CONTENT_META_FILE, NEIGHBORS_IDX_FILE, SIMILARITY_FILES, ContentSimilarity,
+                                        compute_neighbors, load_content_meta, write_neighbor_files)
+from benchmarks.synthetic import make_items
+
+
+@pytest.fixture
+def base(tmp_path):
+    items = make_items(300, seed=1)
+    model_dir = str(tmp_path / "base")
+    ContentSimilarity(model_dir).build(items)
+    return items, model_dir
+
+
+def _assert_neighbors_match_full_recompute(content: ContentSimilarity):
+    idx, scores = compute_neighbors(content.tfidf_matrix)
+    np.testing.assert_allclose(content.neighbor_scores, scores, atol=1e-6)
+    np.testing.assert_array_equal(content.neighbor_idx, idx)
+
+
+def test_update_without_changes_links_base(base, tmp_path):
+    items, base_dir = base
+    content = ContentSimilarity(str(tmp_path / "next"))
+    content.update(items, base_dir)
+
+    assert content.is_ready()
+    assert load_content_meta(content.model_dir)["mode"] == "unchanged"
+    for name in SIMILARITY_FILES:
+        if name != CONTENT_META_FILE and os.path.exists(os.path.join(base_dir, name)):
+            assert os.path.samefile(os.path.join(base_dir, name), os.path.join(content.model_dir, name))
+    np.testing.assert_array_equal(content.neighbor_idx, ContentSimilarity(base_dir).neighbor_idx)
+
+
+def test_update_with_only_unchanged_posted_items(base, tmp_path):
+    items, base_dir = base
+    content = ContentSimilarity(str(tmp_path / "next"))
+    content.update(items.head(5), base_dir, full_catalog=False)
+    assert load_content_meta(content.model_dir)["mode"] == "unchanged"
+    assert len(content.item_ids) == len(items)
+
+
+def test_update_new_and_edited_items_matches_full_recompute(base, tmp_path):
+    items, base_dir = base
+    items = items.copy()
+    items.loc[[3, 40, 41], "description"] = "lake festival music sunset lake"
+    items = pd.concat([items, make_items(305, seed=2).tail(5)], ignore_index=True)
+    content = ContentSimilarity(str(tmp_path / "next"))
+    content.update(items, base_dir)
+
+    meta = load_content_meta(content.model_dir)
+    assert meta["mode"] == "incremental"
+    assert meta["updated_items"] == 8
+    assert len(content.item_ids) == 305
+    _assert_neighbors_match_full_recompute(content)
+    # base artifacts were replaced, not rewritten in place
+    assert not os.path.samefile(os.path.join(base_dir, NEIGHBORS_IDX_FILE),
+                                os.path.join(content.model_dir, NEIGHBORS_IDX_FILE))
+    assert ContentSimilarity(base_dir).neighbor_idx.shape[0] == 300
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_chunked_neighbor_build_matches_in_memory(base, monkeypatch, workers):
+    _, model_dir = base
+    monkeypatch.setattr(similarity, "NEIGHBORS_PARALLEL_MIN_ITEMS", 0)
+    write_neighbor_files(model_dir, workers=workers, chunk_rows=64)
+    _assert_neighbors_match_full_recompute(ContentSimilarity(model_dir))
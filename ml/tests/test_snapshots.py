@@ -0,0 +1,58 @@
+# tests/test_snapshots.py
+import pandas as pd
+import pytest
+from app.services import snapshots
+from app.services.snapshots import latest_snapshot, write_snapshot
+
+T0 = pd.Timestamp("2024-01-01", tz="UTC")
+
+
+@pytest.fixture(autouse=True)
+def snapshots_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshots, "SNAPSHOTS_DIR", str(tmp_path / "snapshots"))
+
+
+def _interactions(users, start, minutes=1):
+    """One view per user, `minutes` apart from `start`, with categorical columns like the loader returns."""
+    df = pd.DataFrame({
+        "userId": [f"u{u}" for u in users],
+        "itemId": [f"i{u % 7}" for u in users],
+        "interaction": "view",
+        "timestamp": [start + pd.Timedelta(minutes=minutes * k) for k in range(len(users))],
+    })
+    for c in ["userId", "itemId", "interaction"]:
+        df[c] = df[c].astype("category")
+    return df
+
+
+def _items():
+    return pd.DataFrame({"itemId": [f"i{k}" for k in range(7)], "title": "t", "description": "d",
+                         "tags": [["a"]] * 7, "category": "c", "price": 1.0})
+
+
+def test_deltas_of_different_cardinality_read_back():
+    # 10 distinct users fit an int8 dictionary index, 1000 do not
+    first = write_snapshot(_items(), _interactions(range(10), T0))
+    second = write_snapshot(_items(), _interactions(range(1000), T0 + pd.Timedelta(days=1)), base=first)
+
+    df = second.interactions()
+    assert len(df) == second.meta["interactions_count"] == 1010
+    assert df["userId"].nunique() == 1000
+    assert str(df["timestamp"].dt.tz) == "UTC"
+    assert len(second.interactions(since=T0 + pd.Timedelta(days=1))) == 1000
+
+
+def test_interactions_at_the_watermark_are_kept_once():
+    first = write_snapshot(_items(), _interactions(range(5), T0))
+    watermark = first.watermark
+    assert watermark == T0 + pd.Timedelta(minutes=4)
+
+    # the next fetch starts at the watermark: it repeats the last row and
+    # brings one that arrived late with the same timestamp
+    late = _interactions([4, 50], watermark, minutes=0)
+    second = write_snapshot(_items(), late, base=first)
+    df = second.interactions()
+    assert len(df) == second.meta["interactions_count"] == 6
+    assert set(df.loc[df["timestamp"] == watermark, "userId"]) == {"u4", "u50"}
+    assert set(second.interactions(since=watermark)["userId"]) == {"u4", "u50"}
+    assert latest_snapshot().version == second.version
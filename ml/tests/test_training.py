@@ -0,0 +1,77 @@
+# tests/test_training.py
+import os
+import pandas as pd
+import pytest
+from app.recommender.id_index import IdIndex
+from app.recommender.lightfm_model import USER_IDS_PREFIX, LightFMRecommender, Trainer, load_train_meta
+from app.recommender.similarity import load_content_meta
+from app.services import training
+from app.services.model_manager import current_version, version_dir
+
+
+def _split(interactions: pd.DataFrame, fraction: float = 0.8):
+    cut = int(len(interactions) * fraction)
+    return interactions.iloc[:cut], interactions.iloc[cut:]
+
+
+def test_incremental_training_extends_base_model(tmp_path, training_data):
+    items, interactions = training_data
+    old, new = _split(interactions)
+    new = pd.concat([new, new.head(3).assign(userId=["new-user-1", "new-user-2", "new-user-3"])])
+    base_dir, model_dir = str(tmp_path / "base"), str(tmp_path / "next")
+    Trainer().train(items, old, model_dir=base_dir, epochs=2, num_threads=1)
+    base_files = {name: os.stat(os.path.join(base_dir, name)).st_mtime_ns for name in os.listdir(base_dir)}
+
+    Trainer().train_incremental(items, new, base_dir, model_dir, epochs=1, num_threads=1)
+
+    base_users = IdIndex.load(base_dir, USER_IDS_PREFIX)
+    users = IdIndex.load(model_dir, USER_IDS_PREFIX)
+    # existing users keep their rows; new ones are appended
+    assert users.ids_of(range(len(base_users))) == base_users.ids_of(range(len(base_users)))
+    assert {"new-user-1", "new-user-2", "new-user-3"} <= set(users.ids_of(range(len(users))))
+    meta = load_train_meta(model_dir)
+    assert meta["mode"] == "incremental"
+    assert pd.Timestamp(meta["watermark"]) == pd.to_datetime(interactions["timestamp"], utc=True).max()
+    assert meta["last_full_at"] == load_train_meta(base_dir)["last_full_at"]
+    assert LightFMRecommender(model_dir).recommend_for_user("new-user-1", 5)
+    # the base version is left as it was
+    assert {name: os.stat(os.path.join(base_dir, name)).st_mtime_ns for name in os.listdir(base_dir)} == base_files
+
+
+@pytest.fixture
+def fake_snapshot(monkeypatch, training_data):
+    """load_training_data replaced by the synthetic frames; records the arguments of each call."""
+    calls = []
+
+    def load(since=None, full=False):
+        calls.append({"since": since, "full": full})
+        items, interactions = training_data
+        stamps = pd.to_datetime(interactions["timestamp"], utc=True)
+        return items, interactions if since is None else interactions[stamps >= since]
+
+    monkeypatch.setattr(training, "load_training_data", load)
+    monkeypatch.setattr(training, "write_exports", lambda model_dir: {})
+    monkeypatch.setattr(Trainer, "train", _fast(Trainer.train))
+    return calls
+
+
+def _fast(train):
+    return lambda self, *args, **kwargs: train(self, *args, **{**kwargs, "epochs": 1, "num_threads": 1})
+
+
+def test_run_training_publishes_full_then_incremental_versions(versions, fake_snapshot):
+    first = training.run_training()
+    assert current_version() == first
+    assert fake_snapshot[-1] == {"since": None, "full": True}
+    assert load_train_meta(version_dir(first))["mode"] == "full"
+
+    # unchanged catalog: the incremental run links the content artifacts
+    second = training.run_training()
+    assert current_version() == second != first
+    assert fake_snapshot[-1]["full"] is False
+    assert fake_snapshot[-1]["since"] == pd.Timestamp(load_train_meta(version_dir(first))["watermark"])
+    assert load_train_meta(version_dir(second))["mode"] == "incremental"
+    assert load_content_meta(version_dir(second))["mode"] == "unchanged"
+
+    training.run_training(full=True)
+    assert fake_snapshot[-1] == {"since": None, "full": True}